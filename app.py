@@ -8,6 +8,7 @@ from plotly.subplots import make_subplots
 from pathlib import Path
 import tempfile
 import shutil
+import os
 import sys
 import time
 
@@ -16,7 +17,36 @@ rl_repo_path = Path(__file__).resolve().parent.parent / "Traffic-simulation-rl"
 if str(rl_repo_path) not in sys.path:
     sys.path.insert(0, str(rl_repo_path))
 
-from traffic_rl.api_rl import load_rl, simulate_episode, make_dummy_episode
+from traffic_rl.api_rl import load_rl, simulate_episode, simulate_episode_stream, make_dummy_episode_stream
+
+# Dashboard modules for the persisted simulation history
+dashboard_path = Path(__file__).resolve().parent / "dashboard"
+if str(dashboard_path) not in sys.path:
+    sys.path.append(str(dashboard_path))
+
+from markup import html, stylesheet
+
+# Same setting as dashboard/config.py HISTORY_DIR (off unless set)
+HISTORY_DIR = os.environ.get("TRAFFIC_HISTORY_DIR") or None
+
+# Per-step reward log written by training runs (see dashboard/reward_log.py)
+REWARD_LOG = os.environ.get("TRAFFIC_REWARD_LOG", str(Path(__file__).resolve().parent / "reward_log.csv"))
+
+# On-disk episode results shared by every server process (see dashboard/episode_cache.py)
+EPISODE_CACHE_DIR = os.environ.get("TRAFFIC_EPISODE_CACHE", str(Path(__file__).resolve().parent / "data" / "episode_cache"))
+
+# Minimum seconds between redraws while an episode streams in
+KPI_REFRESH_SECONDS = 0.25
+CHART_REFRESH_SECONDS = 1.0
+
+# Rows per episode batch for dummy generation and cache replays, rounded down to whole steps
+EPISODE_BATCH_ROWS = 50_000
+
+# Seed of the dummy agent's episodes (make_dummy_episode_stream's default)
+DUMMY_SEED = 42
+
+# Default points per chart trace, same as dashboard/downsample.py DEFAULT_POINT_BUDGET
+CHART_POINT_BUDGET = int(os.environ.get("TRAFFIC_CHART_POINTS", 2000))
 
 # Page configuration with enhanced styling
 st.set_page_config(
@@ -31,9 +61,8 @@ st.set_page_config(
     }
 )
 
-# Custom CSS for professional styling
-st.markdown("""
-<style>
+# Custom CSS for professional styling, sent minified (see dashboard/markup.py)
+APP_CSS = """
     /* Import Google Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -279,8 +308,8 @@ st.markdown("""
             font-size: 1.5rem;
         }
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+stylesheet(APP_CSS)
 
 
 @st.cache_resource(show_spinner=False)
@@ -289,14 +318,145 @@ def _cached_load(model_path: str = "models/demo_rl.pth"):
     return load_rl(model_path)
 
 
-@st.cache_data(show_spinner=False)
-def _cached_simulate(model_path: str, max_steps: int = 100, use_dummy: bool = False) -> pd.DataFrame:
-    """Cache the simulation results."""
+@st.cache_resource(show_spinner=False)
+def _episode_cache(cache_dir: str):
+    """Shared handle on the on-disk episode cache."""
+    from episode_cache import EpisodeCache
+    return EpisodeCache(cache_dir)
+
+
+def _episode_batches(model_path: str, max_steps: int = 100, use_dummy: bool = False,
+                     seed: int = DUMMY_SEED, junctions: int = 1):
+    """Stream of episode row batches, read from or written through the on-disk episode cache.
+    
+    Keys cover the model file, the RL API code and the run parameters; the
+    scenario and seed of a model run are set by ``load_rl``'s environment,
+    so they change with that code. ``seed`` drives the dummy agent.
+    The model is loaded before returning, so a missing model raises FileNotFoundError here.
+    """
+    from episode_cache import code_digest, episode_key, file_digest
+    
     if use_dummy:
-        return make_dummy_episode(max_steps)
-    else:
+        key = episode_key("dummy", max_steps, seed=seed, junctions=junctions,
+                          api=code_digest(make_dummy_episode_stream))
+        batch_steps = max(1, EPISODE_BATCH_ROWS // junctions)
+        return _episode_cache(EPISODE_CACHE_DIR).stream(
+            key, lambda: make_dummy_episode_stream(max_steps, junctions=junctions, seed=seed,
+                                                   batch_size=batch_steps),
+            batch_rows=batch_steps * junctions)
+    
+    def run():
         env, agent = _cached_load(model_path)
-        return simulate_episode(agent, env, max_steps=max_steps)
+        return simulate_episode_stream(agent, env, max_steps=max_steps)
+    
+    model_file = Path(model_path)
+    if not model_file.is_absolute():
+        model_file = rl_repo_path / model_file
+    try:
+        key = episode_key(file_digest(model_file), max_steps,
+                          api=code_digest(load_rl, simulate_episode, simulate_episode_stream))
+    except FileNotFoundError:
+        # Let load_rl resolve (or reject) the path; nothing to key the cache on
+        return run()
+    return _episode_cache(EPISODE_CACHE_DIR).stream(key, run, batch_rows=EPISODE_BATCH_ROWS)
+
+
+def render_episode(batches, max_steps: int, point_budget: int = CHART_POINT_BUDGET):
+    """Render KPIs and charts progressively while the episode streams in, then the tables."""
+    from episode_stream import EpisodeAccumulator
+    
+    episode = EpisodeAccumulator()
+    progress = st.progress(0.0, text="Starting episode...")
+    kpi_slot = st.empty()
+    chart_slot = st.empty()
+    last_kpis = last_charts = 0.0
+    
+    for batch in batches:
+        episode.add(batch)
+        now = time.monotonic()
+        if now - last_kpis >= KPI_REFRESH_SECONDS:
+            progress.progress(min(episode.steps / max_steps, 1.0), text=f"Simulated {episode.steps:,} / {max_steps:,} steps")
+            with kpi_slot.container():
+                render_kpi_cards(episode.kpis())
+            last_kpis = now
+        if now - last_charts >= CHART_REFRESH_SECONDS:
+            with chart_slot.container():
+                render_charts(episode.chart_frame(), episode, point_budget, selectable=False)
+            last_charts = now
+    
+    progress.empty()
+    with kpi_slot.container():
+        render_kpi_cards(episode.kpis())
+    with chart_slot.container():
+        # A fragment, so picking another chart reruns only the charts and keeps the finished episode on screen
+        st.fragment(render_charts)(episode.chart_frame(), episode, point_budget)
+    render_tables(episode.tail(), episode)
+    return episode
+
+
+@st.cache_resource(show_spinner=False)
+def _history_store(history_dir: str):
+    """Read-only handle on the dashboard's persisted history."""
+    from history_store import HistoryStore
+    return HistoryStore(history_dir)
+
+
+def render_history(hours: int, point_budget: int = CHART_POINT_BUDGET):
+    """Chart stored simulation history, loading only the selected window and columns."""
+    from downsample import line_trace
+    
+    if not HISTORY_DIR:
+        return
+    end = time.time()
+    df = _history_store(HISTORY_DIR).read(end - hours * 3600, end, columns=["timestamp", "avg_wait_time", "queue_length"])
+    if df.empty:
+        st.info(f"📚 No simulation history stored in the last {hours}h. Run the live dashboard to record some.")
+        return
+    
+    df["time"] = pd.to_datetime(df["timestamp"], unit="s")
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.1,
+                        subplot_titles=("⏱️ Average Wait Time", "🚗 Queue Length"))
+    fig.add_trace(line_trace(df["time"], df["avg_wait_time"], point_budget, mode="lines", name="Wait (s)",
+                             line=dict(color="#f59e0b")), row=1, col=1)
+    fig.add_trace(line_trace(df["time"], df["queue_length"], point_budget, "minmax", mode="lines", name="Queue",
+                             line=dict(color="#10b981")), row=2, col=1)
+    fig.update_layout(height=420, template="plotly_dark", showlegend=False,
+                      title=f"📚 Simulation History (last {hours}h, {len(df)} samples)")
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _reward_tailer(path: str):
+    """Shared incremental reader of the reward log."""
+    from reward_log import RewardLogTailer
+    return RewardLogTailer(path)
+
+
+def render_reward_log(point_budget: int = CHART_POINT_BUDGET):
+    """Chart the reward log, parsing only rows appended since the last rerun."""
+    from downsample import line_trace
+    
+    df = _reward_tailer(REWARD_LOG).read()
+    if df.empty:
+        st.info(f"🎯 No rows in {Path(REWARD_LOG).name} yet. Training runs append to it through RewardLogger.")
+        return
+    
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.1,
+                        subplot_titles=("🎯 Total Reward", "🧩 Reward Components"))
+    fig.add_trace(line_trace(df["step"], df["total_reward"], point_budget, mode="lines", name="Total",
+                             line=dict(color="#4f46e5")), row=1, col=1)
+    components = {
+        "waiting_time_change": "#f59e0b",
+        "queue_penalty": "#ef4444",
+        "throughput_reward": "#10b981",
+        "efficiency_reward": "#06b6d4"
+    }
+    for column, color in components.items():
+        fig.add_trace(line_trace(df["step"], df[column], point_budget, mode="lines",
+                                 name=column.replace("_", " ").title(), line=dict(color=color)), row=2, col=1)
+    fig.update_layout(height=480, template="plotly_dark",
+                      title=f"🎯 Live Reward Log ({len(df)} steps, latest step {int(df['step'].iloc[-1])})")
+    st.plotly_chart(fig, use_container_width=True)
 
 
 def compute_kpis(df: pd.DataFrame) -> dict:
@@ -321,13 +481,13 @@ def compute_kpis(df: pd.DataFrame) -> dict:
 
 def render_kpi_cards(kpis: dict):
     """Render enhanced KPI cards at the top of the dashboard."""
-    st.markdown("""
+    html("""
     <div class="chart-container">
         <h2 style="font-family: 'Inter', sans-serif; font-weight: 600; color: #2c3e50; margin-bottom: 1.5rem; text-align: center;">
             📊 Episode Performance KPIs
         </h2>
     </div>
-    """, unsafe_allow_html=True)
+    """)
     
     # Create enhanced KPI cards with icons and better styling
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -372,19 +532,28 @@ def render_kpi_cards(kpis: dict):
     
     for i, (col, kpi) in enumerate(zip([col1, col2, col3, col4, col5], kpi_data)):
         with col:
-            st.markdown(f"""
+            html(f"""
             <div class="kpi-card" style="border-left: 4px solid {kpi['color']};">
                 <div style="font-size: 2rem; margin-bottom: 0.5rem;">{kpi['icon']}</div>
                 <div class="kpi-value" style="color: {kpi['color']};">{kpi['value']}{kpi['suffix']}</div>
                 <div class="kpi-label">{kpi['label']}</div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
 
 
-def render_charts(df: pd.DataFrame):
-    """Render enhanced performance charts with better styling."""
+def render_charts(df: pd.DataFrame, episode=None, point_budget: int = CHART_POINT_BUDGET, selectable: bool = True):
+    """Render enhanced performance charts with better styling.
+    
+    With an ``EpisodeAccumulator``, ``df`` is its sampled chart frame and the
+    distribution and per-junction charts use its whole-episode aggregates.
+    Line charts are downsampled to ``point_budget`` points per trace.
+    """
+    from downsample import line_trace
+    from live_panels import cached_for_data
+    from navigation import render_views
+    
     if df.empty:
-        st.markdown("""
+        html("""
         <div class="chart-container">
             <div style="text-align: center; padding: 2rem;">
                 <div style="font-size: 3rem; margin-bottom: 1rem;">📊</div>
@@ -392,24 +561,25 @@ def render_charts(df: pd.DataFrame):
                 <p style="color: #6c757d;">Run a simulation to see performance visualizations</p>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         return
     
-    st.markdown("""
+    html("""
     <div class="chart-container">
         <h2 style="font-family: 'Inter', sans-serif; font-weight: 600; color: #2c3e50; margin-bottom: 1.5rem; text-align: center;">
             📈 Performance Analytics
         </h2>
     </div>
-    """, unsafe_allow_html=True)
+    """)
     
-    # Create enhanced tabs for different chart types
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "🎯 Reward & Wait Time", "🚗 Queue Length", "🎮 Action Distribution", 
-        "📊 Throughput", "🚦 Junction Analysis"
-    ])
+    # Figures are built once per episode state; switching back to a view reuses them
+    data = episode if episode is not None else df
+    version = episode.rows if episode is not None else len(df)
     
-    with tab1:
+    def view_figure(name, build):
+        return cached_for_data(data, f"chart_view_{name}", build, version=(version, point_budget))
+    
+    def reward_wait_figure():
         # Enhanced Reward and Wait Time over Time
         fig = make_subplots(
             rows=2, cols=1,
@@ -419,9 +589,10 @@ def render_charts(df: pd.DataFrame):
         
         if "reward" in df.columns:
             fig.add_trace(
-                go.Scatter(
-                    x=df["time"], 
-                    y=df["reward"], 
+                line_trace(
+                    df["time"], 
+                    df["reward"], 
+                    point_budget,
                     mode="lines+markers", 
                     name="Reward",
                     line=dict(color='#4f46e5', width=3),
@@ -433,9 +604,10 @@ def render_charts(df: pd.DataFrame):
         
         if "avg_wait_time" in df.columns and df["avg_wait_time"].notna().any():
             fig.add_trace(
-                go.Scatter(
-                    x=df["time"], 
-                    y=df["avg_wait_time"], 
+                line_trace(
+                    df["time"], 
+                    df["avg_wait_time"], 
+                    point_budget,
                     mode="lines+markers", 
                     name="Wait Time",
                     line=dict(color='#f59e0b', width=3),
@@ -463,125 +635,158 @@ def render_charts(df: pd.DataFrame):
         
         fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
         fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-        
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
     
-    with tab2:
+    def reward_wait_view():
+        st.plotly_chart(view_figure("reward_wait", reward_wait_figure), use_container_width=True)
+    
+    def queue_figure():
         # Enhanced Queue Length over Time
+        fig = go.Figure()
+        fig.add_trace(line_trace(
+            df["time"], 
+            df["queue_length"], 
+            point_budget,
+            "minmax",
+            mode="lines+markers",
+            name="Queue Length",
+            line=dict(color='#10b981', width=3),
+            marker=dict(size=6, color='#10b981'),
+            fill='tonexty'
+        ))
+        fig.update_layout(
+            title="🚗 Queue Length over Time",
+            xaxis_title="Time",
+            yaxis_title="Queue Length",
+            height=500,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="Inter", size=12),
+            title_font=dict(size=16, family="Inter")
+        )
+        fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+        fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+        return fig
+    
+    def queue_view():
         if "queue_length" in df.columns and df["queue_length"].notna().any():
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df["time"], 
-                y=df["queue_length"], 
-                mode="lines+markers",
-                name="Queue Length",
-                line=dict(color='#10b981', width=3),
-                marker=dict(size=6, color='#10b981'),
-                fill='tonexty'
-            ))
-            fig.update_layout(
-                title="🚗 Queue Length over Time",
-                xaxis_title="Time",
-                yaxis_title="Queue Length",
-                height=500,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family="Inter", size=12),
-                title_font=dict(size=16, family="Inter")
-            )
-            fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-            fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(view_figure("queue", queue_figure), use_container_width=True)
         else:
-            st.markdown("""
+            html("""
             <div class="chart-container">
                 <div style="text-align: center; padding: 2rem;">
                     <div style="font-size: 2rem; margin-bottom: 1rem;">🚗</div>
                     <h3 style="color: #6c757d; font-family: 'Inter', sans-serif;">Queue length data not available</h3>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
     
-    with tab3:
+    def action_figure():
         # Enhanced Action Distribution
-        if "action" in df.columns:
-            action_counts = df["action"].value_counts().sort_index()
-            colors = ['#4f46e5', '#f59e0b', '#10b981', '#ef4444', '#06b6d4', '#8b5cf6', '#f97316', '#ec4899']
-            
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=action_counts.index, 
-                    y=action_counts.values,
-                    marker=dict(
-                        color=colors[:len(action_counts)],
-                        line=dict(color='white', width=2)
-                    ),
-                    text=action_counts.values,
-                    textposition='auto',
-                )
-            ])
-            fig.update_layout(
-                title="🎮 Action Distribution",
-                xaxis_title="Action",
-                yaxis_title="Count",
-                height=500,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(family="Inter", size=12),
-                title_font=dict(size=16, family="Inter")
+        action_counts = episode.action_counts() if episode is not None else df["action"].value_counts().sort_index()
+        colors = ['#4f46e5', '#f59e0b', '#10b981', '#ef4444', '#06b6d4', '#8b5cf6', '#f97316', '#ec4899']
+        
+        fig = go.Figure(data=[
+            go.Bar(
+                x=action_counts.index, 
+                y=action_counts.values,
+                marker=dict(
+                    color=colors[:len(action_counts)],
+                    line=dict(color='white', width=2)
+                ),
+                text=action_counts.values,
+                textposition='auto',
             )
-            fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-            fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
-            st.plotly_chart(fig, use_container_width=True)
+        ])
+        fig.update_layout(
+            title="🎮 Action Distribution",
+            xaxis_title="Action",
+            yaxis_title="Count",
+            height=500,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(family="Inter", size=12),
+            title_font=dict(size=16, family="Inter")
+        )
+        fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+        fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='rgba(128,128,128,0.2)')
+        return fig
+    
+    def action_view():
+        if "action" in df.columns:
+            st.plotly_chart(view_figure("action", action_figure), use_container_width=True)
         else:
-            st.markdown("""
+            html("""
             <div class="chart-container">
                 <div style="text-align: center; padding: 2rem;">
                     <div style="font-size: 2rem; margin-bottom: 1rem;">🎮</div>
                     <h3 style="color: #6c757d; font-family: 'Inter', sans-serif;">Action data not available</h3>
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+    
+    def throughput_figure():
+        fig = go.Figure(line_trace(df["time"], df["throughput"], point_budget, mode="lines"))
+        fig.update_layout(title="Throughput over Time", xaxis_title="time", yaxis_title="throughput")
+        return fig
     
-    with tab4:
+    def throughput_view():
         # Throughput over Time (if available)
         if "throughput" in df.columns and df["throughput"].notna().any():
-            fig = px.line(df, x="time", y="throughput", title="Throughput over Time")
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(view_figure("throughput", throughput_figure), use_container_width=True)
         else:
             st.info("Throughput data not available.")
     
-    with tab5:
-        # Junction Analysis (if available)
-        if "junction_id" in df.columns and df["junction_id"].notna().any():
+    def junction_figure():
+        if episode is not None:
+            junction_stats = episode.junction_stats()
+        else:
             junction_stats = df.groupby("junction_id").agg({
                 "avg_wait_time": "mean",
                 "queue_length": "mean"
             }).reset_index()
-            
-            fig = px.bar(
-                junction_stats, 
-                x="junction_id", 
-                y=["avg_wait_time", "queue_length"],
-                title="Per-Junction Performance",
-                barmode="group"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        
+        return px.bar(
+            junction_stats, 
+            x="junction_id", 
+            y=["avg_wait_time", "queue_length"],
+            title="Per-Junction Performance",
+            barmode="group"
+        )
+    
+    def junction_view():
+        # Junction Analysis (if available)
+        if "junction_id" in df.columns and df["junction_id"].notna().any():
+            st.plotly_chart(view_figure("junction", junction_figure), use_container_width=True)
         else:
             st.info("Junction data not available.")
+    
+    # Only the selected chart runs (see dashboard/navigation.py); while the
+    # episode streams in it is redrawn without the selector
+    render_views({
+        "🎯 Reward & Wait Time": reward_wait_view,
+        "🚗 Queue Length": queue_view,
+        "🎮 Action Distribution": action_view,
+        "📊 Throughput": throughput_view,
+        "🚦 Junction Analysis": junction_view
+    }, key="chart_view", selectable=selectable)
 
 
-def render_tables(df: pd.DataFrame):
-    """Render data tables."""
+def render_tables(df: pd.DataFrame, episode=None):
+    """Render data tables (with an ``EpisodeAccumulator``, ``df`` is its tail of raw rows)."""
     st.subheader("📋 Data Tables")
     
     tab1, tab2 = st.tabs(["Raw Episode Data", "Action Aggregates"])
     
     with tab1:
+        if episode is not None and episode.rows > len(df):
+            st.caption(f"Last {len(df):,} of {episode.rows:,} rows")
         st.dataframe(df, use_container_width=True)
     
     with tab2:
-        if "action" in df.columns and not df.empty:
+        if episode is not None and "action" in df.columns:
+            st.dataframe(episode.action_aggregates(), use_container_width=True)
+        elif "action" in df.columns and not df.empty:
             action_agg = df.groupby("action").agg({
                 "reward": "mean",
                 "avg_wait_time": "mean",
@@ -616,27 +821,29 @@ def handle_file_upload() -> str | None:
 
 def main():
     # Beautiful header with gradient background
-    st.markdown("""
+    html("""
     <div class="main-header">
         <h1>🚦 AI-Powered Traffic Management System</h1>
         <p>Intelligent Reinforcement Learning Dashboard for Smart Traffic Control</p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
     
     # Enhanced sidebar with better styling
-    st.sidebar.markdown("""
-    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1.5rem; border-radius: 10px; margin-bottom: 1rem; text-align: center;">
-        <h2 style="color: white; margin: 0; font-family: 'Inter', sans-serif; font-weight: 600;">🎛️ Control Panel</h2>
-        <p style="color: white; margin: 0.5rem 0 0 0; opacity: 0.9; font-family: 'Inter', sans-serif;">Configure your simulation</p>
-    </div>
-    """, unsafe_allow_html=True)
+    with st.sidebar:
+        html("""
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 1.5rem; border-radius: 10px; margin-bottom: 1rem; text-align: center;">
+            <h2 style="color: white; margin: 0; font-family: 'Inter', sans-serif; font-weight: 600;">🎛️ Control Panel</h2>
+            <p style="color: white; margin: 0.5rem 0 0 0; opacity: 0.9; font-family: 'Inter', sans-serif;">Configure your simulation</p>
+        </div>
+        """)
     
     # Model configuration section
-    st.sidebar.markdown("""
-    <div style="background: var(--card-bg); padding: 1rem; border-radius: 8px; margin-bottom: 1rem; border: 1px solid var(--border-color);">
-        <h3 style="color: var(--text-primary); font-family: 'Inter', sans-serif; font-weight: 600; margin: 0 0 1rem 0;">🤖 Model Configuration</h3>
-    </div>
-    """, unsafe_allow_html=True)
+    with st.sidebar:
+        html("""
+        <div style="background: var(--card-bg); padding: 1rem; border-radius: 8px; margin-bottom: 1rem; border: 1px solid var(--border-color);">
+            <h3 style="color: var(--text-primary); font-family: 'Inter', sans-serif; font-weight: 600; margin: 0 0 1rem 0;">🤖 Model Configuration</h3>
+        </div>
+        """)
     
     # Model path selection
     model_path = st.sidebar.text_input(
@@ -659,68 +866,80 @@ def main():
     )
     
     # Simulation parameters section
-    st.sidebar.markdown("""
-    <div style="background: var(--card-bg); padding: 1rem; border-radius: 8px; margin: 1rem 0; border: 1px solid var(--border-color);">
-        <h3 style="color: var(--text-primary); font-family: 'Inter', sans-serif; font-weight: 600; margin: 0 0 1rem 0;">⚙️ Simulation Parameters</h3>
-    </div>
-    """, unsafe_allow_html=True)
+    with st.sidebar:
+        html("""
+        <div style="background: var(--card-bg); padding: 1rem; border-radius: 8px; margin: 1rem 0; border: 1px solid var(--border-color);">
+            <h3 style="color: var(--text-primary); font-family: 'Inter', sans-serif; font-weight: 600; margin: 0 0 1rem 0;">⚙️ Simulation Parameters</h3>
+        </div>
+        """)
     
     max_steps = st.sidebar.number_input(
         "📊 Max Steps",
         min_value=10,
-        max_value=1000,
+        max_value=1_000_000,
         value=100,
         step=10,
         help="Maximum number of simulation steps"
     )
     
+    dummy_junctions = st.sidebar.number_input(
+        "🚦 Dummy Junctions",
+        min_value=1,
+        max_value=100,
+        value=1,
+        help="Junctions generated per step by the dummy agent (one row each)"
+    )
+    
+    chart_points = st.sidebar.number_input(
+        "📈 Points per Chart",
+        min_value=100,
+        max_value=100_000,
+        value=CHART_POINT_BUDGET,
+        step=100,
+        help="Longer series are downsampled to this many points per line (LTTB / min-max)"
+    )
+    
     # Enhanced run button
-    st.sidebar.markdown("""
-    <div style="margin-top: 2rem;">
-    """, unsafe_allow_html=True)
+    with st.sidebar:
+        html("""
+        <div style="margin-top: 2rem;">
+        """)
     
     run_demo = st.sidebar.button("🚀 Run RL Demo", use_container_width=True, type="primary")
     
-    st.sidebar.markdown("""
-    </div>
-    """, unsafe_allow_html=True)
+    with st.sidebar:
+        html("""
+        </div>
+        """)
+    
+    # Stored history from the live simulation dashboard (when it keeps one)
+    if HISTORY_DIR and st.sidebar.checkbox("📚 Show simulation history", value=False):
+        history_hours = st.sidebar.slider("History window (hours)", min_value=1, max_value=168, value=1)
+        render_history(history_hours, chart_points)
+    
+    # Live reward log from training runs
+    if st.sidebar.checkbox("🎯 Show live reward log", value=False):
+        render_reward_log(chart_points)
     
     if run_demo:
         try:
-            with st.spinner("Loading RL model and running simulation..."):
-                df = _cached_simulate(model_path, max_steps, use_dummy=False)
+            with st.spinner("Loading RL model..."):
+                batches = _episode_batches(model_path, max_steps, use_dummy=False)
             
-            if df.empty:
-                st.warning("No data returned from simulate_episode().")
+            episode = render_episode(batches, max_steps, chart_points)
+            if not episode.steps:
+                st.warning("No data returned from simulate_episode_stream().")
                 return
             
-            # Compute and display KPIs
-            kpis = compute_kpis(df)
-            render_kpi_cards(kpis)
-            
-            # Render charts
-            render_charts(df)
-            
-            # Render tables
-            render_tables(df)
-            
-            st.success(f"✅ Simulation completed successfully! Processed {len(df)} steps.")
+            st.success(f"✅ Simulation completed successfully! Processed {episode.steps:,} steps.")
             
         except FileNotFoundError as e:
             if use_dummy:
                 st.warning("⚠️ Model not found, using dummy agent fallback...")
                 with st.spinner("Generating dummy episode data..."):
-                    df = _cached_simulate(model_path, max_steps, use_dummy=True)
-                
-                # Compute and display KPIs
-                kpis = compute_kpis(df)
-                render_kpi_cards(kpis)
-                
-                # Render charts
-                render_charts(df)
+                    batches = _episode_batches(model_path, max_steps, use_dummy=True, junctions=dummy_junctions)
                 
-                # Render tables
-                render_tables(df)
+                render_episode(batches, max_steps, chart_points)
                 
                 st.info("📊 **Demo Mode**: Showing realistic dummy data. To use real values, place demo_rl.pth in Traffic-simulation-rl/models/ or use the uploader.")
             else:
@@ -736,7 +955,7 @@ def main():
     
     else:
         # Enhanced welcome message
-        st.markdown("""
+        html("""
         <div class="chart-container">
             <div style="text-align: center; padding: 3rem 2rem;">
                 <div style="font-size: 4rem; margin-bottom: 1rem;">🚦</div>
@@ -752,11 +971,11 @@ def main():
                 </div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
         
         # Enhanced instructions
         with st.expander("📖 How to Use This Dashboard", expanded=False):
-            st.markdown("""
+            html("""
             <div style="font-family: 'Inter', sans-serif;">
                 <h3 style="color: var(--text-primary); font-weight: 600;">🚀 Getting Started</h3>
                 <ol style="color: var(--text-secondary); line-height: 1.8;">
@@ -780,14 +999,14 @@ def main():
                     <li>Charts adapt to available data columns automatically</li>
                 </ul>
             </div>
-            """, unsafe_allow_html=True)
+            """)
         
         # Add a footer
-        st.markdown("""
+        html("""
         <div class="footer">
             <p>🚦 AI-Powered Traffic Management System | Built with Streamlit & Reinforcement Learning</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
 
 
 if __name__ == "__main__":
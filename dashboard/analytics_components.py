@@ -3,86 +3,187 @@ Analytics Components
 Contains time series and performance analytics components
 """
 
+import time
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
 
+from downsample import DEFAULT_POINT_BUDGET, line_trace
+from live_panels import cached_for_data
+from markup import html
+
+# Keys of the analytics widgets whose values outlive a hidden analytics view
+ANALYTICS_WIDGET_KEYS = ("time_series_range", "stored_run_select", "history_window_select", "history_metrics_select")
+
+# Persisted history windows (seconds) and plottable columns
+HISTORY_WINDOWS = {
+    "Last hour": 3600,
+    "Last 6 hours": 6 * 3600,
+    "Last day": 24 * 3600,
+    "Last week": 7 * 24 * 3600
+}
+HISTORY_METRICS = {
+    "avg_wait_time": "Avg Wait (s)",
+    "queue_length": "Queue Length",
+    "vehicle_count": "Vehicles",
+    "avg_speed": "Avg Speed (km/h)",
+    "ai_efficiency": "AI Efficiency (%)"
+}
+
 
-def time_series_panel(d):
-    """Modern dark-themed performance analytics with FontAwesome icons"""
+# Stored metrics plotted for longer ranges (sqlite_store columns)
+STORED_METRICS = {
+    "wait_time": "Avg Wait (s)",
+    "queue_length": "Queue Length",
+    "queue_length_max": "Peak Queue"
+}
+RESOLUTION_LABELS = {
+    None: "per step",
+    "metrics_10s": "10 s averages",
+    "metrics_1m": "1 min averages",
+    "metrics_15m": "15 min averages"
+}
+
+
+def stored_series_panel(store, window: str, run_id=None):
+    """One run's metrics over a longer range from the SQLite store, at the coarsest resolution
+    that fills the chart with that run's buckets. The current ``run_id`` is preselected."""
+    end = time.time()
+    start = end - HISTORY_WINDOWS[window]
+    runs = store.runs(start, end)
+    if not runs:
+        st.caption("No stored metrics in this range yet")
+        return
+    run_id = st.selectbox("🏁 Run", options=runs, index=runs.index(run_id) if run_id in runs else 0,
+                          format_func=lambda run: run or "(no run id)", key="stored_run_select")
+    query_started = time.perf_counter()
+    resolution, df = store.query(start, end, run_id=run_id)
+    query_ms = (time.perf_counter() - query_started) * 1000
+    if df.empty:
+        st.caption("No stored metrics in this range yet")
+        return
     
-    ts = d.get("time_series", {})
-    if ts and ts.get("t"):
-        # Create modern dark-themed time series plot
-        fig = go.Figure()
-        
-        # Add AI performance line with modern styling
-        fig.add_trace(go.Scatter(
-            x=ts["t"],
-            y=ts["rl_avg_travel_time"],
-            mode='lines+markers',
-            name='AI Optimized',
-            line=dict(color='#4f46e5', width=3, shape='spline'),
-            marker=dict(size=8, symbol='circle', color='#4f46e5'),
-            hovertemplate='<b>AI Optimized</b><br>Time: %{x}s<br>Travel Time: %{y:.1f}s<extra></extra>'
-        ))
-        
-        # Add baseline line with modern styling
-        fig.add_trace(go.Scatter(
-            x=ts["t"],
-            y=ts["baseline_avg_travel_time"],
-            mode='lines+markers',
-            name='Traditional Control',
-            line=dict(color='#ef4444', width=3, dash='dash', shape='spline'),
-            marker=dict(size=8, symbol='diamond', color='#ef4444'),
-            hovertemplate='<b>Traditional Control</b><br>Time: %{x}s<br>Travel Time: %{y:.1f}s<extra></extra>'
-        ))
-        
-        # Modern dark layout
-        fig.update_layout(
-            title=dict(
-                text="Performance Comparison",
-                font=dict(size=16, color='white'),
-                x=0.02
-            ),
-            xaxis_title="Time (seconds)",
-            yaxis_title="Travel Time (seconds)",
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(size=12, color='white'),
-            height=320,
-            margin=dict(l=20, r=20, t=50, b=20),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-                font=dict(color='white')
-            ),
-            xaxis=dict(
-                gridcolor='rgba(64, 64, 64, 0.3)',
-                tickfont=dict(color='white'),
-                title=dict(font=dict(color='white'))
-            ),
-            yaxis=dict(
-                gridcolor='rgba(64, 64, 64, 0.3)', 
-                tickfont=dict(color='white'),
-                title=dict(font=dict(color='white'))
-            )
+    times = pd.to_datetime(df["ts"], unit="s")
+    fig = go.Figure()
+    for column, label in STORED_METRICS.items():
+        fig.add_trace(line_trace(times, df[column], mode="lines", name=label))
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12, color='white'),
+        height=320,
+        margin=dict(l=20, r=20, t=30, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(color='white')),
+        xaxis=dict(gridcolor='rgba(64, 64, 64, 0.3)', tickfont=dict(color='white')),
+        yaxis=dict(gridcolor='rgba(64, 64, 64, 0.3)', tickfont=dict(color='white'))
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(df)} points, {RESOLUTION_LABELS[resolution]}, queried in {query_ms:.0f} ms")
+
+
+def time_series_figure(ts, point_budget=DEFAULT_POINT_BUDGET):
+    """AI vs baseline travel time chart plus the current and average improvement (%).
+
+    Each line is downsampled to ``point_budget`` points; the improvements use every sample.
+    """
+    # Create modern dark-themed time series plot
+    fig = go.Figure()
+
+    # Add AI performance line with modern styling
+    fig.add_trace(line_trace(
+        ts["t"],
+        ts["rl_avg_travel_time"],
+        point_budget,
+        mode='lines+markers',
+        name='AI Optimized',
+        line=dict(color='#4f46e5', width=3, shape='spline'),
+        marker=dict(size=8, symbol='circle', color='#4f46e5'),
+        hovertemplate='<b>AI Optimized</b><br>Time: %{x}s<br>Travel Time: %{y:.1f}s<extra></extra>'
+    ))
+
+    # Add baseline line with modern styling
+    fig.add_trace(line_trace(
+        ts["t"],
+        ts["baseline_avg_travel_time"],
+        point_budget,
+        mode='lines+markers',
+        name='Traditional Control',
+        line=dict(color='#ef4444', width=3, dash='dash', shape='spline'),
+        marker=dict(size=8, symbol='diamond', color='#ef4444'),
+        hovertemplate='<b>Traditional Control</b><br>Time: %{x}s<br>Travel Time: %{y:.1f}s<extra></extra>'
+    ))
+
+    # Modern dark layout
+    fig.update_layout(
+        title=dict(
+            text="Performance Comparison",
+            font=dict(size=16, color='white'),
+            x=0.02
+        ),
+        xaxis_title="Time (seconds)",
+        yaxis_title="Travel Time (seconds)",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12, color='white'),
+        height=320,
+        margin=dict(l=20, r=20, t=50, b=20),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+            font=dict(color='white')
+        ),
+        xaxis=dict(
+            gridcolor='rgba(64, 64, 64, 0.3)',
+            tickfont=dict(color='white'),
+            title=dict(font=dict(color='white'))
+        ),
+        yaxis=dict(
+            gridcolor='rgba(64, 64, 64, 0.3)', 
+            tickfont=dict(color='white'),
+            title=dict(font=dict(color='white'))
         )
-        
+    )
+    
+    # Modern performance summary cards (vectorized over the full history)
+    baseline = np.asarray(ts["baseline_avg_travel_time"], dtype=float)
+    rl = np.asarray(ts["rl_avg_travel_time"], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        improvements = np.where(baseline != 0, (baseline - rl) / baseline * 100, 0.0)
+    current_improvement = float(improvements[-1])
+    avg_improvement = float(improvements.mean())
+    return fig, current_improvement, avg_improvement
+
+
+def time_series_panel(d, store=None):
+    """Modern dark-themed performance analytics with FontAwesome icons
+    
+    With a metrics ``store`` the panel can also show longer stored ranges.
+    """
+    
+    if store is not None:
+        window = st.selectbox("🕒 Range", options=["Current run", *HISTORY_WINDOWS.keys()], key="time_series_range")
+        if window != "Current run":
+            stored_series_panel(store, window, d.get("run_id"))
+            return
+    
+    ts = d.get("time_series", {})
+    # Series may be lists (JSON) or NumPy ring buffer views (live history)
+    if ts and ts.get("t") is not None and len(ts["t"]):
+        # Built once per snapshot; live refreshes without new data reuse them
+        fig, current_improvement, avg_improvement = cached_for_data(d, "time_series", lambda: time_series_figure(ts))
         st.plotly_chart(fig, use_container_width=True)
         
-        # Modern performance summary cards
-        current_improvement = (ts["baseline_avg_travel_time"][-1] - ts["rl_avg_travel_time"][-1]) / ts["baseline_avg_travel_time"][-1] * 100
-        avg_improvement = sum((b - r) / b * 100 for b, r in zip(ts["baseline_avg_travel_time"], ts["rl_avg_travel_time"])) / len(ts["t"])
-        
         col1, col2 = st.columns(2)
         
         with col1:
             improvement_class = "delta-positive" if current_improvement > 0 else "delta-negative"
             improvement_icon = "fa-chart-line-up" if current_improvement > 0 else "fa-chart-line-down"
-            st.markdown(f"""
+            html(f"""
             <div class="metric-card">
                 <div class="metric-icon">
                     <i class="fas {improvement_icon}"></i>
@@ -93,12 +194,12 @@ def time_series_panel(d):
                     <i class="fas fa-rocket"></i> Real-time gain
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
         
         with col2:
             avg_class = "delta-positive" if avg_improvement > 0 else "delta-negative"
             avg_icon = "fa-trophy" if avg_improvement > 0 else "fa-chart-line-down"
-            st.markdown(f"""
+            html(f"""
             <div class="metric-card">
                 <div class="metric-icon">
                     <i class="fas {avg_icon}"></i>
@@ -109,10 +210,10 @@ def time_series_panel(d):
                     <i class="fas fa-brain"></i> Session average
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
         
     else:
-        st.markdown("""
+        html("""
         <div style="background: linear-gradient(135deg, #2d2d2d 0%, #3a3a3a 100%); 
                     border: 1px solid #404040; border-radius: 12px; 
                     padding: 3rem; text-align: center;">
@@ -127,4 +228,46 @@ def time_series_panel(d):
                 </div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
+
+
+def history_panel(store):
+    """Persisted KPI history, reading only the chosen window and metrics from the store"""
+    if store is None:
+        st.caption("History is not stored. Set TRAFFIC_HISTORY_DIR to keep every snapshot on disk.")
+        return
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        window = st.selectbox("🕒 History Window", options=list(HISTORY_WINDOWS.keys()), key="history_window_select")
+    with col2:
+        metrics = st.multiselect(
+            "📈 Metrics", options=list(HISTORY_METRICS.keys()), default=["avg_wait_time", "queue_length"],
+            format_func=HISTORY_METRICS.get, key="history_metrics_select"
+        )
+    if not metrics:
+        return
+    
+    end = time.time()
+    start = end - HISTORY_WINDOWS[window]
+    df = store.read(start, end, columns=["timestamp", *metrics])
+    if df.empty:
+        st.caption("No stored history in this window yet")
+        return
+    
+    times = pd.to_datetime(df["timestamp"], unit="s")
+    fig = go.Figure()
+    for metric in metrics:
+        fig.add_trace(line_trace(times, df[metric], mode="lines", name=HISTORY_METRICS[metric]))
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(size=12, color='white'),
+        height=280,
+        margin=dict(l=20, r=20, t=30, b=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(color='white')),
+        xaxis=dict(gridcolor='rgba(64, 64, 64, 0.3)', tickfont=dict(color='white')),
+        yaxis=dict(gridcolor='rgba(64, 64, 64, 0.3)', tickfont=dict(color='white'))
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{len(df)} samples from {len(store.chunks(start, end))} stored chunks")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Headless Batch Evaluation
+Runs scenarios x control modes x seeds on a process pool and streams KPI summaries to JSONL
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATA_DIR
+
+DEFAULT_SCENARIOS = ("uniform", "tidal", "asymmetric", "congested", "random", "enhanced")
+DEFAULT_MODES = ("adaptive", "static")
+DEFAULT_RESULTS_FILE = DATA_DIR / "batch_results.jsonl"
+
+
+def expand_matrix(scenarios: Iterable[str], control_modes: Iterable[str], seeds: Iterable[int]) -> List[Dict[str, Any]]:
+    """One run spec per scenario x control mode x seed"""
+    return [
+        {"scenario": scenario, "control_mode": mode, "seed": seed}
+        for scenario, mode, seed in itertools.product(scenarios, control_modes, seeds)
+    ]
+
+
+def summarize_history(history: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """KPI summary of one run from its time-series arrays"""
+    if not len(history["simulation_times"]):
+        return {}
+    return {
+        "samples": int(len(history["simulation_times"])),
+        "mean_wait_time": float(history["wait_times"].mean()),
+        "p95_wait_time": float(np.percentile(history["wait_times"], 95)),
+        "mean_queue_length": float(history["queue_lengths"].mean()),
+        "max_queue_length": float(history["queue_lengths"].max()),
+        "mean_vehicle_count": float(history["vehicle_counts"].mean()),
+        "mean_speed_kmh": float(history["speeds"].mean()),
+        "mean_efficiency": float(history["efficiency_scores"].mean())
+    }
+
+
+def run_single(spec: Dict[str, Any], duration: int, step_interval: int = 1, observe_interval: Optional[int] = None,
+               decision_interval: Optional[int] = None) -> Dict[str, Any]:
+    """Run one simulation as fast as possible and return its KPI summary (pool worker)"""
+    from ring_buffer import MetricHistory
+    from sumo_integration import SUMO_AVAILABLE, SumoStreamlitIntegration
+
+    integration = SumoStreamlitIntegration()
+    # Keep the whole run, not just the dashboard's rolling window
+    integration.history = MetricHistory(capacity=duration + 1)
+    started = time.perf_counter()
+    result = {**spec, "duration": duration, "sumo": SUMO_AVAILABLE}
+
+    if not integration.start_simulation(spec["scenario"], duration, spec["control_mode"], speed=None,
+                                        step_interval=step_interval, observe_interval=observe_interval,
+                                        decision_interval=decision_interval, seed=spec["seed"]):
+        return {**result, "status": "failed"}
+    integration.simulation_thread.join()
+    integration.stop_simulation()
+
+    wall_time = time.perf_counter() - started
+    loop_stats = integration.profiler.report()
+    return {
+        **result,
+        "status": "ok",
+        "wall_time": wall_time,
+        "steps_per_second": loop_stats["simulated_seconds"] / wall_time if wall_time > 0 else 0.0,
+        "ms_per_sim_second": loop_stats["ms_per_sim_second"],
+        **summarize_history(integration.history.window())
+    }
+
+
+def run_batch(specs: List[Dict[str, Any]], duration: int, output: Path, workers: Optional[int] = None,
+              **run_options) -> List[Dict[str, Any]]:
+    """Run all specs on a process pool, appending each summary to ``output`` as it finishes"""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output, "a", encoding="utf-8") as f:
+        futures = {pool.submit(run_single, spec, duration, **run_options): spec for spec in specs}
+        for done, future in enumerate(as_completed(futures), 1):
+            spec = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {**spec, "duration": duration, "status": "error", "error": str(e)}
+            f.write(json.dumps(result) + "\n")
+            f.flush()
+            results.append(result)
+            print(f"[{done}/{len(specs)}] {spec['scenario']}/{spec['control_mode']}/seed {spec['seed']}: "
+                  f"{result['status']}, mean wait {result.get('mean_wait_time', float('nan')):.1f}s")
+    return results
+
+
+def print_summary(results: List[Dict[str, Any]]):
+    """Mean KPIs per scenario and control mode across seeds"""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for result in results:
+        if result.get("status") == "ok":
+            groups.setdefault((result["scenario"], result["control_mode"]), []).append(result)
+
+    print(f"\n{'Scenario':<12} {'Mode':<10} {'Runs':>4} {'Wait (s)':>9} {'Queue':>7} {'Efficiency':>11}")
+    for (scenario, mode), runs in sorted(groups.items()):
+        print(f"{scenario:<12} {mode:<10} {len(runs):>4} "
+              f"{np.mean([r['mean_wait_time'] for r in runs]):>9.1f} "
+              f"{np.mean([r['mean_queue_length'] for r in runs]):>7.1f} "
+              f"{np.mean([r['mean_efficiency'] for r in runs]):>10.1f}%")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Headless batch evaluation of traffic control modes")
+    parser.add_argument("--scenarios", nargs="+", default=list(DEFAULT_SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--modes", nargs="+", default=list(DEFAULT_MODES), help="Control modes to compare")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2], help="Seeds per scenario/mode")
+    parser.add_argument("--duration", type=int, default=3600, help="Simulated seconds per run")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_RESULTS_FILE, help="JSONL results file (appended)")
+    parser.add_argument("--step-interval", type=int, default=1, help="Simulated seconds per step call")
+    parser.add_argument("--observe-interval", type=int, default=None, help="Simulated seconds between observations")
+    parser.add_argument("--decision-interval", type=int, default=None, help="Simulated seconds between decisions")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    specs = expand_matrix(args.scenarios, args.modes, args.seeds)
+    print(f"🧪 Running {len(specs)} simulations of {args.duration}s on {args.workers or os.cpu_count()} workers")
+    print(f"📄 Streaming results to {args.output}")
+
+    started = time.perf_counter()
+    results = run_batch(specs, args.duration, args.output, args.workers, step_interval=args.step_interval,
+                        observe_interval=args.observe_interval, decision_interval=args.decision_interval)
+    print_summary(results)
+    print(f"\n✅ Batch finished in {time.perf_counter() - started:.1f}s")
+    return 0 if all(r.get("status") == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Compact Traffic State
+Slotted, array-backed TrafficState with per-scenario interned lane ids and on-demand dict views
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Congestion levels by per-lane queue length: <= 2, <= 5, <= 8, above
+CONGESTION_LEVELS = ("free_flow", "moderate", "congested", "severe")
+_CONGESTION_BOUNDS = np.array([2, 5, 8])
+
+# Interned tables by lane id tuple; one per scenario network
+_TABLES: Dict[tuple, "LaneTable"] = {}
+
+
+class LaneTable:
+    """Interned, ordered lane ids of one network with their array index.
+
+    ``intern`` returns the same table for the same ids, so every state of a
+    scenario shares one table and lane lookups are a single dict access.
+    Behaves as a read-only sequence of lane ids.
+    """
+
+    __slots__ = ("ids", "index")
+
+    def __init__(self, lane_ids: Sequence[str]):
+        self.ids = tuple(lane_ids)
+        self.index = {lane_id: i for i, lane_id in enumerate(self.ids)}
+
+    @classmethod
+    def intern(cls, lane_ids: Sequence[str]) -> "LaneTable":
+        if isinstance(lane_ids, LaneTable):
+            return lane_ids
+        key = tuple(lane_ids)
+        table = _TABLES.get(key)
+        if table is None:
+            table = _TABLES[key] = cls(key)
+        return table
+
+    def __reduce__(self):
+        # Re-intern on unpickling so snapshots from a worker share one table
+        return LaneTable.intern, (self.ids,)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __getitem__(self, i):
+        return self.ids[i]
+
+
+class LaneMap(Mapping):
+    """Read-only ``{lane_id: value}`` view over an array indexed by a LaneTable.
+
+    Existing UI code keeps using ``.get``, ``.items()`` and ``or {}``, while
+    the state itself stores (and pickles) only the table and the array.
+    ``labels`` decodes integer codes (e.g. congestion levels) on access.
+    """
+
+    __slots__ = ("lanes", "values", "labels")
+
+    def __init__(self, lanes: LaneTable, values: np.ndarray, labels: Optional[Sequence[str]] = None):
+        self.lanes = lanes
+        self.values = values
+        self.labels = labels
+
+    def __getitem__(self, lane_id: str):
+        value = self.values[self.lanes.index[lane_id]].item()
+        return self.labels[value] if self.labels is not None else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lanes.ids)
+
+    def __len__(self) -> int:
+        return len(self.lanes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = self.values.tolist()
+        if self.labels is not None:
+            values = [self.labels[value] for value in values]
+        return dict(zip(self.lanes.ids, values))
+
+    def __repr__(self) -> str:
+        return f"LaneMap({self.to_dict()!r})"
+
+
+class CompactTrafficState:
+    """TrafficState with per-lane data as NumPy arrays indexed by a LaneTable.
+
+    The scalar fields match ``TrafficState``; the per-lane dict fields are
+    properties returning ``LaneMap`` views, so nothing keyed by lane strings
+    is built per step. ``to_dict`` gives the ``TrafficState`` field dict for
+    recordings.
+    """
+
+    __slots__ = ("timestamp", "vehicle_count", "waiting_vehicles", "avg_waiting_time", "avg_speed",
+                 "queue_length", "current_phase", "phase_duration", "lanes", "lane_queues",
+                 "lane_waiting_times", "lane_vehicle_counts", "directional_flow", "emergency_vehicles",
+                 "pedestrian_waiting")
+
+    def __init__(self, timestamp: float, vehicle_count: int, waiting_vehicles: int, avg_waiting_time: float,
+                 avg_speed: float, queue_length: int, current_phase: int, phase_duration: float,
+                 lanes: LaneTable, lane_queues: np.ndarray, lane_waiting_times: np.ndarray,
+                 lane_vehicle_counts: np.ndarray, directional_flow: Optional[Dict[str, float]] = None,
+                 emergency_vehicles: Optional[List[str]] = None, pedestrian_waiting: int = 0):
+        self.timestamp = timestamp
+        self.vehicle_count = vehicle_count
+        self.waiting_vehicles = waiting_vehicles
+        self.avg_waiting_time = avg_waiting_time
+        self.avg_speed = avg_speed
+        self.queue_length = queue_length
+        self.current_phase = current_phase
+        self.phase_duration = phase_duration
+        self.lanes = lanes
+        self.lane_queues = lane_queues
+        self.lane_waiting_times = lane_waiting_times
+        self.lane_vehicle_counts = lane_vehicle_counts
+        self.directional_flow = directional_flow
+        self.emergency_vehicles = emergency_vehicles if emergency_vehicles is not None else []
+        self.pedestrian_waiting = pedestrian_waiting
+
+    @property
+    def per_lane_queues(self) -> LaneMap:
+        return LaneMap(self.lanes, self.lane_queues)
+
+    @property
+    def per_lane_waiting_times(self) -> LaneMap:
+        return LaneMap(self.lanes, self.lane_waiting_times)
+
+    @property
+    def per_lane_vehicle_counts(self) -> LaneMap:
+        return LaneMap(self.lanes, self.lane_vehicle_counts)
+
+    @property
+    def congestion_per_lane(self) -> LaneMap:
+        codes = np.searchsorted(_CONGESTION_BOUNDS, self.lane_queues, side="left").astype(np.int8)
+        return LaneMap(self.lanes, codes, CONGESTION_LEVELS)
+
+    @property
+    def signal_phase_timing(self) -> Dict[str, float]:
+        return {"remaining": self.phase_duration}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Field dict of the equivalent ``TrafficState``"""
+        return {
+            "timestamp": self.timestamp,
+            "vehicle_count": self.vehicle_count,
+            "waiting_vehicles": self.waiting_vehicles,
+            "avg_waiting_time": self.avg_waiting_time,
+            "avg_speed": self.avg_speed,
+            "queue_length": self.queue_length,
+            "current_phase": self.current_phase,
+            "phase_duration": self.phase_duration,
+            "per_lane_queues": self.per_lane_queues.to_dict(),
+            "per_lane_waiting_times": self.per_lane_waiting_times.to_dict(),
+            "per_lane_vehicle_counts": self.per_lane_vehicle_counts.to_dict(),
+            "directional_flow": self.directional_flow,
+            "signal_phase_timing": self.signal_phase_timing,
+            "congestion_per_lane": self.congestion_per_lane.to_dict(),
+            "emergency_vehicles": self.emergency_vehicles,
+            "pedestrian_waiting": self.pedestrian_waiting
+        }
@@ -2,6 +2,7 @@
 Configuration settings for the AI Traffic Management Dashboard
 """
 
+import os
 from pathlib import Path
 
 # Dashboard Configuration
@@ -15,6 +16,30 @@ DASHBOARD_CONFIG = {
 # File Paths
 DATA_DIR = Path(__file__).parents[1] / "data"
 DATA_FILE = DATA_DIR / "dashboard_data.json"
+RECORDINGS_DIR = DATA_DIR / "recordings"
+
+# Persistent snapshot history (Parquet chunks), off unless TRAFFIC_HISTORY_DIR names a directory
+# (e.g. data/history); nothing is ever deleted from it
+HISTORY_DIR = os.environ.get("TRAFFIC_HISTORY_DIR") or None
+
+# SQLite (WAL) database of per-step metrics with 10 s/1 min/15 min rollups, off unless
+# TRAFFIC_METRICS_DB names a file (e.g. data/metrics.sqlite3); it grows with every run
+METRICS_DB = os.environ.get("TRAFFIC_METRICS_DB") or None
+
+# Memory-mapped snapshot written by a local producer (see mmap_channel.py); read before DATA_FILE
+MMAP_SNAPSHOT_FILE = Path(os.environ.get("TRAFFIC_MMAP_SNAPSHOT", str(DATA_DIR / "dashboard_snapshot.bin")))
+
+# Simulation runner: "thread" (inside the Streamlit server) or "process" (worker process)
+SIMULATION_RUNNER = os.environ.get("TRAFFIC_SIM_RUNNER", "thread")
+
+# Live refresh: "fragment" (each data panel reruns on its own timer) or "rerun" (sleep + full-script rerun)
+LIVE_REFRESH_MODE = os.environ.get("TRAFFIC_LIVE_REFRESH", "fragment")
+
+# View navigation: "lazy" (only the selected view runs) or "tabs" (st.tabs, every view runs and is sent)
+NAVIGATION_MODE = os.environ.get("TRAFFIC_NAVIGATION", "lazy")
+
+# Bytes one live refresh may send to the browser; above it the refresh interval is stretched (0 = no budget)
+PAYLOAD_BUDGET_BYTES = int(os.environ.get("TRAFFIC_PAYLOAD_BUDGET", 0))
 
 # Refresh Settings
 DEFAULT_REFRESH_RATE = 1.0
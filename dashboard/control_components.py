@@ -5,8 +5,29 @@ Provides controls for starting, stopping, and managing the simulation
 
 import streamlit as st
 from typing import Dict, Any, Optional
+from datetime import datetime
 import time
 
+from config import RECORDINGS_DIR
+from recording import RECORDING_SUFFIX
+
+# Simulation speed choices; None steps as fast as possible
+SIMULATION_SPEEDS = {
+    "1x": 1.0,
+    "2x": 2.0,
+    "5x": 5.0,
+    "10x": 10.0,
+    "60x": 60.0,
+    "Max": None
+}
+
+# Keys of the simulation control widgets whose values outlive a hidden System Control view
+SIMULATION_CONTROL_KEYS = (
+    "scenario_select_main", "duration_input_main", "control_mode_select_main", "update_interval_slider_main",
+    "sim_speed_select_main", "step_interval_input_main", "observe_interval_input_main",
+    "decision_interval_input_main", "record_run_check", "auto_refresh_check", "manual_duration_input"
+)
+
 
 def simulation_control_panel(sumo_integration) -> Dict[str, Any]:
     """Render simulation control panel with start/stop/emergency controls"""
@@ -21,7 +42,7 @@ def simulation_control_panel(sumo_integration) -> Dict[str, Any]:
     status = sumo_integration.get_simulation_status()
     is_running = status["is_running"]
     
-    col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 2])
     
     with col1:
         # Scenario selection
@@ -70,13 +91,63 @@ def simulation_control_panel(sumo_integration) -> Dict[str, Any]:
             key="update_interval_slider_main"
         )
     
+    with col5:
+        # Simulation speed (decoupled from the dashboard update rate)
+        speed_label = st.selectbox(
+            "⏩ Sim Speed",
+            options=list(SIMULATION_SPEEDS.keys()),
+            index=0,
+            disabled=is_running,
+            help="Simulated seconds per real-time second; 'Max' steps as fast as possible",
+            key="sim_speed_select_main"
+        )
+        speed = SIMULATION_SPEEDS[speed_label]
+    
+    # Loop intervals (simulated seconds); expensive stages only run when due
+    with st.expander("⚙️ Loop Intervals", expanded=False):
+        icol1, icol2, icol3 = st.columns(3)
+        with icol1:
+            step_interval = st.number_input(
+                "Step (sim sec)", min_value=1, max_value=60, value=1, step=1, disabled=is_running,
+                help="Simulated seconds advanced per step call", key="step_interval_input_main"
+            )
+        with icol2:
+            observe_interval = st.number_input(
+                "Observe (sim sec)", min_value=1, max_value=300, value=1, step=1, disabled=is_running,
+                help="How often traffic state is sampled (rounded up to the step interval)",
+                key="observe_interval_input_main"
+            )
+        with icol3:
+            decision_interval = st.number_input(
+                "Decide (sim sec)", min_value=1, max_value=300, value=1, step=1, disabled=is_running,
+                help="How often the adaptive controller decides (rounded up to the observe interval)",
+                key="decision_interval_input_main"
+            )
+        record = st.checkbox(
+            "⏺️ Record run", value=False, disabled=is_running,
+            help=f"Save every observed step to {RECORDINGS_DIR.name}/ for replay", key="record_run_check"
+        )
+        loop_stats = status.get("loop_stats") or {}
+        if loop_stats.get("simulated_seconds"):
+            st.caption(" · ".join(
+                [f"Loop cost {loop_stats['ms_per_sim_second']:.2f} ms/sim-s"] +
+                [f"{stage} {stats['ms_per_sim_second']:.2f}" for stage, stats in loop_stats["stages"].items()]
+            ))
+    
     # Control buttons
     col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 2])
     
     with col1:
         if st.button("▶️ Start Simulation", disabled=is_running, type="primary", key="start_sim_btn"):
             with st.spinner("Starting simulation..."):
-                success = sumo_integration.start_simulation(scenario, duration, control_mode)
+                record_path = None
+                if record:
+                    record_path = str(RECORDINGS_DIR / f"{scenario}_{datetime.now():%Y%m%d_%H%M%S}{RECORDING_SUFFIX}")
+                success = sumo_integration.start_simulation(
+                    scenario, duration, control_mode, speed=speed, step_interval=int(step_interval),
+                    observe_interval=int(observe_interval), decision_interval=int(decision_interval),
+                    record_path=record_path
+                )
                 if success:
                     st.success("✅ Simulation started successfully!")
                     st.rerun()
@@ -119,6 +190,8 @@ def simulation_control_panel(sumo_integration) -> Dict[str, Any]:
         "duration": duration,
         "control_mode": control_mode,
         "update_interval": update_interval,
+        "speed": speed,
+        "intervals": {"step": step_interval, "observe": observe_interval, "decision": decision_interval},
         "auto_refresh": auto_refresh,
         "is_running": is_running
     }
@@ -229,6 +302,84 @@ def simulation_progress_indicator(data: Optional[Dict[str, Any]]):
         st.write(f"**Status:** {status_color} {status.title()}")
 
 
+def payload_panel(meter, budget: int, fragments: bool = True):
+    """Bytes sent to this browser by the last full run, per component, and by one live refresh"""
+    if not meter.available:
+        st.caption("Payload metering is unavailable with this Streamlit version")
+        return
+    run = meter.last_script_run()
+    if run is None:
+        st.caption("Measured from the next run on")
+        return
+    
+    refresh = meter.refresh_bytes(fragments)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Last full run", f"{run['bytes'] / 1024:.1f} KiB", f"{run['messages']} messages", delta_color="off")
+    col2.metric("Live refresh", f"{refresh / 1024:.1f} KiB")
+    if budget > 0:
+        stretch = meter.stretch(budget, fragments)
+        col3.metric("Refresh budget", f"{budget / 1024:.1f} KiB",
+                    f"interval x{stretch:.1f}" if stretch > 1 else "within budget",
+                    delta_color="inverse" if stretch > 1 else "normal")
+    else:
+        col3.metric("Refresh budget", "Off")
+    
+    components = sorted(run["components"].items(), key=lambda item: item[1], reverse=True)
+    st.dataframe(
+        [{"component": name, "KiB": round(nbytes / 1024, 1)} for name, nbytes in components],
+        use_container_width=True, hide_index=True
+    )
+
+
+def replay_panel():
+    """Sidebar controls for replaying a recording; returns the active replay source or None"""
+    from replay import ReplayIntegration
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 📼 Replay")
+    
+    recordings = sorted(RECORDINGS_DIR.glob(f"*{RECORDING_SUFFIX}"), reverse=True) if RECORDINGS_DIR.exists() else []
+    if not recordings:
+        st.sidebar.caption("No recordings yet - enable '⏺️ Record run' when starting a simulation")
+        return st.session_state.get("replay_source")
+    
+    path = st.sidebar.selectbox("Recording", options=recordings, format_func=lambda p: p.name, key="replay_file_select")
+    replay = st.session_state.get("replay_source") or st.session_state.get("replay_candidate")
+    if replay is None or replay.reader.path != str(path):
+        if replay is not None:
+            # Another recording was picked: stop the one playing and show live data until Play
+            replay.stop_simulation()
+            st.session_state.replay_source = None
+        try:
+            replay = st.session_state.replay_candidate = ReplayIntegration(path)
+        except (OSError, ValueError) as e:
+            st.sidebar.error(f"Cannot open recording: {e}")
+            return None
+    
+    reader = replay.reader
+    speed_label = st.sidebar.selectbox("Replay speed", options=list(SIMULATION_SPEEDS.keys()), index=3,
+                                       key="replay_speed_select")
+    start_time = st.sidebar.slider(
+        "Start at (sim sec)", min_value=float(reader.start_time), max_value=float(max(reader.end_time, reader.start_time + 1)),
+        value=float(reader.start_time), step=1.0, key="replay_start_slider"
+    )
+    
+    col1, col2 = st.sidebar.columns(2)
+    with col1:
+        if st.button("▶️ Play", key="replay_play_btn"):
+            replay.start_replay(SIMULATION_SPEEDS[speed_label], start_time)
+            st.session_state.replay_source = replay
+    with col2:
+        if st.button("⏹️ Live", key="replay_stop_btn"):
+            replay.stop_simulation()
+            st.session_state.replay_source = None
+            return None
+    
+    if st.session_state.get("replay_source") is not None:
+        st.sidebar.caption(f"Replaying {reader.frame_count} frames · at {replay.position:.0f}s")
+    return st.session_state.get("replay_source")
+
+
 def kill_switch_panel():
     """Emergency kill switch panel"""
     st.sidebar.markdown("---")
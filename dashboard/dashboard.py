@@ -1,16 +1,23 @@
-import json
 import streamlit as st
 import time
 
 # Import configuration
-from config import DASHBOARD_CONFIG, DATA_FILE
+from config import (
+    DASHBOARD_CONFIG, DATA_FILE, MMAP_SNAPSHOT_FILE, SIMULATION_RUNNER, HISTORY_DIR, METRICS_DB, LIVE_REFRESH_MODE,
+    PAYLOAD_BUDGET_BYTES
+)
 
 # Import modular components
 from styles import get_main_css
 from kpi_components import kpi_row
 from intersection_components import intersection_panel, intersection_map
-from analytics_components import time_series_panel
+from analytics_components import time_series_panel, history_panel, ANALYTICS_WIDGET_KEYS
 from video_components import video_panel
+from live_panels import live_panel, refresh_interval
+from navigation import render_views
+from data_sources import PUBLISH_STALE_AFTER, load_dashboard_data
+from payload_meter import payload_meter
+from markup import stylesheet
 from layout_components import (
     render_header, 
     render_sidebar, 
@@ -20,186 +27,202 @@ from layout_components import (
 )
 
 # Import SUMO integration components
-from sumo_integration import initialize_sumo_integration
+from sumo_integration import initialize_sumo_integration, get_simulation_hub
 from control_components import (
     simulation_control_panel,
     real_time_status_bar,
     simulation_progress_indicator,
-    kill_switch_panel
+    kill_switch_panel,
+    replay_panel,
+    payload_panel,
+    SIMULATION_CONTROL_KEYS
 )
 
 # Enhanced page configuration with dark theme
 st.set_page_config(**DASHBOARD_CONFIG)
 
-# Apply modern dark theme CSS
-st.markdown(get_main_css(), unsafe_allow_html=True)
-
-# Render modern header
-render_header()
-
-# Initialize SUMO integration
-sumo_integration = initialize_sumo_integration()
-
-def load_data():
-    """Load data from either SUMO simulation or fallback JSON file"""
-    # Try to get real-time data from SUMO first
-    sumo_data = sumo_integration.get_current_data()
-    if sumo_data:
-        # Flatten SUMO data to match expected format
-        flattened_data = flatten_sumo_data(sumo_data)
-        return flattened_data
-    
-    # Fallback to JSON file if SUMO is not running
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
-
-def flatten_sumo_data(sumo_data):
-    """Convert SUMO integration data to flat format expected by components"""
-    if not sumo_data:
-        return None
-    
-    kpi = sumo_data.get('kpi_data', {})
-    intersection = sumo_data.get('intersection_data', {})
-    
-    # Create flat structure matching original format
-    flat_data = {
-        # Basic metrics (flatten from kpi_data)
-        "avg_travel_time": kpi.get('avg_wait_time', 0.0),  # Use wait time as travel time approximation
-        "avg_wait_time": kpi.get('avg_wait_time', 0.0),
-        "vehicles_in_system": kpi.get('vehicle_count', 0),
-        "baseline_avg_travel_time": kpi.get('avg_wait_time', 0.0) * 1.2,  # Baseline 20% higher
-        
-        # Simulation info
-        "ts": sumo_data.get('simulation_time', 0),
-        "timestamp": sumo_data.get('timestamp', ''),
-        "status": sumo_data.get('status', 'stopped'),
+# Count the bytes this run sends, per component (see payload_meter.py)
+meter = payload_meter()
+
+# Everything the script sends is counted; the hook is removed when the run ends
+with meter.metering():
+    meter.begin_run()
+
+    # Apply modern dark theme CSS, minified (repeats are sent as cache references)
+    with meter.component("styles"):
+        stylesheet(get_main_css())
+
+    # Render modern header
+    with meter.component("header"):
+        render_header()
+
+    # Initialize SUMO integration
+    sumo_integration = initialize_sumo_integration(SIMULATION_RUNNER, HISTORY_DIR, METRICS_DB)
+
+    @st.cache_resource
+    def get_history_reader(history_dir):
+        """Read-only view of the persisted history (for out-of-process runners)"""
+        from history_store import HistoryStore
+        return HistoryStore(history_dir)
+
+    # The in-process store also serves rows not yet written to disk
+    history_store = getattr(sumo_integration, "history_store", None) or (get_history_reader(HISTORY_DIR) if HISTORY_DIR else None)
+
+    @st.cache_resource
+    def get_metrics_reader(metrics_db):
+        """Read connection to the SQLite metrics database (for out-of-process runners)"""
+        from sqlite_store import SQLiteMetricsStore
+        return SQLiteMetricsStore(metrics_db)
+
+    metrics_store = getattr(sumo_integration, "metrics_store", None) or (get_metrics_reader(METRICS_DB) if METRICS_DB else None)
+
+    @st.cache_resource
+    def get_file_reader(path):
+        """Shared reader of the file data source; re-parses only what changed"""
+        from file_source import DashboardFileReader
+        return DashboardFileReader(path)
+
+    @st.cache_resource
+    def get_mmap_reader(path):
+        """Shared reader of the memory-mapped producer snapshot"""
+        from mmap_channel import MmapSnapshotReader
+        return MmapSnapshotReader(path)
+
+    def read_producers():
+        """External producers in order of preference: memory-mapped snapshot, then the JSON file (and its update log)"""
+        return (
+            ("Memory-mapped producer", lambda: get_mmap_reader(MMAP_SNAPSHOT_FILE).read() if MMAP_SNAPSHOT_FILE.exists() else None),
+            ("JSON file", lambda: get_file_reader(DATA_FILE).read())
+        )
+
+    def load_data(source=None):
+        """Load data from a replay, the SUMO simulation, a local producer or the fallback JSON file"""
+        # A replay stays on screen while paused; the shared simulation gives way to the
+        # producers once it has stopped and gone quiet
+        return load_dashboard_data(source or sumo_integration, st.session_state, read_producers(),
+                                   stale_after=None if source is not None else PUBLISH_STALE_AFTER)
+
+    # Render modern sidebar with controls and simulation control
+    with meter.component("sidebar"):
+        refresh = render_sidebar(DATA_FILE)
         
-        # Intersection data
-        "selected_intersection": "intersection_1",
-        "intersections": {
-            "intersection_1": {
-                "current_phase": intersection.get('current_phase', 0),
-                "queues": [
-                    intersection.get('per_lane_queues', {}).get('lane_1', 3),
-                    intersection.get('per_lane_queues', {}).get('lane_2', 5),
-                    intersection.get('per_lane_queues', {}).get('lane_3', 4),
-                    intersection.get('per_lane_queues', {}).get('lane_4', 2)
-                ],
-                "name": intersection.get('phase_name', 'Main Intersection')
-            }
-        },
+        # Show kill switch in sidebar
+        emergency_stop = kill_switch_panel()
+        if emergency_stop:
+            sumo_integration.emergency_stop()
+            st.rerun()
         
-        # Time series (simplified for now)
-        "time_series": sumo_data.get('time_series_data', {
-            "t": [0],
-            "rl_avg_travel_time": [kpi.get('avg_wait_time', 0.0)],
-            "baseline_avg_travel_time": [kpi.get('avg_wait_time', 0.0) * 1.2]
-        }),
-        
-        # Additional data
-        "latest_frame_path": "",
-        "traffic_phases": {
-            "0": "North-South Green",
-            "1": "East-West Green", 
-            "2": "All Red (Transition)",
-            "3": "North-South Yellow",
-            "4": "East-West Yellow"
-        },
+        # Replay a recording instead of the live simulation when one is playing
+        replay_source = replay_panel()
+
+    # Load data (replay, real-time from SUMO or fallback JSON)
+    data = load_data(replay_source)
+    if not data:
+        render_data_loading_placeholder()
+        st.info("💡 **Tip:** Start a SUMO simulation for real-time data, or add sample data to dashboard_data.json")
+        st.stop()
+
+    def source_is_live():
+        """Whether the shown source is still producing new snapshots"""
+        return sumo_integration.is_running or (replay_source is not None and replay_source.is_running)
+
+    def load_live_data():
+        return load_data(replay_source)
+
+    # Data-bound panels refresh on their own timers (see live_panels.py)
+    live_interval = refresh_interval(source_is_live())
+
+    def status_and_kpis(d):
+        # Simulation progress indicator
+        simulation_progress_indicator(d)
+        st.markdown("---")
         
-        # Pass through the nested data for advanced components
-        "sumo_raw": sumo_data
-    }
-    
-    return flat_data
-
-# Render modern sidebar with controls and simulation control
-refresh = render_sidebar(DATA_FILE)
-
-# Show kill switch in sidebar
-emergency_stop = kill_switch_panel()
-if emergency_stop:
-    sumo_integration.emergency_stop()
-    st.rerun()
-
-# Load data (real-time from SUMO or fallback JSON)
-data = load_data()
-if not data:
-    render_data_loading_placeholder()
-    st.info("💡 **Tip:** Start a SUMO simulation for real-time data, or add sample data to dashboard_data.json")
-    st.stop()
-
-# Simulation progress indicator
-simulation_progress_indicator(data)
-st.markdown("---")
-
-# Modern KPI cards layout
-render_dashboard_card_wrapper(kpi_row, data)
-
-# Modern navigation tabs with CSS FontAwesome icons
-tab1, tab2, tab3, tab4 = st.tabs([
-    "Smart Traffic Control", 
-    "Live Camera Feeds", 
-    "AI Performance Analytics",
-    "System Control"
-])
-
-with tab1:
-    col1, col2 = st.columns([2, 1])
-    with col1:
+        # Modern KPI cards layout
+        render_dashboard_card_wrapper(kpi_row, d)
+
+    live_panel(status_and_kpis, load_live_data, live_interval, source_is_live)
+
+    # Modern navigation: only the selected view runs (see navigation.py)
+    def traffic_control_view():
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+            render_section_header("fa-map-marked-alt", "Live Intersection Map")
+            live_panel(intersection_map, load_live_data, live_interval, source_is_live)
+            st.markdown('</div>', unsafe_allow_html=True)
+        with col2:
+            st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+            render_section_header("fa-traffic-light", "Signal Control")
+            live_panel(intersection_panel, load_live_data, live_interval, source_is_live)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    def camera_feeds_view():
         st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-        render_section_header("fa-map-marked-alt", "Live Intersection Map")
-        intersection_map(data)
+        render_section_header("fa-video", "Traffic Camera Feeds")
+        video_panel(data)
         st.markdown('</div>', unsafe_allow_html=True)
-    with col2:
+
+    def analytics_view():
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        render_section_header("fa-chart-area", "AI Performance Analytics")
+        live_panel(lambda d: time_series_panel(d, metrics_store), load_live_data, live_interval, source_is_live,
+                   name="time_series_panel")
+        st.markdown('</div>', unsafe_allow_html=True)
+        
         st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-        render_section_header("fa-traffic-light", "Signal Control")
-        intersection_panel(data)
+        render_section_header("fa-database", "Stored History")
+        history_panel(history_store)
         st.markdown('</div>', unsafe_allow_html=True)
 
-with tab2:
-    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-    render_section_header("fa-video", "Traffic Camera Feeds")
-    video_panel(data)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-with tab3:
-    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-    render_section_header("fa-chart-area", "AI Performance Analytics")
-    time_series_panel(data)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-with tab4:
-    st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
-    render_section_header("fa-cogs", "System Control & Monitoring")
-    
-    # Detailed simulation control
-    st.markdown("### 🎮 Advanced Simulation Control")
-    control_config = simulation_control_panel(sumo_integration)
-    
-    st.markdown("### 📊 System Status")
-    status = sumo_integration.get_simulation_status()
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        st.json({
-            "simulation_state": status["simulation_state"],
-            "is_running": status["is_running"],
-            "available_scenarios": status["available_scenarios"]
-        })
-    
-    with col2:
-        if data:
+    def system_control_view():
+        st.markdown('<div class="dashboard-card">', unsafe_allow_html=True)
+        render_section_header("fa-cogs", "System Control & Monitoring")
+        
+        # Detailed simulation control
+        st.markdown("### 🎮 Advanced Simulation Control")
+        simulation_control_panel(sumo_integration)
+        
+        st.markdown("### 📊 System Status")
+        status = sumo_integration.get_simulation_status()
+        
+        col1, col2 = st.columns(2)
+        with col1:
             st.json({
-                "current_data_source": "SUMO Real-time" if sumo_integration.is_running else "JSON Fallback",
-                "last_update": data.get("timestamp", "Unknown"),
-                "data_keys": list(data.keys())
+                "simulation_state": status["simulation_state"],
+                "is_running": status["is_running"],
+                "available_scenarios": status["available_scenarios"],
+                "viewers": get_simulation_hub(SIMULATION_RUNNER, HISTORY_DIR, METRICS_DB).viewer_count
             })
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+        
+        with col2:
+            if data:
+                st.json({
+                    "current_data_source": "Replay" if replay_source else st.session_state.get("data_source"),
+                    "last_update": data.get("timestamp", "Unknown"),
+                    "data_keys": list(data.keys())
+                })
+        
+        st.markdown("### 📦 Browser Payload")
+        payload_panel(meter, PAYLOAD_BUDGET_BYTES, LIVE_REFRESH_MODE == "fragment")
+        
+        st.markdown('</div>', unsafe_allow_html=True)
 
-# Auto-refresh functionality
-if 'control_config' in locals() and control_config.get("auto_refresh", True) and control_config.get("is_running", False):
-    time.sleep(control_config.get("update_interval", 1.0))
-    st.rerun()
+    render_views(
+        {
+            "Smart Traffic Control": traffic_control_view,
+            "Live Camera Feeds": camera_feeds_view,
+            "AI Performance Analytics": analytics_view,
+            "System Control": system_control_view
+        },
+        key="dashboard_view",
+        keep={
+            "AI Performance Analytics": ANALYTICS_WIDGET_KEYS,
+            "System Control": SIMULATION_CONTROL_KEYS
+        }
+    )
+
+    # Full-script auto-refresh (only when panels are not refreshed as fragments); the
+    # interval comes from the control widgets' state, which is kept while their view is hidden
+    if LIVE_REFRESH_MODE != "fragment" and live_interval:
+        time.sleep(live_interval)
+        st.rerun()
@@ -0,0 +1,136 @@
+"""
+Data Sources
+Picks the dashboard data: the in-process simulation, a local producer or the default snapshot
+"""
+
+import time
+from typing import Any, Callable, Dict, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Source names shown in the System Control view
+IN_PROCESS_SOURCE = "SUMO Real-time"
+DEFAULT_SOURCE = "No data (defaults)"
+
+# Seconds a stopped simulation's last snapshot keeps precedence over external producers
+PUBLISH_STALE_AFTER = 5.0
+
+
+def load_dashboard_data(source, state: MutableMapping[str, Any],
+                        producers: Sequence[Tuple[str, Callable[[], Optional[Dict[str, Any]]]]] = (),
+                        stale_after: Optional[float] = PUBLISH_STALE_AFTER) -> Optional[Dict[str, Any]]:
+    """Data from ``source`` while it runs or has published recently, else from the first producer with data.
+
+    ``state`` (the session state) caches the last flattened snapshot per
+    source version and records the name of the source used under
+    ``data_source``. ``producers`` are ``(name, read)`` pairs for external
+    writers such as ``sim/writer_dummy.py``. A stopped source whose last
+    publish is older than ``stale_after`` seconds gives way to them (``None``
+    keeps it, e.g. for a paused replay); when no producer has data the
+    source's last or default snapshot is shown.
+    """
+    # Reuse the last flattened snapshot when no newer version has been
+    # published by the same source
+    if state.get("snapshot_source") != id(source):
+        state["snapshot_source"] = id(source)
+        state["snapshot_version"] = None
+    snapshot = source.get_snapshot(since_version=state.get("snapshot_version"))
+    if snapshot is not None:
+        state["snapshot_version"] = snapshot.version
+        state["snapshot_published_at"] = snapshot.published_at
+        state["flat_snapshot"] = flatten_sumo_data(snapshot.data)
+    published = state.get("snapshot_version") is not None
+    if published and (source.is_running or stale_after is None
+                      or time.time() - state["snapshot_published_at"] <= stale_after):
+        state["data_source"] = IN_PROCESS_SOURCE
+        return state["flat_snapshot"]
+    
+    # A starting simulation shows its defaults; an idle one that never
+    # published, or stopped a while ago, leaves the dashboard to the
+    # external producers
+    if not source.is_running:
+        for name, read in producers:
+            data = read()
+            if data:
+                state["data_source"] = name
+                return data
+    if published:
+        state["data_source"] = IN_PROCESS_SOURCE
+        return state["flat_snapshot"]
+    state["data_source"] = IN_PROCESS_SOURCE if source.is_running else DEFAULT_SOURCE
+    return flatten_sumo_data(source.get_current_data())
+
+
+def flatten_sumo_data(sumo_data):
+    """Convert SUMO integration data to flat format expected by components"""
+    if not sumo_data:
+        return None
+    
+    kpi = sumo_data.get('kpi_data', {})
+    intersection = sumo_data.get('intersection_data', {})
+    
+    # Time series read directly from the history ring buffer views
+    history = sumo_data.get('time_series_data') or {}
+    times = history.get('simulation_times')
+    if times is not None and len(times):
+        wait_times = np.asarray(history['wait_times'])
+        time_series = {
+            **history,
+            "t": times,
+            "rl_avg_travel_time": wait_times,
+            "baseline_avg_travel_time": wait_times * 1.2  # Baseline 20% higher
+        }
+    else:
+        time_series = {
+            "t": [0],
+            "rl_avg_travel_time": [kpi.get('avg_wait_time', 0.0)],
+            "baseline_avg_travel_time": [kpi.get('avg_wait_time', 0.0) * 1.2]
+        }
+    
+    # Create flat structure matching original format
+    flat_data = {
+        # Basic metrics (flatten from kpi_data)
+        "avg_travel_time": kpi.get('avg_wait_time', 0.0),  # Use wait time as travel time approximation
+        "avg_wait_time": kpi.get('avg_wait_time', 0.0),
+        "vehicles_in_system": kpi.get('vehicle_count', 0),
+        "baseline_avg_travel_time": kpi.get('avg_wait_time', 0.0) * 1.2,  # Baseline 20% higher
+        
+        # Simulation info
+        "ts": sumo_data.get('simulation_time', 0),
+        "timestamp": sumo_data.get('timestamp', ''),
+        "status": sumo_data.get('status', 'stopped'),
+        "run_id": sumo_data.get('run_id'),
+        
+        # Intersection data
+        "selected_intersection": "intersection_1",
+        "intersections": {
+            "intersection_1": {
+                "current_phase": intersection.get('current_phase', 0),
+                "queues": [
+                    intersection.get('per_lane_queues', {}).get('lane_1', 3),
+                    intersection.get('per_lane_queues', {}).get('lane_2', 5),
+                    intersection.get('per_lane_queues', {}).get('lane_3', 4),
+                    intersection.get('per_lane_queues', {}).get('lane_4', 2)
+                ],
+                "name": intersection.get('phase_name', 'Main Intersection')
+            }
+        },
+        
+        # Time series (full run history)
+        "time_series": time_series,
+        
+        # Additional data
+        "latest_frame_path": "",
+        "traffic_phases": {
+            "0": "North-South Green",
+            "1": "East-West Green", 
+            "2": "All Red (Transition)",
+            "3": "North-South Yellow",
+            "4": "East-West Yellow"
+        },
+        
+        # Pass through the nested data for advanced components
+        "sumo_raw": sumo_data
+    }
+    
+    return flat_data
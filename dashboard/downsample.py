@@ -0,0 +1,135 @@
+"""
+Downsample
+Point-budgeted time-series downsampling (LTTB, min-max per bucket) and WebGL line traces
+"""
+
+import os
+from typing import Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Points sent per trace; about two per horizontal pixel of a full-width chart
+DEFAULT_POINT_BUDGET = int(os.environ.get("TRAFFIC_CHART_POINTS", 2000))
+
+# Traces with more points than this are drawn as WebGL ``Scattergl`` without markers or splines
+WEBGL_THRESHOLD = 1000
+
+# ``auto`` pre-selects this many points per output point with min-max before running LTTB
+MINMAX_RATIO = 4
+
+DOWNSAMPLE_METHODS = ("auto", "lttb", "minmax")
+
+
+def _numeric_x(x: np.ndarray) -> np.ndarray:
+    """``x`` as float64 for area computations: datetimes as ns, non-numeric as positions"""
+    if np.issubdtype(x.dtype, np.datetime64) or np.issubdtype(x.dtype, np.timedelta64):
+        return x.astype("int64").astype(np.float64)
+    if np.issubdtype(x.dtype, np.number) or x.dtype == bool:
+        return x.astype(np.float64)
+    return np.arange(len(x), dtype=np.float64)
+
+
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    return np.linspace(0, n, buckets + 1).astype(np.int64)
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the minimum and maximum of ``y`` per bucket plus both ends, at most ``n_out``, in order.
+
+    Keeps every spike, which makes it the right choice for peak-sensitive
+    metrics such as queue lengths; ``y`` must not contain NaN.
+    """
+    n = len(y)
+    buckets = max(1, (n_out - 2) // 2)
+    if n <= n_out:
+        return np.arange(n)
+    # Equal buckets as rows; the padding repeats the last value so it never wins over a real point
+    size = -(-n // buckets)
+    buckets = -(-n // size)
+    rows = y if n == buckets * size else np.concatenate([y, np.full(buckets * size - n, y[-1])])
+    rows = rows.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    kept = [offsets + rows.argmin(axis=1), offsets + rows.argmax(axis=1), [0, n - 1]]
+    return np.unique(np.concatenate(kept))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices chosen by Largest-Triangle-Three-Buckets, always keeping the first and last point.
+
+    Each bucket keeps the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket, so the line
+    keeps its visual shape; ``x`` and ``y`` must not contain NaN.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = 1 + _bucket_edges(n - 2, n_out - 2)
+    # Mean point of every bucket, plus the last point as the final "next bucket"
+    sums_x = np.add.reduceat(x[1:-1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:-1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y[-1])
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        area = np.abs((ax - mean_x[bucket + 1]) * (y[start:stop] - ay)
+                      - (ax - x[start:stop]) * (mean_y[bucket + 1] - ay))
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(x, y, budget: int = DEFAULT_POINT_BUDGET, method: str = "auto") -> Tuple[np.ndarray, np.ndarray]:
+    """At most ``budget`` points of the series ``(x, y)``, in order.
+
+    ``lttb`` preserves the shape of the line, ``minmax`` every extreme, and
+    ``auto`` runs min-max down to ``MINMAX_RATIO * budget`` points before
+    LTTB, which keeps long inputs fast. Points whose ``y`` is NaN are
+    dropped; series within the budget come back unchanged.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r}, expected one of {DOWNSAMPLE_METHODS}")
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= budget:
+        return x, y
+    valid = ~np.isnan(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+        if len(y) <= budget:
+            return x, y
+
+    if method == "minmax":
+        kept = minmax_indices(y, budget)
+    else:
+        kept = np.arange(len(y))
+        if method == "auto" and len(y) > MINMAX_RATIO * budget:
+            kept = minmax_indices(y, MINMAX_RATIO * budget)
+        kept = kept[lttb_indices(_numeric_x(x[kept]), y[kept], budget)]
+    return x[kept], y[kept]
+
+
+def line_trace(x, y, budget: int = DEFAULT_POINT_BUDGET, method: str = "auto", **kwargs) -> go.Scatter:
+    """Scatter trace of ``(x, y)`` downsampled to ``budget`` points.
+
+    Above ``WEBGL_THRESHOLD`` points the trace becomes a ``Scattergl`` with
+    plain lines: markers are dropped and splines straightened, since neither
+    is legible at that density and both are slow to draw.
+    """
+    x, y = downsample(x, y, budget, method)
+    if len(y) <= WEBGL_THRESHOLD:
+        return go.Scatter(x=x, y=y, **kwargs)
+
+    kwargs["mode"] = "lines"
+    kwargs.pop("marker", None)
+    line = dict(kwargs.get("line") or {})
+    line.pop("shape", None)
+    if line:
+        kwargs["line"] = line
+    return go.Scattergl(x=x, y=y, **kwargs)
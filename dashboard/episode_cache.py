@@ -0,0 +1,227 @@
+"""
+Episode Cache
+Content-addressed on-disk cache of simulated RL episodes, shared by every server process
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ pyarrow not available, episode cache disabled: {e}")
+    PYARROW_AVAILABLE = False
+
+# Least recently used entries are evicted once the cache exceeds this size
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Part of every key; bump when the episode columns change so old entries are ignored
+CACHE_FORMAT = 2
+
+ENTRY_SUFFIX = ".parquet"
+
+# Rows per batch when streaming a cached episode back
+DEFAULT_READ_ROWS = 1000
+
+# Model digests by (path, inode, mtime, size), so unchanged files are hashed once per process
+_DIGESTS: Dict[Tuple[str, int, int, int], str] = {}
+_DIGESTS_LOCK = threading.Lock()
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents; raises FileNotFoundError if it does not exist"""
+    path = Path(path)
+    stat = path.stat()
+    stamp = (str(path.resolve()), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _DIGESTS_LOCK:
+        digest = _DIGESTS.get(stamp)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        with _DIGESTS_LOCK:
+            _DIGESTS[stamp] = digest
+    return digest
+
+
+def code_digest(*functions: Callable) -> str:
+    """SHA-256 over the source files defining ``functions``, so a changed episode API gets new keys"""
+    sha = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(function) for function in functions} - {None}):
+        sha.update(file_digest(path).encode())
+    return sha.hexdigest()
+
+
+def episode_key(model_digest: str, max_steps: int, scenario: Optional[str] = None, seed: Optional[int] = None,
+                **params) -> str:
+    """Cache key of one episode: the model's content plus everything that shapes the run
+    (including the ``code_digest`` of the functions producing it)"""
+    payload = {"format": CACHE_FORMAT, "model": model_digest, "max_steps": int(max_steps),
+               "scenario": scenario, "seed": seed, **params}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class EpisodeCache:
+    """Episode DataFrames stored as one Parquet file per key.
+
+    Entries are written to a temp file and renamed into place, so any
+    number of processes can share a directory and readers never see a
+    partial file. A hit touches the file's mtime, which is what LRU
+    eviction orders by; storing an entry evicts the oldest ones until
+    the directory fits ``max_bytes``. Two processes missing the same key at
+    once both compute it and the last rename wins, which is harmless since
+    the results are identical.
+    """
+
+    def __init__(self, root, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Cached episode, or None on a miss"""
+        if not PYARROW_AVAILABLE:
+            return None
+        path = self.path_for(key)
+        try:
+            df = pq.read_table(path).to_pandas()
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"⚠️ Dropping unreadable episode cache entry {path.name}: {e}")
+            self._unlink(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another process after we read it
+            pass
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        if not PYARROW_AVAILABLE:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp_path = self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        df = self.get(key)
+        if df is None:
+            df = compute()
+            self.put(key, df)
+        return df
+
+    def iter_batches(self, key: str, batch_rows: int = DEFAULT_READ_ROWS) -> Optional[Iterator[pd.DataFrame]]:
+        """Cached episode as a stream of DataFrames, or None on a miss"""
+        if not PYARROW_AVAILABLE:
+            return None
+        path = self.path_for(key)
+        try:
+            parquet = pq.ParquetFile(path)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"⚠️ Dropping unreadable episode cache entry {path.name}: {e}")
+            self._unlink(path)
+            return None
+        return (batch.to_pandas() for batch in parquet.iter_batches(batch_size=batch_rows))
+
+    def write_through(self, key: str, batches: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Yield ``batches`` while appending them to a new entry.
+
+        The entry is published only once the stream is exhausted; an
+        abandoned stream (e.g. a Streamlit rerun) leaves nothing behind.
+        Batches whose columns do not fit the first batch's schema stop the
+        caching, not the stream.
+        """
+        if not PYARROW_AVAILABLE:
+            yield from batches
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        writer = None
+        caching = True
+        try:
+            for batch in batches:
+                if caching:
+                    try:
+                        if writer is None:
+                            table = pa.Table.from_pandas(batch, preserve_index=False)
+                            writer = pq.ParquetWriter(tmp_path, table.schema)
+                        else:
+                            table = pa.Table.from_pandas(batch, schema=writer.schema, preserve_index=False)
+                        writer.write_table(table)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError) as e:
+                        print(f"⚠️ Not caching episode {key[:12]}: {e}")
+                        caching = False
+                yield batch
+            if writer is not None and caching:
+                writer.close()
+                writer = None
+                os.replace(tmp_path, self.path_for(key))
+                self.evict()
+        finally:
+            if writer is not None:
+                writer.close()
+            self._unlink(tmp_path)
+
+    def stream(self, key: str, produce: Callable[[], Iterable[pd.DataFrame]],
+               batch_rows: int = DEFAULT_READ_ROWS) -> Iterator[pd.DataFrame]:
+        """Cached batches on a hit, else ``produce()`` written through to the cache.
+
+        ``produce`` is called before returning, so its setup errors (a
+        missing model) surface here rather than on the first batch.
+        """
+        cached = self.iter_batches(key, batch_rows)
+        if cached is not None:
+            return cached
+        return self.write_through(key, produce())
+
+    def entries(self):
+        """(path, size, mtime) of every entry, least recently used first"""
+        entries = []
+        for path in self.root.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime_ns))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits ``max_bytes`` (the newest always stays)"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
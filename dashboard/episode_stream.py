@@ -0,0 +1,194 @@
+"""
+Episode Stream
+Bounded running aggregates of a streamed RL episode for progressive rendering
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Steps kept for the time-series charts; the sampling stride doubles beyond this
+DEFAULT_CHART_POINTS = 5000
+
+# Most recent raw rows kept for the episode data table
+DEFAULT_TAIL_ROWS = 10_000
+
+# Columns averaged per action and per junction
+AGGREGATE_COLUMNS = ("reward", "avg_wait_time", "queue_length")
+
+
+def _numeric(batch: pd.DataFrame, column: str) -> Optional[np.ndarray]:
+    if column not in batch.columns:
+        return None
+    return pd.to_numeric(batch[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _group_sums(keys: pd.Series, values: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Per-key row counts plus sums and non-NaN counts of ``values`` (NaN keys are skipped)"""
+    codes, uniques = pd.factorize(keys)
+    keep = codes >= 0
+    codes = codes[keep]
+    sums = {"rows": np.bincount(codes, minlength=len(uniques))}
+    for column, array in values.items():
+        array = array[keep]
+        valid = ~np.isnan(array)
+        sums[f"{column}_sum"] = np.bincount(codes, weights=np.where(valid, array, 0.0), minlength=len(uniques))
+        sums[f"{column}_count"] = np.bincount(codes, weights=valid, minlength=len(uniques))
+    return pd.DataFrame(sums, index=pd.Index(uniques, name=keys.name))
+
+
+class EpisodeAccumulator:
+    """Folds the row batches of an episode into what the demo page shows.
+
+    Memory stays bounded however long the episode runs: the KPIs and the
+    per-action / per-junction means are running sums, the chart series keep
+    every ``stride``-th step (the stride doubles whenever more than
+    ``chart_points`` steps are held), and only the last ``tail_rows`` raw
+    rows are kept for the table. Episodes with several rows per step (one
+    per junction) are charted as per-step means; batches must hold whole
+    steps.
+    """
+
+    def __init__(self, chart_points: int = DEFAULT_CHART_POINTS, tail_rows: int = DEFAULT_TAIL_ROWS):
+        self.chart_points = chart_points
+        self.tail_rows = tail_rows
+        self.steps = 0
+        self.rows = 0
+        self.stride = 1
+        self.columns: List[str] = []
+        self._samples: List[pd.DataFrame] = []
+        self._sample_rows = 0
+        self._tail: List[pd.DataFrame] = []
+        self._tail_count = 0
+        self._totals = {column: [0.0, 0] for column in AGGREGATE_COLUMNS}
+        self._peak_queue: Optional[float] = None
+        self._by_action: Optional[pd.DataFrame] = None
+        self._by_junction: Optional[pd.DataFrame] = None
+
+    def add(self, batch: pd.DataFrame):
+        if batch.empty:
+            return
+        batch = batch.reset_index(drop=True)
+        batch.index += self.rows
+        if not self.columns:
+            self.columns = list(batch.columns)
+
+        values = {column: _numeric(batch, column) for column in AGGREGATE_COLUMNS}
+        values = {column: array for column, array in values.items() if array is not None}
+        for column, array in values.items():
+            valid = ~np.isnan(array)
+            self._totals[column][0] += float(array[valid].sum())
+            self._totals[column][1] += int(valid.sum())
+        queue = values.get("queue_length")
+        if queue is not None and not np.isnan(queue).all():
+            peak = float(np.nanmax(queue))
+            self._peak_queue = peak if self._peak_queue is None else max(self._peak_queue, peak)
+
+        if "action" in batch.columns:
+            self._by_action = self._fold(self._by_action, _group_sums(batch["action"], values))
+        if "junction_id" in batch.columns and batch["junction_id"].notna().any():
+            self._by_junction = self._fold(self._by_junction, _group_sums(batch["junction_id"], values))
+
+        steps = self._per_step(batch)
+        steps = steps.set_axis(pd.RangeIndex(self.steps, self.steps + len(steps)))
+        self._sample(steps)
+        self._tail.append(batch)
+        self._tail_count += len(batch)
+        if self._tail_count > 2 * self.tail_rows:
+            self._tail = [pd.concat(self._tail).iloc[-self.tail_rows:]]
+            self._tail_count = len(self._tail[0])
+        self.steps += len(steps)
+        self.rows += len(batch)
+
+    @staticmethod
+    def _per_step(batch: pd.DataFrame) -> pd.DataFrame:
+        """One row per step: numeric columns averaged over the step's rows, others taken from the first"""
+        if "time" not in batch.columns:
+            return batch
+        codes, uniques = pd.factorize(batch["time"])
+        if len(uniques) == len(batch):
+            return batch
+        first = np.unique(codes, return_index=True)[1]
+        steps = batch.iloc[first].reset_index(drop=True)
+        for column in batch.columns:
+            if column in ("time", "action") or not pd.api.types.is_numeric_dtype(batch[column]):
+                continue
+            values = batch[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(values)
+            counts = np.bincount(codes, weights=valid)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                steps[column] = np.bincount(codes, weights=np.where(valid, values, 0.0)) / counts
+        return steps
+
+    @staticmethod
+    def _fold(running: Optional[pd.DataFrame], batch: pd.DataFrame) -> pd.DataFrame:
+        """Add one batch's per-group sums and counts to the running ones"""
+        return batch if running is None else running.add(batch, fill_value=0)
+
+    def _sample(self, batch: pd.DataFrame):
+        self._samples.append(batch[batch.index % self.stride == 0])
+        self._sample_rows += len(self._samples[-1])
+        while self._sample_rows > self.chart_points:
+            self.stride *= 2
+            samples = pd.concat(self._samples)
+            samples = samples[samples.index % self.stride == 0]
+            self._samples = [samples]
+            self._sample_rows = len(samples)
+
+    # Views
+
+    def _mean(self, column: str) -> float:
+        total, count = self._totals[column]
+        return total / count if count else 0.0
+
+    def kpis(self) -> Dict[str, Any]:
+        """Same keys as ``compute_kpis`` on the full episode"""
+        return {
+            "avg_reward": self._mean("reward"),
+            "avg_wait_time": self._mean("avg_wait_time"),
+            "peak_queue_length": int(self._peak_queue) if self._peak_queue is not None else 0,
+            "unique_actions": len(self._by_action) if self._by_action is not None else 0,
+            "steps_simulated": self.steps
+        }
+
+    def chart_frame(self) -> pd.DataFrame:
+        """Every ``stride``-th step of the episode, at most ``chart_points`` rows"""
+        if not self._samples:
+            return pd.DataFrame(columns=self.columns)
+        if len(self._samples) > 1:
+            self._samples = [pd.concat(self._samples)]
+        return self._samples[0]
+
+    def tail(self) -> pd.DataFrame:
+        """The last ``tail_rows`` raw rows"""
+        if not self._tail:
+            return pd.DataFrame(columns=self.columns)
+        if len(self._tail) > 1:
+            self._tail = [pd.concat(self._tail)]
+        return self._tail[0].iloc[-self.tail_rows:]
+
+    def action_counts(self) -> pd.Series:
+        if self._by_action is None:
+            return pd.Series(dtype="int64")
+        return self._by_action["rows"].astype("int64").rename("count").sort_index()
+
+    @staticmethod
+    def _means(running: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if running is None:
+            return pd.DataFrame(columns=list(AGGREGATE_COLUMNS))
+        columns = [column for column in AGGREGATE_COLUMNS if f"{column}_sum" in running.columns]
+        return pd.DataFrame({
+            column: running[f"{column}_sum"] / running[f"{column}_count"].where(running[f"{column}_count"] > 0)
+            for column in columns
+        }).sort_index()
+
+    def action_aggregates(self) -> pd.DataFrame:
+        """Mean reward, wait and queue per action over the whole episode"""
+        return self._means(self._by_action).round(2)
+
+    def junction_stats(self) -> pd.DataFrame:
+        """Mean wait and queue per junction over the whole episode"""
+        means = self._means(self._by_junction)
+        return means[[column for column in ("avg_wait_time", "queue_length") if column in means]].rename_axis(
+            "junction_id").reset_index()
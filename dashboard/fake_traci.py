@@ -0,0 +1,191 @@
+"""
+Fake TraCI
+In-process stand-in for the traci module's subscription API, for running the collector without SUMO
+"""
+
+import random
+from typing import Any, Dict, Iterable, List, Optional
+
+from traci_collector import (
+    LAST_STEP_VEHICLE_NUMBER, LAST_STEP_MEAN_SPEED, LAST_STEP_VEHICLE_HALTING_NUMBER,
+    VAR_WAITING_TIME, VAR_SPEED, VAR_TIME,
+    TL_RED_YELLOW_GREEN_STATE, TL_CURRENT_PHASE, TL_NEXT_SWITCH
+)
+
+# Approaches of the single fake intersection and the phase that serves them
+APPROACHES = ("N", "E", "S", "W")
+GREEN_APPROACHES = {0: ("N", "S"), 2: ("E", "W")}
+YELLOW_APPROACHES = {1: ("N", "S"), 3: ("E", "W")}
+PHASE_DURATIONS = (30.0, 3.0, 30.0, 3.0)
+
+# Seconds from arrival to the stop line, and cruise speed (m/s)
+APPROACH_TIME = 5
+CRUISE_SPEED = 13.9
+
+
+class _Domain:
+    """Subscription bookkeeping shared by all fake TraCI domains"""
+
+    def __init__(self, sim: "FakeTraci"):
+        self._sim = sim
+        self._subscriptions: Dict[str, tuple] = {}
+        self._results: Dict[str, Dict[int, Any]] = {}
+
+    def _value(self, object_id: str, variable: int) -> Any:
+        raise NotImplementedError
+
+    def subscribe(self, objectID: str = "", varIDs: Iterable[int] = ()):
+        self._sim.round_trips += 1
+        self._subscriptions[objectID] = tuple(varIDs)
+        self._refresh(objectID)
+
+    def _refresh(self, object_id: str):
+        self._results[object_id] = {var: self._value(object_id, var) for var in self._subscriptions[object_id]}
+
+    def _refresh_all(self):
+        for object_id in self._subscriptions:
+            self._refresh(object_id)
+
+    def getSubscriptionResults(self, objectID: str = "") -> Dict[int, Any]:
+        return self._results.get(objectID, {})
+
+    def getAllSubscriptionResults(self) -> Dict[str, Dict[int, Any]]:
+        return self._results
+
+
+class _LaneDomain(_Domain):
+    def getIDList(self) -> List[str]:
+        self._sim.round_trips += 1
+        return list(self._sim.lane_ids) + [":center_0_0"]
+
+    def _value(self, lane_id, variable):
+        vehicles = [v for v in self._sim.vehicles.values() if v["lane"] == lane_id]
+        if variable == LAST_STEP_VEHICLE_NUMBER:
+            return len(vehicles)
+        if variable == LAST_STEP_VEHICLE_HALTING_NUMBER:
+            return sum(1 for v in vehicles if v["speed"] < 0.1)
+        if variable == LAST_STEP_MEAN_SPEED:
+            return sum(v["speed"] for v in vehicles) / len(vehicles) if vehicles else CRUISE_SPEED
+        if variable == VAR_WAITING_TIME:
+            return sum(v["waiting"] for v in vehicles)
+        raise ValueError(f"Unsupported lane variable {variable:#x}")
+
+
+class _VehicleDomain(_Domain):
+    def _value(self, vehicle_id, variable):
+        vehicle = self._sim.vehicles[vehicle_id]
+        if variable == VAR_SPEED:
+            return vehicle["speed"]
+        if variable == VAR_WAITING_TIME:
+            return vehicle["waiting"]
+        raise ValueError(f"Unsupported vehicle variable {variable:#x}")
+
+
+class _TrafficLightDomain(_Domain):
+    def getIDList(self) -> List[str]:
+        self._sim.round_trips += 1
+        return [self._sim.tls_id]
+
+    def _value(self, tls_id, variable):
+        if variable == TL_RED_YELLOW_GREEN_STATE:
+            return self._sim.signal_state()
+        if variable == TL_CURRENT_PHASE:
+            return self._sim.phase
+        if variable == TL_NEXT_SWITCH:
+            return self._sim.next_switch
+        raise ValueError(f"Unsupported traffic light variable {variable:#x}")
+
+
+class _JunctionDomain(_Domain):
+    def subscribeContext(self, objectID: str, domain: int, dist: float, varIDs: Iterable[int] = ()):
+        self._sim.round_trips += 1
+        self._subscriptions[objectID] = tuple(varIDs)
+        self._refresh(objectID)
+
+    def _refresh(self, object_id):
+        variables = self._subscriptions[object_id]
+        vehicle = self._sim.vehicle
+        self._results[object_id] = {
+            vehicle_id: {var: vehicle._value(vehicle_id, var) for var in variables}
+            for vehicle_id in self._sim.vehicles
+        }
+
+    def getContextSubscriptionResults(self, objectID: str) -> Dict[str, Dict[int, Any]]:
+        return self._results.get(objectID, {})
+
+
+class _SimulationDomain(_Domain):
+    def subscribe(self, varIDs: Iterable[int] = ()):
+        # traci.simulation subscribes without an object id
+        super().subscribe("", varIDs)
+
+    def _value(self, object_id, variable):
+        if variable == VAR_TIME:
+            return self._sim.time
+        raise ValueError(f"Unsupported simulation variable {variable:#x}")
+
+
+class FakeTraci:
+    """Single four-way intersection with a fixed-time signal and random arrivals.
+
+    Exposes the ``lane``, ``vehicle``, ``trafficlight``, ``junction`` and
+    ``simulation`` domains used by ``SubscriptionStateCollector`` and counts
+    every simulated client/server exchange in ``round_trips``.
+    """
+
+    def __init__(self, lanes_per_approach: int = 2, arrival_rate: float = 0.2, seed: Optional[int] = 0,
+                 tls_id: str = "center"):
+        self.rng = random.Random(seed)
+        self.arrival_rate = arrival_rate
+        self.tls_id = tls_id
+        self.lane_ids = [f"{a}_in_{i}" for a in APPROACHES for i in range(lanes_per_approach)]
+        self.time = 0.0
+        self.phase = 0
+        self.next_switch = PHASE_DURATIONS[0]
+        self.vehicles: Dict[str, Dict[str, Any]] = {}
+        self.round_trips = 0
+        self._next_vehicle = 0
+
+        self.lane = _LaneDomain(self)
+        self.vehicle = _VehicleDomain(self)
+        self.trafficlight = _TrafficLightDomain(self)
+        self.junction = _JunctionDomain(self)
+        self.simulation = _SimulationDomain(self)
+
+    def signal_state(self) -> str:
+        green = GREEN_APPROACHES.get(self.phase, ())
+        yellow = YELLOW_APPROACHES.get(self.phase, ())
+        return "".join("G" if lane[0] in green else "y" if lane[0] in yellow else "r" for lane in self.lane_ids)
+
+    def simulationStep(self, step: float = 0.0):
+        """Advance one second and push fresh subscription results"""
+        self.round_trips += 1
+        self.time += 1.0
+        if self.time >= self.next_switch:
+            self.phase = (self.phase + 1) % len(PHASE_DURATIONS)
+            self.next_switch = self.time + PHASE_DURATIONS[self.phase]
+
+        green = GREEN_APPROACHES.get(self.phase, ())
+        departed = set()
+        for vehicle_id, vehicle in self.vehicles.items():
+            vehicle["age"] += 1
+            if vehicle["age"] < APPROACH_TIME:
+                continue
+            if vehicle["lane"][0] in green and vehicle["lane"] not in departed:
+                # One vehicle per lane clears the stop line each second
+                departed.add(vehicle["lane"])
+                vehicle["gone"] = True
+            elif vehicle["lane"][0] in green:
+                vehicle["speed"] = CRUISE_SPEED / 3
+            else:
+                vehicle["speed"] = 0.0
+                vehicle["waiting"] += 1.0
+        self.vehicles = {k: v for k, v in self.vehicles.items() if not v.get("gone")}
+
+        for lane_id in self.lane_ids:
+            if self.rng.random() < self.arrival_rate:
+                self.vehicles[f"veh{self._next_vehicle}"] = {"lane": lane_id, "speed": CRUISE_SPEED, "waiting": 0.0, "age": 0}
+                self._next_vehicle += 1
+
+        for domain in (self.lane, self.trafficlight, self.junction, self.simulation):
+            domain._refresh_all()
@@ -0,0 +1,229 @@
+"""
+File Data Source
+Producer/consumer protocol for dashboard_data.json: atomic snapshots plus a JSON-lines update log
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Snapshot key holding the sequence number of the last update folded into it
+SEQ_KEY = "update_seq"
+
+# Updates appended before the writer folds the log into a fresh snapshot
+DEFAULT_COMPACT_EVERY = 1000
+
+# Items kept per appended list (an hour of 1 Hz history); older ones drop out
+MAX_LIST_ITEMS = 3600
+
+
+def update_log_path(path) -> Path:
+    """Update log that accompanies a snapshot file (dashboard_data.json -> dashboard_data.updates.jsonl)"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.updates.jsonl")
+
+
+def apply_updates(data: Dict[str, Any], updates: List[Dict[str, Any]],
+                  max_items: int = MAX_LIST_ITEMS) -> Dict[str, Any]:
+    """New state with ``updates`` applied in order; ``data`` itself is never modified.
+
+    ``set`` replaces top-level keys; ``append`` extends lists, nested dicts
+    naming the path (``{"time_series": {"t": [60]}}``). Only the containers
+    on a changed path are copied, once per call, and then extended in place,
+    so a batch costs one copy however many updates it holds and readers
+    holding the previous state can keep using it. Lists keep their latest
+    ``max_items`` items.
+    """
+    result = dict(data)
+    owned: Dict[int, Any] = {}
+    for update in updates:
+        result.update(update.get("set") or {})
+        for key, values in (update.get("append") or {}).items():
+            result[key] = _append(result.get(key), values, owned)
+        if SEQ_KEY in update:
+            result[SEQ_KEY] = update[SEQ_KEY]
+    for container in owned.values():
+        if isinstance(container, list) and len(container) > max_items:
+            del container[:len(container) - max_items]
+    return result
+
+
+def apply_update(data: Dict[str, Any], update: Dict[str, Any], max_items: int = MAX_LIST_ITEMS) -> Dict[str, Any]:
+    """New state with one update applied (see ``apply_updates``)"""
+    return apply_updates(data, [update], max_items)
+
+
+def _append(current, values, owned: Dict[int, Any]):
+    """``current`` extended by ``values``, copied first unless this call already copied it"""
+    if isinstance(values, dict):
+        if not isinstance(current, dict) or id(current) not in owned:
+            current = dict(current) if isinstance(current, dict) else {}
+            owned[id(current)] = current
+        for key, nested in values.items():
+            current[key] = _append(current.get(key), nested, owned)
+        return current
+    if not isinstance(current, list) or id(current) not in owned:
+        current = list(current or [])
+        owned[id(current)] = current
+    current.extend(values)
+    return current
+
+
+class DashboardFileWriter:
+    """Producer side: snapshots are written to a temp file and renamed into
+    place, so readers see either the old or the new file, never a torn one.
+    Between snapshots, ``update`` appends one JSON line per change to the
+    update log, each tagged with a sequence number. Every ``compact_every``
+    updates the current state is written as a new snapshot and the log is
+    atomically replaced with an empty one. One writer per file.
+    """
+
+    def __init__(self, path, compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.path = Path(path)
+        self.log_path = update_log_path(self.path)
+        self.compact_every = compact_every
+        self.seq = 0
+        self.state: Dict[str, Any] = {}
+        self._log = None
+        self._pending = 0
+
+    def write_snapshot(self, data: Optional[Dict[str, Any]] = None):
+        """Atomically replace the snapshot (default: the current state) and start an empty log"""
+        if data is not None:
+            self.state = dict(data)
+        self.state[SEQ_KEY] = self.seq
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.path, json.dumps(self.state))
+
+        # Readers that see the new log before the new snapshot notice the
+        # sequence gap and reload the snapshot
+        if self._log is not None:
+            self._log.close()
+        _atomic_write(self.log_path, "")
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._pending = 0
+
+    def update(self, values: Optional[Dict[str, Any]] = None, append: Optional[Dict[str, Any]] = None):
+        """Append one incremental update (replaced keys and/or list appends)"""
+        if self._log is None:
+            self.write_snapshot()
+        self.seq += 1
+        update = {SEQ_KEY: self.seq}
+        if values:
+            update["set"] = values
+        if append:
+            update["append"] = append
+        # One write per line; readers only consume complete lines
+        self._log.write(json.dumps(update) + "\n")
+        self._log.flush()
+        self.state = apply_update(self.state, update)
+        self._pending += 1
+        if self._pending >= self.compact_every:
+            self.write_snapshot()
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def _atomic_write(path: Path, text: str):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _file_key(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class DashboardFileReader:
+    """Consumer side of the file protocol.
+
+    ``read`` re-parses the snapshot only when its inode, mtime or size
+    changed and otherwise tails the update log from the saved byte offset,
+    applying complete lines newer than the snapshot. An unchanged source
+    returns the same dict object, and ``version`` increments on every
+    change so callers can cache derived data. Safe to share between threads.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.log_path = update_log_path(self.path)
+        self.version = 0
+        self._data: Optional[Dict[str, Any]] = None
+        self._snapshot_key = None
+        self._log_key = None
+        self._log_offset = 0
+        self._lock = threading.Lock()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Current state, or None when there is no snapshot"""
+        with self._lock:
+            snapshot_key = _file_key(self.path)
+            if snapshot_key is None:
+                return None
+            if snapshot_key != self._snapshot_key:
+                self._load_snapshot(snapshot_key)
+            if not self._tail_log():
+                # Sequence gap: the log was rotated past our snapshot
+                self._load_snapshot(_file_key(self.path))
+                self._tail_log()
+            return self._data
+
+    def _load_snapshot(self, snapshot_key):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            # Plain (non-atomic) writers can still be caught mid-write
+            print(f"⚠️ Could not read {self.path.name}: {e}")
+            if self._data is None:
+                return
+        self._snapshot_key = snapshot_key
+        self._log_key = None
+        self._log_offset = 0
+        self.version += 1
+
+    def _tail_log(self) -> bool:
+        """Apply new complete log lines; False on a sequence gap"""
+        log_key = _file_key(self.log_path)
+        if log_key is None or self._data is None:
+            return True
+        if self._log_key is not None and (log_key[0] != self._log_key[0] or log_key[2] < self._log_offset):
+            # Log rotated or truncated: start over from its beginning
+            self._log_offset = 0
+        if log_key == self._log_key:
+            return True
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read()
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        updates: List[Dict[str, Any]] = [json.loads(line) for line in complete.splitlines() if line.strip()]
+
+        seq = self._data.get(SEQ_KEY, 0)
+        fresh = []
+        for update in updates:
+            if update[SEQ_KEY] <= seq:
+                continue
+            if update[SEQ_KEY] != seq + 1:
+                return False
+            fresh.append(update)
+            seq = update[SEQ_KEY]
+
+        self._log_offset += len(complete)
+        self._log_key = log_key
+        if fresh:
+            self._data = apply_updates(self._data, fresh)
+            self.version += 1
+        return True
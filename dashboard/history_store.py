@@ -0,0 +1,199 @@
+"""
+Columnar History Store
+Append-only Parquet chunks of published snapshots with a min/max manifest for windowed reads
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ pyarrow not available, history store disabled: {e}")
+    PYARROW_AVAILABLE = False
+
+MANIFEST_FILE = "manifest.json"
+
+# A chunk is written once it holds this many rows or its first row is this old (wall seconds)
+DEFAULT_CHUNK_ROWS = 3600
+DEFAULT_CHUNK_SECONDS = 600.0
+
+# Column name -> Arrow type of one stored row
+HISTORY_SCHEMA = {
+    "timestamp": "float64",          # publish time (epoch seconds)
+    "run_id": "string",
+    "version": "int64",
+    "simulation_time": "float64",
+    "ai_efficiency": "float64",
+    "avg_wait_time": "float64",
+    "avg_speed": "float64",
+    "vehicle_count": "int64",
+    "queue_length": "int64",
+    "waiting_vehicles": "int64",
+    "current_phase": "int64"
+}
+
+# Columns whose min/max go into the manifest
+STAT_COLUMNS = ("timestamp", "simulation_time")
+
+
+def snapshot_row(snapshot) -> Dict[str, Any]:
+    """Flatten one published dashboard snapshot into a history row"""
+    data = snapshot.data
+    kpi = data.get("kpi_data", {})
+    intersection = data.get("intersection_data", {})
+    return {
+        "timestamp": snapshot.published_at,
+        "run_id": data.get("run_id") or "",
+        "version": snapshot.version,
+        "simulation_time": float(data.get("simulation_time", 0.0)),
+        "ai_efficiency": float(kpi.get("ai_efficiency", 0.0)),
+        "avg_wait_time": float(kpi.get("avg_wait_time", 0.0)),
+        "avg_speed": float(kpi.get("avg_speed", 0.0)),
+        "vehicle_count": int(kpi.get("vehicle_count", 0)),
+        "queue_length": int(kpi.get("queue_length", 0)),
+        "waiting_vehicles": int(intersection.get("waiting_vehicles", 0)),
+        "current_phase": int(intersection.get("current_phase", 0))
+    }
+
+
+class HistoryStore:
+    """Append-only history of snapshots in time-ordered Parquet chunks.
+
+    ``on_snapshot`` is a ``SnapshotPublisher`` listener: rows are buffered
+    and written as one Parquet file per chunk. ``manifest.json`` lists every
+    chunk with its row count, run ids and min/max of ``STAT_COLUMNS`` and is
+    replaced atomically after each chunk. ``read`` consults only the
+    manifest to pick the chunks overlapping the requested window and loads
+    just the requested columns from them. One writer per directory; any
+    number of readers.
+    """
+
+    def __init__(self, root, chunk_rows: int = DEFAULT_CHUNK_ROWS, chunk_seconds: float = DEFAULT_CHUNK_SECONDS):
+        self.root = Path(root)
+        self.chunk_rows = chunk_rows
+        self.chunk_seconds = chunk_seconds
+        self._buffer: Dict[str, List[Any]] = {name: [] for name in HISTORY_SCHEMA}
+        self._buffer_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._manifest: Dict[str, Any] = {"chunks": []}
+        self._manifest_mtime = None
+
+    # Writing
+
+    def on_snapshot(self, snapshot):
+        """SnapshotPublisher listener"""
+        self.append(snapshot_row(snapshot))
+
+    def append(self, row: Dict[str, Any]):
+        with self._lock:
+            for name, values in self._buffer.items():
+                values.append(row.get(name))
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+            full = len(self._buffer["timestamp"]) >= self.chunk_rows
+            old = time.monotonic() - self._buffer_started >= self.chunk_seconds
+        if full or old:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as a new chunk and publish it in the manifest"""
+        with self._lock:
+            if not self._buffer["timestamp"]:
+                return
+            columns, self._buffer = self._buffer, {name: [] for name in HISTORY_SCHEMA}
+            self._buffer_started = None
+        if not PYARROW_AVAILABLE:
+            # Keep memory bounded; nothing can be persisted
+            return
+
+        table = pa.table({name: pa.array(values, type=HISTORY_SCHEMA[name]) for name, values in columns.items()})
+        self.root.mkdir(parents=True, exist_ok=True)
+        manifest = self._load_manifest()
+        file_name = f"chunk-{int(columns['timestamp'][0])}-{len(manifest['chunks']):06d}.parquet"
+        pq.write_table(table, self.root / file_name)
+
+        manifest["chunks"].append({
+            "file": file_name,
+            "rows": table.num_rows,
+            "run_ids": sorted(set(columns["run_id"])),
+            "stats": {name: [min(columns[name]), max(columns[name])] for name in STAT_COLUMNS}
+        })
+        tmp_path = self.root / f".{MANIFEST_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.root / MANIFEST_FILE)
+
+    # Reading
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Manifest from disk, re-read only when it changed"""
+        path = self.root / MANIFEST_FILE
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {"chunks": []}
+        if mtime != self._manifest_mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def chunks(self, start: Optional[float] = None, end: Optional[float] = None, column: str = "timestamp",
+               run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Manifest entries whose ``column`` range overlaps [start, end]"""
+        selected = []
+        for chunk in self._load_manifest()["chunks"]:
+            low, high = chunk["stats"][column]
+            if start is not None and high < start:
+                continue
+            if end is not None and low > end:
+                continue
+            if run_id is not None and run_id not in chunk["run_ids"]:
+                continue
+            selected.append(chunk)
+        return selected
+
+    def read(self, start: Optional[float] = None, end: Optional[float] = None,
+             columns: Optional[Sequence[str]] = None, column: str = "timestamp",
+             run_id: Optional[str] = None) -> pd.DataFrame:
+        """Rows with ``column`` in [start, end] (and of ``run_id``), limited to ``columns``"""
+        wanted = list(columns or HISTORY_SCHEMA)
+        needed = list(dict.fromkeys(wanted + [column] + (["run_id"] if run_id is not None else [])))
+        frames = []
+        if PYARROW_AVAILABLE:
+            for chunk in self.chunks(start, end, column, run_id):
+                frames.append(pq.read_table(self.root / chunk["file"], columns=needed).to_pandas())
+
+        # Rows not yet written as a chunk (same process as the writer)
+        with self._lock:
+            if self._buffer["timestamp"]:
+                frames.append(pd.DataFrame({name: list(self._buffer[name]) for name in needed}))
+
+        if not frames:
+            return pd.DataFrame({name: pd.Series(dtype="object") for name in wanted})
+        df = pd.concat(frames, ignore_index=True)
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df[column] >= start
+        if end is not None:
+            mask &= df[column] <= end
+        if run_id is not None:
+            mask &= df["run_id"] == run_id
+        return df.loc[mask, wanted].reset_index(drop=True)
+
+    def runs(self) -> List[str]:
+        """Run ids present in the store, oldest first"""
+        seen = {}
+        for chunk in self._load_manifest()["chunks"]:
+            for run_id in chunk["run_ids"]:
+                seen.setdefault(run_id, None)
+        return list(seen)
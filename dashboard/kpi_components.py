@@ -5,6 +5,8 @@ Contains KPI metric display components for the dashboard
 
 import streamlit as st
 
+from markup import html
+
 
 def kpi_row(d):
     """Modern dark-themed KPI metrics with FontAwesome icons"""
@@ -17,7 +19,7 @@ def kpi_row(d):
     with col1:
         delta_class = "delta-positive" if delta > 0 else "delta-negative"
         delta_icon = "fa-arrow-up" if delta > 0 else "fa-arrow-down"
-        st.markdown(f"""
+        html(f"""
         <div class="metric-card">
             <div class="metric-icon">
                 <i class="fas fa-route"></i>
@@ -28,12 +30,12 @@ def kpi_row(d):
                 <i class="fas {delta_icon}"></i> {abs(delta):.1f}% vs baseline
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     with col2:
         wait_status = "delta-positive" if d['avg_wait_time'] < 20 else "delta-neutral" if d['avg_wait_time'] < 40 else "delta-negative"
         wait_icon = "fa-check" if d['avg_wait_time'] < 20 else "fa-exclamation" if d['avg_wait_time'] < 40 else "fa-times"
-        st.markdown(f"""
+        html(f"""
         <div class="metric-card">
             <div class="metric-icon">
                 <i class="fas fa-clock"></i>
@@ -44,13 +46,13 @@ def kpi_row(d):
                 <i class="fas {wait_icon}"></i> Status
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     with col3:
         vehicle_density = "Low" if d['vehicles_in_system'] < 300 else "Medium" if d['vehicles_in_system'] < 600 else "High"
         density_class = "delta-positive" if vehicle_density == "Low" else "delta-neutral" if vehicle_density == "Medium" else "delta-negative"
         density_icon = "fa-leaf" if vehicle_density == "Low" else "fa-balance-scale" if vehicle_density == "Medium" else "fa-exclamation-triangle"
-        st.markdown(f"""
+        html(f"""
         <div class="metric-card">
             <div class="metric-icon">
                 <i class="fas fa-car"></i>
@@ -61,13 +63,13 @@ def kpi_row(d):
                 <i class="fas {density_icon}"></i> {vehicle_density} Density
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     with col4:
         efficiency = (baseline - d['avg_travel_time']) / baseline * 100
         efficiency_class = "delta-positive" if efficiency > 10 else "delta-neutral" if efficiency > 0 else "delta-negative"
         efficiency_icon = "fa-rocket" if efficiency > 10 else "fa-chart-line" if efficiency > 0 else "fa-exclamation"
-        st.markdown(f"""
+        html(f"""
         <div class="metric-card">
             <div class="metric-icon">
                 <i class="fas fa-brain"></i>
@@ -78,4 +80,4 @@ def kpi_row(d):
                 <i class="fas {efficiency_icon}"></i> Optimization
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """)
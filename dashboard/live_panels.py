@@ -0,0 +1,77 @@
+"""
+Live Panels
+Fragment-scoped auto-refresh for the data-bound dashboard panels
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+import streamlit as st
+
+from config import DEFAULT_REFRESH_RATE, LIVE_REFRESH_MODE, PAYLOAD_BUDGET_BYTES
+from payload_meter import payload_meter
+
+# Relative change of the budgeted interval that redeclares the panel timers
+STRETCH_TOLERANCE = 0.25
+
+
+def refresh_interval(is_live: bool) -> Optional[float]:
+    """Seconds between panel refreshes, or None when nothing is updating or auto refresh is off.
+
+    Read from the System Control widgets' session state, which holds their
+    values from the previous run before they are drawn again, and stretched
+    when the last refresh sent more than ``PAYLOAD_BUDGET_BYTES``.
+    """
+    if not is_live or not st.session_state.get("auto_refresh_check", True):
+        return None
+    interval = float(st.session_state.get("update_interval_slider_main", DEFAULT_REFRESH_RATE))
+    return interval * payload_meter().stretch(PAYLOAD_BUDGET_BYTES, LIVE_REFRESH_MODE == "fragment")
+
+
+def live_panel(render: Callable[[Dict[str, Any]], None], load: Callable[[], Optional[Dict[str, Any]]],
+               interval: Optional[float], is_live: Callable[[], bool], name: Optional[str] = None):
+    """Draw ``render(load())`` now and, with an ``interval``, redraw only this panel on that timer.
+
+    In ``fragment`` mode each panel is an ``st.fragment`` with ``run_every``,
+    so a tick reruns the panel instead of the whole script. A panel that
+    notices the source stopped, or that the payload budget calls for a
+    different interval, triggers one full rerun, which declares the
+    fragments again with the new timer. Bytes sent are metered under
+    ``name`` (default: the render function's name).
+    """
+    name = name or getattr(render, "__name__", "panel")
+    meter = payload_meter()
+    if LIVE_REFRESH_MODE != "fragment":
+        with meter.component(name):
+            render(load())
+        return
+
+    @st.fragment(run_every=interval)
+    def panel():
+        if interval and not is_live():
+            st.rerun()
+        with payload_meter().panel(name):
+            data = load()
+            if data:
+                render(data)
+        if interval:
+            budgeted = refresh_interval(True)
+            if budgeted and abs(budgeted / interval - 1) > STRETCH_TOLERANCE:
+                print(f"📦 Live refresh sends {meter.refresh_bytes() / 1024:.1f} KiB "
+                      f"(budget {PAYLOAD_BUDGET_BYTES / 1024:.1f} KiB), refreshing every {budgeted:.1f}s")
+                st.rerun()
+
+    panel()
+
+
+def cached_for_data(data: Any, key: str, build: Callable[[], Any], version: Any = None) -> Any:
+    """``build()`` once per snapshot: reused while panels are handed the same data (and ``version``).
+
+    Data sources return the same dict until a newer snapshot is published,
+    so a tick without new data skips building figures altogether. Data that
+    grows in place, like a streamed episode, passes its own ``version``.
+    """
+    cache = st.session_state.setdefault("_data_cache", {})
+    entry = cache.get(key)
+    if entry is None or entry[0] is not data or entry[1] != version:
+        entry = cache[key] = (data, version, build())
+    return entry[2]
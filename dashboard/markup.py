@@ -0,0 +1,44 @@
+"""
+Markup
+Minified HTML and CSS sent through st.markdown
+"""
+
+import re
+from functools import lru_cache
+
+import streamlit as st
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_STYLE_TAG = re.compile(r"</?style[^>]*>", re.I)
+_HTML_INDENT = re.compile(r"\n\s*")
+
+
+@lru_cache(maxsize=16)
+def minify_css(css: str) -> str:
+    """Strip comments, ``<style>`` tags and insignificant whitespace"""
+    css = _CSS_COMMENT.sub("", _STYLE_TAG.sub("", css))
+    css = _CSS_PUNCTUATION.sub(r"\1", _CSS_SPACE.sub(" ", css))
+    return css.replace(": ", ":").replace(";}", "}").strip()
+
+
+@lru_cache(maxsize=1024)
+def minify_html(html: str) -> str:
+    """Markup without line breaks and indentation, memoized since cards repeat the same HTML"""
+    return _HTML_INDENT.sub(" ", html).strip()
+
+
+def html(markup: str):
+    """``st.markdown`` of a minified HTML snippet"""
+    st.markdown(minify_html(markup), unsafe_allow_html=True)
+
+
+def stylesheet(css: str):
+    """Inline ``css`` minified as one ``<style>`` element.
+
+    The element is identical on every rerun, so once it is at least
+    ``global.minCachedMessageSize`` bytes Streamlit sends a reference to the
+    browser's cached copy instead of the CSS.
+    """
+    st.markdown(f"<style>{minify_css(css)}</style>", unsafe_allow_html=True)
@@ -0,0 +1,199 @@
+"""
+Memory-Mapped Snapshot Channel
+Fixed-layout binary snapshots (NumPy structured dtype) shared with local producers through a seqlock
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+MAGIC = b"TSMMAP01"
+
+# Header shared by every layout; its dimensions describe the rest of the file
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("n_intersections", "<u4"),
+    ("lanes", "<u4"),
+    ("seq", "<u8"),              # seqlock: odd while the writer is mid-update
+    ("version", "<u8"),          # completed writes
+    ("published_at", "<f8")
+])
+
+# Scalar KPIs in the dashboard_data.json vocabulary
+KPI_FIELDS = {
+    "ts": "<f8",
+    "avg_travel_time": "<f8",
+    "avg_wait_time": "<f8",
+    "baseline_avg_travel_time": "<f8",
+    "vehicles_in_system": "<i8"
+}
+
+NAME_LENGTH = 48
+
+# Points of KPI history the reader keeps for the time-series chart
+DEFAULT_READER_HISTORY = 3600
+
+# Seconds a reader retries a record the writer is updating; a writer that died
+# mid-update leaves it that way, and the reader keeps its last snapshot instead
+READ_TIMEOUT = 0.1
+
+
+def channel_dtype(n_intersections: int, lanes: int) -> np.dtype:
+    """Full record layout for ``n_intersections`` with ``lanes`` queue counters each"""
+    return np.dtype(HEADER_DTYPE.descr + list(KPI_FIELDS.items()) + [
+        ("selected_intersection", "<u4"),
+        ("names", f"S{NAME_LENGTH}", (n_intersections,)),
+        ("phases", "<i4", (n_intersections,)),
+        ("queues", "<i4", (n_intersections, lanes))
+    ])
+
+
+class MmapSnapshotWriter:
+    """Producer side: one structured record in a memory-mapped file.
+
+    ``publish`` makes the sequence odd, writes the fields in place and makes
+    it even again, so readers can detect and retry a torn read without ever
+    blocking the writer. One writer per file; the file is recreated (new
+    inode) when the layout changes.
+    """
+
+    def __init__(self, path, n_intersections: int, lanes: int, names: Optional[Sequence[str]] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        dtype = channel_dtype(n_intersections, lanes)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        record = np.memmap(tmp_path, dtype=dtype, mode="w+", shape=())
+        record["magic"] = MAGIC
+        record["n_intersections"] = n_intersections
+        record["lanes"] = lanes
+        record["names"] = [name.encode()[:NAME_LENGTH] for name in (names or
+                           [f"intersection_{i + 1}" for i in range(n_intersections)])]
+        record.flush()
+        os.replace(tmp_path, self.path)
+        self.record = record
+        self.seq = 0
+        self.version = 0
+
+    def publish(self, phases: Optional[Sequence[int]] = None, queues=None,
+                selected_intersection: Optional[int] = None, **kpis: float):
+        """Write one consistent update; omitted fields keep their previous values"""
+        unknown = set(kpis) - set(KPI_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown KPI fields: {sorted(unknown)} (expected {list(KPI_FIELDS)})")
+        record = self.record
+        self.seq += 1
+        record["seq"] = self.seq
+        try:
+            for name, value in kpis.items():
+                record[name] = value
+            if phases is not None:
+                record["phases"] = phases
+            if queues is not None:
+                record["queues"] = queues
+            if selected_intersection is not None:
+                record["selected_intersection"] = selected_intersection
+            record["published_at"] = time.time()
+            self.version += 1
+            record["version"] = self.version
+        finally:
+            # Even again also after a failed write, so readers are never stuck
+            self.seq += 1
+            record["seq"] = self.seq
+
+    def close(self):
+        self.record.flush()
+        del self.record
+
+
+class MmapSnapshotReader:
+    """Consumer side: maps the producer's file read-only.
+
+    Unchanged snapshots cost one header read. A new version is copied out
+    as a single memcpy of the record (retried if the writer was mid-update)
+    and turned into the ``dashboard_data.json`` shape; the scalar KPIs are
+    also kept in ring buffers so the time-series chart works as for the
+    JSON source. ``read`` returns the same dict until the version changes.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path, history: int = DEFAULT_READER_HISTORY):
+        self.path = Path(path)
+        self.history = {name: RingBuffer(history) for name in ("t", "rl_avg_travel_time", "baseline_avg_travel_time")}
+        self.version = 0
+        self.record = None
+        self._inode = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _map(self) -> bool:
+        """(Re)map the file when it appeared or the producer recreated it"""
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            return self.record is not None
+        if inode == self._inode:
+            return True
+        header = np.memmap(self.path, dtype=HEADER_DTYPE, mode="r", shape=())
+        if header["magic"] != MAGIC:
+            return False
+        dtype = channel_dtype(int(header["n_intersections"]), int(header["lanes"]))
+        self.record = np.memmap(self.path, dtype=dtype, mode="r", shape=())
+        self._inode = inode
+        self.version = 0
+        for buffer in self.history.values():
+            buffer.clear()
+        return True
+
+    def snapshot(self) -> Optional[np.ndarray]:
+        """Consistent copy of the record, or None if unchanged since the last call
+        (or still mid-update after ``READ_TIMEOUT``)"""
+        if not self._map():
+            return None
+        record = self.record
+        deadline = time.monotonic() + READ_TIMEOUT
+        while True:
+            seq = int(record["seq"])
+            if seq % 2:
+                if time.monotonic() > deadline:
+                    return None
+                time.sleep(0)
+                continue
+            if int(record["version"]) == self.version:
+                return None
+            copy = np.array(record)
+            if int(record["seq"]) == seq:
+                self.version = int(copy["version"])
+                return copy
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Latest state in the dashboard_data.json shape, or None without a producer"""
+        with self._lock:
+            record = self.snapshot()
+            if record is not None:
+                self._data = self._to_dashboard_data(record)
+            return self._data
+
+    def _to_dashboard_data(self, record: np.ndarray) -> Dict[str, Any]:
+        self.history["t"].append(record["ts"])
+        self.history["rl_avg_travel_time"].append(record["avg_travel_time"])
+        self.history["baseline_avg_travel_time"].append(record["baseline_avg_travel_time"])
+
+        keys = [f"intersection_{i + 1}" for i in range(len(record["phases"]))]
+        return {
+            **{name: record[name].item() for name in KPI_FIELDS},
+            "selected_intersection": keys[int(record["selected_intersection"])] if keys else None,
+            "intersections": {
+                key: {"current_phase": int(phase), "queues": queues.tolist(), "name": name.decode()}
+                for key, name, phase, queues in zip(keys, record["names"], record["phases"], record["queues"])
+            },
+            # Copies of the history, since callers keep the dict after the next read;
+            # panels accept arrays as for the live history
+            "time_series": {name: buffer.window().copy() for name, buffer in self.history.items()},
+            "latest_frame_path": ""
+        }
@@ -0,0 +1,197 @@
+"""
+Vectorized Mock Traffic Engine
+NumPy point-queue model of many signalised intersections for running without SUMO
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from compact_state import LaneTable
+from fake_traci import APPROACHES, APPROACH_TIME, CRUISE_SPEED, GREEN_APPROACHES, PHASE_DURATIONS, YELLOW_APPROACHES
+from traci_collector import CollectedState
+
+# Mean arrivals per lane per second at demand factor 1
+BASE_ARRIVAL_RATE = 0.12
+
+# Probability that a green lane discharges one queued vehicle in a second (~1800 veh/h)
+SATURATION_FLOW = 0.5
+
+# Period (s) of the tidal demand swing between the N-S and E-W approaches
+TIDAL_PERIOD = 1800.0
+
+# Queue-actuated control (``actuate``): seconds of green before it may end, seconds a
+# kept green is extended by, the longest green, and how many times the green queue the
+# red approaches must hold to end a green (hysteresis against losing time to yellows)
+MIN_GREEN = 10.0
+GREEN_EXTENSION = 5.0
+MAX_GREEN = 90.0
+SWITCH_RATIO = 2.0
+
+# Scenario name -> (N-S demand factor, E-W demand factor, tidal amplitude)
+SCENARIO_DEMAND = {
+    "uniform": (1.0, 1.0, 0.0),
+    "tidal": (1.0, 1.0, 0.7),
+    "asymmetric": (1.6, 0.6, 0.0),
+    "congested": (2.0, 2.0, 0.0),
+    "random": (1.0, 1.0, 0.0),
+    "enhanced": (1.2, 1.2, 0.3)
+}
+
+
+class PointQueueEngine:
+    """Point-queue traffic model for ``n_intersections`` four-way junctions.
+
+    Every lane is a vertical queue: Poisson arrivals travel ``APPROACH_TIME``
+    seconds to the stop line, join the queue and are discharged at the
+    saturation flow while their approach has green. Queues, accumulated
+    waiting time, vehicles in transit and the fixed-time signal of every
+    intersection are arrays, so one ``step`` is a handful of NumPy
+    operations regardless of network size. ``collect`` returns the same
+    ``CollectedState`` as the TraCI subscription collector.
+    """
+
+    def __init__(self, n_intersections: int = 1, lanes_per_approach: int = 2, scenario: str = "uniform",
+                 seed: Optional[int] = None, saturation_flow: float = SATURATION_FLOW):
+        self.rng = np.random.default_rng(seed)
+        self.n_intersections = n_intersections
+        self.scenario = scenario if scenario in SCENARIO_DEMAND else "uniform"
+        self.saturation_flow = saturation_flow
+        self.lane_ids = LaneTable.intern([f"{a}_in_{i}" for a in APPROACHES for i in range(lanes_per_approach)])
+        self.time = 0
+
+        n_lanes = len(self.lane_ids)
+        shape = (n_intersections, n_lanes)
+        lane_approach = np.repeat(np.arange(len(APPROACHES)), lanes_per_approach)
+        self._north_south = np.isin(lane_approach, [APPROACHES.index("N"), APPROACHES.index("S")])
+
+        # Per-phase lane masks and signal strings
+        n_phases = len(PHASE_DURATIONS)
+        self._green = np.zeros((n_phases, n_lanes), dtype=bool)
+        self._signal_states = []
+        for phase in range(n_phases):
+            green = [APPROACHES.index(a) for a in GREEN_APPROACHES.get(phase, ())]
+            yellow = [APPROACHES.index(a) for a in YELLOW_APPROACHES.get(phase, ())]
+            self._green[phase] = np.isin(lane_approach, green)
+            self._signal_states.append("".join(
+                "G" if a in green else "y" if a in yellow else "r" for a in lane_approach
+            ))
+        self.phase_durations = np.asarray(PHASE_DURATIONS)
+
+        # Demand: scenario split, per-intersection scale and (for "random") per-lane noise
+        ns, ew, self._tidal_amplitude = SCENARIO_DEMAND[self.scenario]
+        rates = np.where(self._north_south, ns, ew) * BASE_ARRIVAL_RATE
+        rates = rates * self.rng.lognormal(0.0, 0.25, size=(n_intersections, 1))
+        if self.scenario == "random":
+            rates = rates * self.rng.uniform(0.3, 1.7, size=shape)
+        self.arrival_rates = rates
+
+        # State arrays
+        self.queues = np.zeros(shape, dtype=np.int64)
+        self.waiting = np.zeros(shape, dtype=np.float64)
+        self.departed = np.zeros(shape, dtype=np.int64)
+        self._in_transit = np.zeros((APPROACH_TIME,) + shape, dtype=np.int64)
+
+        # Offset the signals so the network is not synchronised
+        self.phase = self.rng.integers(0, n_phases, size=n_intersections)
+        self.phase_remaining = self.rng.uniform(1.0, 1.0 + self.phase_durations[self.phase]).round()
+        self.phase_elapsed = np.zeros(n_intersections)
+
+    def _demand_factor(self) -> np.ndarray:
+        """Per-lane multiplier of the base arrival rates at the current time"""
+        if not self._tidal_amplitude:
+            return 1.0
+        swing = self._tidal_amplitude * np.sin(2 * np.pi * self.time / TIDAL_PERIOD)
+        return np.where(self._north_south, 1.0 + swing, 1.0 - swing)
+
+    def step(self, steps: int = 1):
+        """Advance every intersection by ``steps`` seconds"""
+        rng = self.rng
+        shape = self.queues.shape
+        for _ in range(steps):
+            self.time += 1
+
+            # Arrivals enter the approach; vehicles that arrived APPROACH_TIME ago join the queue
+            slot = self.time % APPROACH_TIME
+            self.queues += self._in_transit[slot]
+            self._in_transit[slot] = rng.poisson(self.arrival_rates * self._demand_factor())
+
+            # Queued vehicles wait another second, green lanes discharge one vehicle
+            self.waiting += self.queues
+            green = self._green[self.phase]
+            departures = np.minimum(self.queues, green & (rng.random(shape) < self.saturation_flow))
+            share = np.divide(departures, self.queues, out=np.zeros(shape), where=self.queues > 0)
+            self.waiting -= self.waiting * share
+            self.queues -= departures
+            self.departed += departures
+
+            # Fixed-time signal plans
+            self.phase_remaining -= 1
+            self.phase_elapsed += 1
+            switch = self.phase_remaining <= 0
+            if switch.any():
+                self.phase[switch] = (self.phase[switch] + 1) % len(self.phase_durations)
+                self.phase_remaining[switch] = self.phase_durations[self.phase[switch]]
+                self.phase_elapsed[switch] = 0
+
+    def set_phase(self, intersection: int, phase: int, duration: float):
+        """Force a signal phase (manual control)"""
+        self.phase[intersection] = phase % len(self.phase_durations)
+        self.phase_remaining[intersection] = duration
+        self.phase_elapsed[intersection] = 0
+
+    def actuate(self, min_green: float = MIN_GREEN, extension: float = GREEN_EXTENSION,
+                max_green: float = MAX_GREEN, switch_ratio: float = SWITCH_RATIO) -> int:
+        """Queue-actuated control of every intersection; returns how many greens were ended.
+
+        After ``min_green`` seconds a green ends (through its yellow) as soon
+        as the red approaches queue ``switch_ratio`` times the vehicles of the
+        green ones, or once it reached ``max_green`` with anyone waiting;
+        otherwise it is kept for at least ``extension`` more seconds. Yellows
+        are untouched.
+        """
+        green = self._green[self.phase]
+        serving = np.where(green, self.queues, 0).sum(axis=1)
+        crossing = np.where(green, 0, self.queues).sum(axis=1)
+        in_green = green.any(axis=1)
+        end = in_green & (self.phase_elapsed >= min_green) & (
+            (crossing > switch_ratio * serving) | ((self.phase_elapsed >= max_green) & (crossing > 0)))
+        keep = in_green & ~end
+        self.phase_remaining[end] = 1
+        self.phase_remaining[keep] = np.maximum(self.phase_remaining[keep], extension)
+        return int(end.sum())
+
+    def collect(self, intersection: int = 0) -> CollectedState:
+        """State of one intersection in the collector's format"""
+        queues = self.queues[intersection]
+        moving = self._in_transit[:, intersection].sum(axis=0)
+        counts = queues + moving
+        waiting = self.waiting[intersection]
+        per_vehicle_wait = np.divide(waiting, queues, out=np.zeros(len(queues)), where=queues > 0)
+        queued, in_transit = int(queues.sum()), int(moving.sum())
+
+        return CollectedState(
+            simulation_time=float(self.time),
+            lane_ids=self.lane_ids,
+            lane_vehicle_counts=counts,
+            lane_halting=queues.copy(),
+            lane_mean_speeds=np.divide(moving * CRUISE_SPEED, counts, out=np.full(len(counts), CRUISE_SPEED),
+                                       where=counts > 0),
+            lane_waiting_times=waiting.copy(),
+            vehicle_speeds=np.concatenate([np.zeros(queued), np.full(in_transit, CRUISE_SPEED)]),
+            vehicle_waiting_times=np.concatenate([np.repeat(per_vehicle_wait, queues), np.zeros(in_transit)]),
+            signal_state=self._signal_states[self.phase[intersection]],
+            current_phase=int(self.phase[intersection]),
+            next_switch=float(self.time + self.phase_remaining[intersection])
+        )
+
+    def network_summary(self) -> Dict[str, float]:
+        """Totals across all intersections"""
+        queued = int(self.queues.sum())
+        return {
+            "intersections": self.n_intersections,
+            "vehicles": queued + int(self._in_transit.sum()),
+            "queued": queued,
+            "departed": int(self.departed.sum()),
+            "avg_wait_per_queued": float(self.waiting.sum() / queued) if queued else 0.0
+        }
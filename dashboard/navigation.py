@@ -0,0 +1,59 @@
+"""
+Navigation
+Tab-style view switching that runs only the selected view
+"""
+
+from typing import Callable, Dict, Optional, Sequence
+
+import streamlit as st
+
+from config import NAVIGATION_MODE
+from payload_meter import payload_meter
+
+
+def keep_widget_state(keys: Sequence[str]):
+    """Carry these widgets' values over a run that does not draw them.
+
+    Streamlit drops the state of widgets missing from a run; writing the
+    values back as session state keeps them until the widget returns.
+    """
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def selected_view(labels: Sequence[str], key: str) -> str:
+    """Label of the view picked in the ``key`` selector, the first one until something is picked"""
+    active = st.session_state.get(key)
+    return active if active in labels else labels[0]
+
+
+def render_views(views: Dict[str, Callable[[], None]], key: str, keep: Optional[Dict[str, Sequence[str]]] = None,
+                 selectable: bool = True):
+    """Draw ``views`` (label -> render function) as tabs, or only the selected one.
+
+    ``st.tabs`` runs and sends every view and just hides the inactive ones
+    in the browser. In ``lazy`` mode a horizontal radio picks the view and
+    only that view's function runs, so a rerun costs one view. ``keep``
+    lists, per view, the widget keys whose values must survive while it is
+    hidden. With ``selectable=False`` the selected view is drawn without the
+    radio, for redraws repeated within one run. Each view's bytes are
+    metered under its label.
+    """
+    labels = list(views)
+    meter = payload_meter()
+    if NAVIGATION_MODE == "tabs":
+        for tab, (label, render) in zip(st.tabs(labels), views.items()):
+            with tab, meter.component(label):
+                render()
+        return
+
+    if selectable:
+        active = st.radio("View", labels, key=key, horizontal=True, label_visibility="collapsed")
+    else:
+        active = selected_view(labels, key)
+    for label, keys in (keep or {}).items():
+        if label != active:
+            keep_widget_state(keys)
+    with meter.component(active):
+        views[active]()
@@ -0,0 +1,183 @@
+"""
+Payload Meter
+Bytes sent to the browser per run and per component, checked against a per-refresh budget
+"""
+
+import hashlib
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.runtime_util import is_cacheable_msg
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Runs kept per session
+DEFAULT_RUN_HISTORY = 50
+
+# Label of full script runs; fragment reruns are labelled by their panel
+SCRIPT_RUN = "script"
+
+# Messages sent outside any named component
+UNATTRIBUTED = "other"
+
+
+def message_hash(msg: ForwardMsg) -> str:
+    """Streamlit's cache hash of ``msg`` (its content without metadata), leaving ``msg`` untouched"""
+    content = ForwardMsg()
+    content.CopyFrom(msg)
+    content.ClearField("metadata")
+    return hashlib.md5(content.SerializeToString()).hexdigest()
+
+
+def reference_size(msg: ForwardMsg, digest: str) -> int:
+    """Size of the reference Streamlit sends instead of a message the browser has cached"""
+    ref = ForwardMsg()
+    ref.metadata.CopyFrom(msg.metadata)
+    ref.ref_hash = digest
+    return ref.ByteSize()
+
+
+class PayloadMeter:
+    """Counts the ForwardMsg bytes a session sends, per run and per component.
+
+    ``begin_run`` starts a record, ``component`` attributes the messages
+    sent inside it to a name, and ``panel`` does either, depending on
+    whether a live panel runs as part of the script or as its own fragment
+    rerun. A live refresh is the latest fragment run of every panel, which
+    is what the budget applies to. Messages the browser already caches
+    count with the size of the reference sent in their place. Nothing is
+    counted outside ``metering``; ``available`` is False when this
+    Streamlit version offers no message queue to meter.
+    """
+
+    def __init__(self, history: int = DEFAULT_RUN_HISTORY, max_cache_age: Optional[int] = None):
+        self.runs = deque(maxlen=history)
+        self.current: Optional[Dict[str, Any]] = None
+        self._components: List[str] = []
+        self._max_cache_age = (max_cache_age if max_cache_age is not None
+                               else st.get_option("global.maxCachedMessageAge"))
+        self._script_runs = 0
+        self._cached: Dict[str, int] = {}
+        self._metered_ctx = None
+        self.available = True
+
+    def begin_run(self, label: str = SCRIPT_RUN):
+        if label == SCRIPT_RUN:
+            self._script_runs += 1
+            self._cached = {digest: run for digest, run in self._cached.items()
+                            if self._script_runs - run <= self._max_cache_age}
+        self.current = {"label": label, "time": time.time(), "bytes": 0, "messages": 0, "components": {},
+                        "panels": []}
+        self.runs.append(self.current)
+        self._components = []
+
+    def sent_size(self, msg: ForwardMsg) -> int:
+        """Bytes ``msg`` costs on the wire, mirroring Streamlit's per-session message cache"""
+        if not is_cacheable_msg(msg):
+            return msg.ByteSize()
+        digest = message_hash(msg)
+        cached = digest in self._cached
+        self._cached[digest] = self._script_runs
+        return reference_size(msg, digest) if cached else msg.ByteSize()
+
+    def record(self, nbytes: int):
+        if self.current is None:
+            return
+        name = self._components[-1] if self._components else UNATTRIBUTED
+        self.current["bytes"] += nbytes
+        self.current["messages"] += 1
+        self.current["components"][name] = self.current["components"].get(name, 0) + nbytes
+
+    @contextmanager
+    def component(self, name: str):
+        self._components.append(name)
+        try:
+            yield
+        finally:
+            self._components.pop()
+
+    @contextmanager
+    def metering(self):
+        """Count the messages the current script run sends until the block exits.
+
+        Wraps the run context's private ``_enqueue`` and puts the original
+        back on exit, also when the run is stopped or rerun by an exception.
+        Nested blocks keep the outer hook.
+        """
+        ctx = get_script_run_ctx()
+        enqueue = getattr(ctx, "_enqueue", None)
+        if ctx is None or ctx is self._metered_ctx:
+            yield
+            return
+        if not callable(enqueue):
+            if self.available:
+                print("⚠️ Payload metering unavailable: this Streamlit version has no ScriptRunContext._enqueue")
+            self.available = False
+            yield
+            return
+
+        def counted(msg):
+            self.record(self.sent_size(msg))
+            enqueue(msg)
+
+        ctx._enqueue = counted
+        self._metered_ctx = ctx
+        try:
+            yield
+        finally:
+            ctx._enqueue = enqueue
+            self._metered_ctx = None
+
+    @contextmanager
+    def panel(self, name: str):
+        """A live panel: its own run when only its fragment reruns, else a component of the script run"""
+        ctx = get_script_run_ctx()
+        if ctx is not None and ctx.fragment_ids_this_run:
+            self.begin_run(name)
+        elif self.current is not None:
+            self.current["panels"].append(name)
+        with self.metering(), self.component(name):
+            yield
+
+    def last_script_run(self) -> Optional[Dict[str, Any]]:
+        """The latest finished full run (the one in progress is still counting)"""
+        return next((run for run in reversed(self.runs) if run["label"] == SCRIPT_RUN and run is not self.current),
+                    None)
+
+    def refresh_bytes(self, fragments: bool = True) -> int:
+        """Bytes of one live refresh, or of the last script run when panels do not refresh on their own.
+
+        A refresh is the latest run of every panel the last finished script
+        run drew; panels that have not ticked since count with their share
+        of that script run.
+        """
+        runs = list(self.runs)
+        start = next((i for i in range(len(runs) - 1, -1, -1)
+                      if runs[i]["label"] == SCRIPT_RUN and runs[i] is not self.current), None)
+        if start is None:
+            return 0
+        script = runs[start]
+        if not fragments:
+            return script["bytes"]
+        latest = {name: script["components"].get(name, 0) for name in script["panels"]}
+        for run in runs[start + 1:]:
+            if run["label"] in latest:
+                latest[run["label"]] = run["bytes"]
+        return sum(latest.values())
+
+    def stretch(self, budget: int, fragments: bool = True) -> float:
+        """Factor to lengthen the refresh interval by so refreshes average at most ``budget`` bytes"""
+        if budget <= 0:
+            return 1.0
+        return max(1.0, self.refresh_bytes(fragments) / budget)
+
+
+def payload_meter() -> PayloadMeter:
+    """This session's meter (counting only inside its ``metering`` blocks)"""
+    meter = st.session_state.get("_payload_meter")
+    if meter is None:
+        meter = st.session_state["_payload_meter"] = PayloadMeter()
+    return meter
@@ -0,0 +1,386 @@
+"""
+Out-of-Process Simulation Runner
+Hosts the simulation in a worker process and shares snapshots through shared memory
+"""
+
+import atexit
+import os
+import pickle
+import secrets
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection, answer_challenge, deliver_challenge
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+from snapshot import Snapshot
+from snapshot_codec import KEYFRAME, SnapshotDecoder, SnapshotEncoder, frame, iter_frames
+
+# Shared memory reserved for one keyframe and the deltas that follow it
+DEFAULT_SLOT_SIZE = 16 * 1024 * 1024
+
+# Seconds to wait for the worker to answer a command
+COMMAND_TIMEOUT = 10.0
+
+# Environment variable carrying the control channel auth key to the worker
+AUTHKEY_ENV = "TRAFFIC_SIM_WORKER_AUTHKEY"
+
+# How often the worker refreshes its running flag while idle (seconds)
+WORKER_POLL_INTERVAL = 0.2
+
+# Slot header: sequence, version, payload length, publish time, epoch (bumped when the payload restarts)
+_HEADER = struct.Struct("<QQQdQ")
+
+# Running flag, kept outside the seqlock so a second worker thread can update it
+_FLAG = struct.Struct("<Q")
+_PAYLOAD_OFFSET = _HEADER.size + _FLAG.size
+
+
+class SharedSnapshotSlot:
+    """Single-writer snapshot slot in shared memory guarded by a seqlock.
+
+    The writer makes the sequence number odd, writes the payload and header,
+    then makes it even again. Readers copy the slot and retry if the
+    sequence changed or was odd, so they never block the writer and never
+    observe a torn snapshot. The version is readable without unpickling,
+    which lets readers skip unchanged snapshots cheaply.
+
+    ``write`` replaces the payload; ``append`` extends it in place, so a
+    reader that already holds the first ``offset`` bytes of the current
+    epoch copies only what was added (``read_from``).
+    """
+
+    def __init__(self, name: Optional[str] = None, size: int = DEFAULT_SLOT_SIZE):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=_PAYLOAD_OFFSET + size)
+            _HEADER.pack_into(self.shm.buf, 0, 0, 0, 0, 0.0, 0)
+            _FLAG.pack_into(self.shm.buf, _HEADER.size, 0)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Attaching registers the segment with this process's resource
+            # tracker, which would unlink it on exit; the creator owns it
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+            self.owner = False
+        self.name = self.shm.name
+        self.capacity = self.shm.size - _PAYLOAD_OFFSET
+
+    def _header(self) -> Tuple[int, int, int, float, int]:
+        return _HEADER.unpack_from(self.shm.buf, 0)
+
+    def write(self, version: int, payload: bytes, published_at: float) -> bool:
+        """Store a new payload (writer process only)"""
+        if len(payload) > self.capacity:
+            print(f"⚠️ Snapshot of {len(payload)} bytes exceeds shared slot ({self.capacity} bytes)")
+            return False
+        seq, _, _, _, epoch = self._header()
+        _HEADER.pack_into(self.shm.buf, 0, seq + 1, version, 0, published_at, epoch + 1)
+        self.shm.buf[_PAYLOAD_OFFSET:_PAYLOAD_OFFSET + len(payload)] = payload
+        _HEADER.pack_into(self.shm.buf, 0, seq + 2, version, len(payload), published_at, epoch + 1)
+        return True
+
+    def append(self, version: int, payload: bytes, published_at: float) -> bool:
+        """Extend the current payload; False if it does not fit (write a fresh one instead)"""
+        seq, _, length, _, epoch = self._header()
+        if length + len(payload) > self.capacity:
+            return False
+        start = _PAYLOAD_OFFSET + length
+        _HEADER.pack_into(self.shm.buf, 0, seq + 1, version, length, published_at, epoch)
+        self.shm.buf[start:start + len(payload)] = payload
+        _HEADER.pack_into(self.shm.buf, 0, seq + 2, version, length + len(payload), published_at, epoch)
+        return True
+
+    def set_running(self, running: bool):
+        """Update the running flag (writer process only)"""
+        _FLAG.pack_into(self.shm.buf, _HEADER.size, int(running))
+
+    @property
+    def version(self) -> int:
+        return self._header()[1]
+
+    @property
+    def running(self) -> bool:
+        return bool(_FLAG.unpack_from(self.shm.buf, _HEADER.size)[0])
+
+    def read(self, since_version: Optional[int] = None) -> Optional[Tuple[int, bytes, float]]:
+        """Consistent (version, payload, published_at), or None if nothing newer"""
+        result = self.read_from(since_version=since_version)
+        return result and result[:3]
+
+    def read_from(self, epoch: Optional[int] = None, offset: int = 0,
+                  since_version: Optional[int] = None) -> Optional[Tuple[int, bytes, float, int, bool]]:
+        """Consistent (version, bytes, published_at, epoch, restarted), or None if nothing newer.
+
+        Within ``epoch`` only the bytes after ``offset`` are copied;
+        ``restarted`` is True when the whole payload of a new epoch is returned.
+        """
+        while True:
+            seq, version, length, published_at, current_epoch = self._header()
+            if seq % 2:
+                time.sleep(0)
+                continue
+            if version == 0 or (since_version is not None and version <= since_version):
+                return None
+            restarted = current_epoch != epoch
+            start = 0 if restarted else offset
+            payload = bytes(self.shm.buf[_PAYLOAD_OFFSET + start:_PAYLOAD_OFFSET + length])
+            if self._header()[0] == seq:
+                return version, payload, published_at, current_epoch, restarted
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _simulation_worker(slot_name: str, conn: Connection, history_dir: Optional[str] = None,
+                       metrics_db: Optional[str] = None):
+    """Worker process main loop: hosts SumoStreamlitIntegration and serves commands"""
+    from sumo_integration import create_sumo_integration
+
+    slot = SharedSnapshotSlot(slot_name)
+    integration = create_sumo_integration("thread", history_dir, metrics_db)
+    encoder = SnapshotEncoder()
+
+    def publish(snapshot: Snapshot):
+        # Keyframes restart the slot payload; deltas are appended after it
+        kind, message = encoder.encode(snapshot.version, snapshot.data)
+        if kind != KEYFRAME and slot.append(snapshot.version, frame(message), snapshot.published_at):
+            return
+        if kind != KEYFRAME:
+            encoder.force_keyframe()
+            kind, message = encoder.encode(snapshot.version, snapshot.data)
+        slot.write(snapshot.version, frame(message), snapshot.published_at)
+
+    integration.publisher.add_listener(publish)
+
+    handlers = {
+        "start": lambda kwargs: integration.start_simulation(**kwargs),
+        "stop": lambda _: integration.stop_simulation(),
+        "emergency_stop": lambda _: integration.emergency_stop(),
+        "manual_phase": lambda args: integration.change_signal_manually(*args),
+        "status": lambda _: integration.get_simulation_status()
+    }
+
+    try:
+        while True:
+            slot.set_running(integration.is_running)
+            if not conn.poll(WORKER_POLL_INTERVAL):
+                continue
+            command, argument = conn.recv()
+            if command == "shutdown":
+                integration.stop_simulation()
+                conn.send(True)
+                break
+            try:
+                result = handlers[command](argument)
+            except Exception as e:
+                print(f"Simulation worker error in '{command}': {e}")
+                result = None
+            slot.set_running(integration.is_running)
+            conn.send(result)
+    except (EOFError, KeyboardInterrupt):
+        integration.stop_simulation()
+    finally:
+        slot.set_running(False)
+        slot.close()
+
+
+def _connect_control_channel(port: int, authkey: bytes) -> Connection:
+    """Worker side of the mutually authenticated control connection"""
+    sock = socket.create_connection(("127.0.0.1", port))
+    conn = Connection(sock.detach())
+    answer_challenge(conn, authkey)
+    deliver_challenge(conn, authkey)
+    return conn
+
+
+class ProcessSimulationRunner:
+    """Drop-in replacement for SumoStreamlitIntegration running the simulation out of process.
+
+    TraciManager/MetricsCollector/SignalController live in a worker process
+    (this module run as a script), so dashboard reruns do not compete with
+    stepping for the GIL. Commands travel over an authenticated localhost
+    connection; snapshots come back through a ``SharedSnapshotSlot`` as a
+    keyframe followed by appended deltas (``snapshot_codec``), and only the
+    messages added since the last read are copied and decoded. The worker is a plain
+    subprocess rather than a multiprocessing child because spawn would
+    re-execute the Streamlit script as its main module.
+    """
+
+    def __init__(self, slot_size: int = DEFAULT_SLOT_SIZE, history_dir: Optional[str] = None,
+                 metrics_db: Optional[str] = None):
+        from sumo_integration import SIMULATION_CONFIGS
+
+        self.simulation_configs = dict(SIMULATION_CONFIGS)
+        self.slot_size = slot_size
+        self.history_dir = history_dir
+        self.metrics_db = metrics_db
+        self.speed = 1.0
+        self.slot: Optional[SharedSnapshotSlot] = None
+        self.process = None
+        self._conn = None
+        self._command_lock = threading.Lock()
+        # Every session shares the runner; the decoder state advances under this lock
+        self._read_lock = threading.Lock()
+        self._snapshot: Optional[Snapshot] = None
+        self._decoder = SnapshotDecoder()
+        self._epoch: Optional[int] = None
+        self._offset = 0
+        atexit.register(self.shutdown)
+
+    def _ensure_worker(self):
+        if self.process is not None and self.process.poll() is None:
+            return
+        self.shutdown()
+        self.slot = SharedSnapshotSlot(size=self.slot_size)
+        authkey = secrets.token_bytes(32)
+
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            server.settimeout(COMMAND_TIMEOUT)
+            self.process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), self.slot.name, str(server.getsockname()[1]),
+                 str(self.history_dir or ""), str(self.metrics_db or "")],
+                env={**os.environ, AUTHKEY_ENV: authkey.hex()}
+            )
+            try:
+                sock, _ = server.accept()
+            except socket.timeout:
+                self.process.kill()
+                self.shutdown()
+                raise RuntimeError("Simulation worker did not connect")
+
+        self._conn = Connection(sock.detach())
+        deliver_challenge(self._conn, authkey)
+        answer_challenge(self._conn, authkey)
+
+    def _command(self, command: str, argument: Any = None) -> Any:
+        with self._command_lock:
+            self._ensure_worker()
+            self._conn.send((command, argument))
+            if not self._conn.poll(COMMAND_TIMEOUT):
+                print(f"⚠️ Simulation worker did not answer '{command}', restarting it")
+                self.shutdown()
+                return None
+            return self._conn.recv()
+
+    @property
+    def is_running(self) -> bool:
+        return self.slot is not None and self.slot.running
+
+    def start_simulation(self, scenario: str = "uniform", duration: int = 3600, control_mode: str = "adaptive",
+                         speed: Optional[float] = 1.0, publish_interval: Optional[float] = None,
+                         step_interval: int = 1, observe_interval: Optional[int] = None,
+                         decision_interval: Optional[int] = None, record_path: Optional[str] = None,
+                         seed: Optional[int] = None) -> bool:
+        """Start the simulation in the worker process"""
+        self.speed = speed
+        return bool(self._command("start", {
+            "scenario": scenario,
+            "duration": duration,
+            "control_mode": control_mode,
+            "speed": speed,
+            "publish_interval": publish_interval,
+            "step_interval": step_interval,
+            "observe_interval": observe_interval,
+            "decision_interval": decision_interval,
+            "record_path": record_path,
+            "seed": seed
+        }))
+
+    def stop_simulation(self):
+        if self.process is not None and self.process.poll() is None:
+            self._command("stop")
+
+    def emergency_stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self._command("emergency_stop")
+
+    def change_signal_manually(self, phase_id: int, duration: float = 30.0) -> bool:
+        return bool(self._command("manual_phase", (phase_id, duration)))
+
+    def get_simulation_status(self) -> Dict[str, Any]:
+        status = self._command("status") or {}
+        status["runner"] = "process"
+        return status
+
+    def get_snapshot(self, since_version: Optional[int] = None) -> Optional[Snapshot]:
+        """Latest snapshot from shared memory, or None if nothing newer than since_version"""
+        with self._read_lock:
+            slot = self.slot
+            if slot is None:
+                return None
+            cached = self._snapshot
+            known = cached.version if cached else None
+            result = slot.read_from(self._epoch, self._offset, since_version=known)
+            if result is not None:
+                try:
+                    self._apply(result)
+                except (pickle.UnpicklingError, EOFError, ValueError, KeyError, TypeError) as e:
+                    # The stream did not continue where we stopped: start over from the keyframe
+                    print(f"⚠️ Snapshot stream out of step ({e!r}), re-reading from the keyframe")
+                    self._decoder.reset()
+                    self._epoch, self._offset = None, 0
+                    result = slot.read_from(since_version=known)
+                    if result is not None:
+                        self._apply(result)
+                if self._decoder.data is not None and self._decoder.version != known:
+                    cached = self._snapshot = Snapshot(self._decoder.version, MappingProxyType(self._decoder.data),
+                                                       result[2])
+        if cached is None or (since_version is not None and cached.version <= since_version):
+            return None
+        return cached
+
+    def _apply(self, result: Tuple[int, bytes, float, int, bool]):
+        """Decode the bytes ``read_from`` returned and advance the stream position past them"""
+        version, stream, published_at, epoch, restarted = result
+        if restarted:
+            self._decoder.reset()
+            self._epoch, self._offset = epoch, 0
+        # Only the keyframe and deltas not applied yet are decoded
+        for message in iter_frames(stream):
+            self._decoder.decode(message)
+        self._offset += len(stream)
+
+    def get_current_data(self) -> Optional[Dict[str, Any]]:
+        snapshot = self.get_snapshot()
+        if snapshot:
+            return snapshot.data
+        from sumo_integration import SumoStreamlitIntegration
+        return SumoStreamlitIntegration._get_default_dashboard_data()
+
+    def shutdown(self):
+        """Stop the worker process and release the shared memory"""
+        if self.process is not None:
+            if self.process.poll() is None:
+                try:
+                    self._conn.send(("shutdown", None))
+                    self._conn.poll(COMMAND_TIMEOUT)
+                except (AttributeError, OSError):
+                    pass
+                try:
+                    self.process.wait(timeout=5.0)
+                except subprocess.TimeoutExpired:
+                    self.process.terminate()
+            self.process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        with self._read_lock:
+            if self.slot is not None:
+                self.slot.close()
+                self.slot = None
+            self._snapshot = None
+            self._decoder.reset()
+            self._epoch, self._offset = None, 0
+
+
+if __name__ == "__main__":
+    # Worker entry point: process_runner.py <slot name> <control port> [history dir] [metrics db]
+    _simulation_worker(sys.argv[1], _connect_control_channel(int(sys.argv[2]), bytes.fromhex(os.environ[AUTHKEY_ENV])),
+                       *(arg or None for arg in sys.argv[3:5]))
@@ -0,0 +1,168 @@
+"""
+Simulation Recording
+Compact binary recordings of per-step simulation state with a keyframe seek index
+"""
+
+import bisect
+import dataclasses
+import json
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# File layout: MAGIC, then blocks of [_BLOCK header | zlib(JSON frame list)],
+# then zlib(JSON index) and the _TRAILER pointing at it
+MAGIC = b"TSREC01\n"
+_BLOCK = struct.Struct("<IId")          # compressed length, frame count, first simulation time
+_TRAILER = struct.Struct("<Q8s")        # index offset, trailer magic
+_TRAILER_MAGIC = b"TSRIDX01"
+
+# Frames per compressed block; every block starts with a self-contained keyframe
+DEFAULT_BLOCK_FRAMES = 256
+
+RECORDING_SUFFIX = ".tsrec"
+
+
+def _fields(obj) -> Optional[Dict[str, Any]]:
+    if obj is None:
+        return None
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return dict(vars(obj))
+
+
+class SnapshotRecorder:
+    """Appends (TrafficState, LiveMetrics, signal info) frames to a recording file.
+
+    Frames are buffered and written as zlib-compressed blocks; the block
+    offsets and first simulation times form the seek index written on
+    ``close``. A recording whose writer died without closing is still
+    readable: ``RecordingReader`` rebuilds the index from the block headers.
+    """
+
+    def __init__(self, path, block_frames: int = DEFAULT_BLOCK_FRAMES, metadata: Optional[Dict[str, Any]] = None):
+        self.path = str(path)
+        self.block_frames = block_frames
+        self.metadata = dict(metadata or {})
+        self.frame_count = 0
+        self._frames: List[Tuple] = []
+        self._index: List[Tuple[float, int, int]] = []
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+
+    def append(self, traffic_state, live_metrics=None, signal_info: Optional[Dict[str, Any]] = None):
+        """Record one observed step"""
+        self._frames.append((float(traffic_state.timestamp), _fields(traffic_state), _fields(live_metrics),
+                             dict(signal_info) if signal_info else None))
+        self.frame_count += 1
+        if len(self._frames) >= self.block_frames:
+            self.flush()
+
+    def flush(self):
+        """Write buffered frames as one block"""
+        if not self._frames or self._file is None:
+            return
+        # JSON rather than pickle so opening a recording never executes code
+        payload = zlib.compress(json.dumps(self._frames, separators=(",", ":")).encode())
+        offset = self._file.tell()
+        self._file.write(_BLOCK.pack(len(payload), len(self._frames), self._frames[0][0]))
+        self._file.write(payload)
+        self._file.flush()
+        self._index.append((self._frames[0][0], offset, len(self._frames)))
+        self._frames = []
+
+    def close(self):
+        """Flush remaining frames and write the seek index"""
+        if self._file is None:
+            return
+        self.flush()
+        index_offset = self._file.tell()
+        self._file.write(zlib.compress(json.dumps({"metadata": self.metadata, "blocks": self._index}).encode()))
+        self._file.write(_TRAILER.pack(index_offset, _TRAILER_MAGIC))
+        self._file.close()
+        self._file = None
+
+
+class RecordingReader:
+    """Random access to a recording through its keyframe block index.
+
+    ``seek`` bisects the block index and then the frames of a single
+    decompressed block, so locating any simulation time is O(log n) and
+    decompresses one block.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a simulation recording")
+            self.metadata, blocks = self._load_index(f)
+        self.block_times = [block[0] for block in blocks]
+        self.block_offsets = [block[1] for block in blocks]
+        self.frame_count = sum(block[2] for block in blocks)
+        self._cached_block: Tuple[int, List[Tuple]] = (-1, [])
+
+    @staticmethod
+    def _load_index(f) -> Tuple[Dict[str, Any], List]:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size >= len(MAGIC) + _TRAILER.size:
+            f.seek(size - _TRAILER.size)
+            index_offset, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+            if magic == _TRAILER_MAGIC:
+                f.seek(index_offset)
+                index = json.loads(zlib.decompress(f.read(size - _TRAILER.size - index_offset)))
+                return index["metadata"], index["blocks"]
+
+        # Unclosed recording: walk the block headers, dropping a torn last block
+        blocks, offset = [], len(MAGIC)
+        while offset + _BLOCK.size <= size:
+            f.seek(offset)
+            length, count, first_time = _BLOCK.unpack(f.read(_BLOCK.size))
+            if offset + _BLOCK.size + length > size:
+                break
+            blocks.append((first_time, offset, count))
+            offset += _BLOCK.size + length
+        return {}, blocks
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    @property
+    def start_time(self) -> float:
+        return self.block_times[0] if self.block_times else 0.0
+
+    @property
+    def end_time(self) -> float:
+        if not self.block_times:
+            return 0.0
+        return self._block(len(self.block_times) - 1)[-1][0]
+
+    def _block(self, block: int) -> List[Tuple]:
+        if self._cached_block[0] != block:
+            with open(self.path, "rb") as f:
+                f.seek(self.block_offsets[block])
+                length, _, _ = _BLOCK.unpack(f.read(_BLOCK.size))
+                frames = json.loads(zlib.decompress(f.read(length)))
+            self._cached_block = (block, frames)
+        return self._cached_block[1]
+
+    def seek(self, simulation_time: float) -> Tuple[int, int]:
+        """(block, frame) position of the last frame at or before ``simulation_time``"""
+        if not self.block_times:
+            return 0, 0
+        block = max(0, bisect.bisect_right(self.block_times, simulation_time) - 1)
+        times = [frame[0] for frame in self._block(block)]
+        return block, max(0, bisect.bisect_right(times, simulation_time) - 1)
+
+    def frames(self, start_time: Optional[float] = None) -> Iterator[Tuple]:
+        """Yield (simulation_time, traffic_state, live_metrics, signal_info) frames from ``start_time``"""
+        block, frame = self.seek(start_time) if start_time is not None else (0, 0)
+        for b in range(block, len(self.block_offsets)):
+            frames = self._block(b)
+            yield from frames[frame:]
+            frame = 0
@@ -0,0 +1,132 @@
+"""
+Recording Replay
+Plays a simulation recording back through the dashboard snapshot pipeline
+"""
+
+import dataclasses
+import threading
+from typing import Any, Dict, Optional
+
+from recording import RecordingReader
+from sumo_integration import LiveMetrics, SimulationPacer, SumoStreamlitIntegration, TrafficState
+
+# Wall-clock seconds per recorded simulated second at 1x
+REPLAY_STEP_DELAY = 1.0
+
+
+def _restore(cls, fields: Optional[Dict[str, Any]]):
+    """Rebuild a recorded state object, ignoring fields this build does not know"""
+    if fields is None:
+        return None
+    if dataclasses.is_dataclass(cls):
+        known = {field.name for field in dataclasses.fields(cls)}
+        fields = {key: value for key, value in fields.items() if key in known}
+    return cls(**fields)
+
+
+class ReplayIntegration(SumoStreamlitIntegration):
+    """Read-only integration that replays a recording instead of running SUMO.
+
+    Frames go through the same history buffers and snapshot publisher as a
+    live run, so ``load_data`` and every panel work unchanged. ``speed``
+    scales the recorded simulation clock (``None`` replays as fast as
+    possible, e.g. for benchmarks) and ``seek`` jumps to any simulation time
+    through the recording's keyframe index.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.reader = RecordingReader(path)
+        self.position = self.reader.start_time
+        # Bumped per start_replay; a playback thread from an earlier start stops
+        # at its next frame and leaves is_running alone, however long it lingers
+        self._generation = 0
+
+    def start_simulation(self, *args, **kwargs) -> bool:
+        """Replays do not simulate; use ``start_replay``"""
+        raise TypeError("ReplayIntegration cannot start a simulation; use start_replay() to play the recording")
+
+    def start_replay(self, speed: Optional[float] = 1.0, start_time: Optional[float] = None,
+                     publish_interval: Optional[float] = None) -> bool:
+        """Play the recording from ``start_time`` (default: its beginning)"""
+        self.stop_simulation()
+        if not len(self.reader):
+            return False
+        self.speed = speed
+        self.publish_interval = publish_interval
+        self.history.clear()
+        self._generation += 1
+        self.is_running = True
+        start_time = self.reader.start_time if start_time is None else start_time
+        self.simulation_thread = threading.Thread(target=self._run_replay_loop, args=(start_time, None, self._generation),
+                                                  daemon=True)
+        self.simulation_thread.start()
+        return True
+
+    def seek(self, simulation_time: float) -> bool:
+        """Continue playback (or show the frame) at ``simulation_time``"""
+        if self.is_running:
+            return self.start_replay(self.speed, simulation_time, self.publish_interval)
+        self.history.clear()
+        self._run_replay_loop(simulation_time, max_frames=0)
+        return True
+
+    def _run_replay_loop(self, start_time: float, max_frames: Optional[int] = None, generation: Optional[int] = None):
+        """Backfill history from the keyframe block, then play frames at the replay speed.
+
+        With ``max_frames`` the loop stops after that many frames from
+        ``start_time`` on, and never consumes a frame after ``start_time``
+        beyond them, so ``max_frames=0`` shows the frame at or before it.
+        """
+        generation = self._generation if generation is None else generation
+        traffic_state = live_metrics = signal_info = None
+        try:
+            block, _ = self.reader.seek(start_time)
+            keyframe_time = self.reader.block_times[block]
+            pacer = SimulationPacer(REPLAY_STEP_DELAY, self.speed, self.publish_interval)
+            previous_time = None
+            played = 0
+
+            for simulation_time, state_fields, metrics_fields, frame_signal in self.reader.frames(keyframe_time):
+                if generation != self._generation:
+                    break
+                if max_frames is not None and played >= max_frames and simulation_time > start_time:
+                    break
+                traffic_state = _restore(TrafficState, state_fields)
+                live_metrics = _restore(LiveMetrics, metrics_fields)
+                signal_info = frame_signal or {}
+                self._record_history(traffic_state, live_metrics)
+                self.position = simulation_time
+                if simulation_time < start_time:
+                    continue
+                if max_frames is not None and played >= max_frames:
+                    break
+                if not self.is_running and max_frames is None:
+                    break
+
+                if previous_time is not None:
+                    pacer.wait(simulation_time - previous_time)
+                previous_time = simulation_time
+                played += 1
+                if pacer.should_publish():
+                    self._update_dashboard_data(traffic_state, live_metrics, signal_info)
+
+            if traffic_state and generation == self._generation:
+                self._update_dashboard_data(traffic_state, live_metrics, signal_info)
+        except Exception as e:
+            print(f"Replay error: {e}")
+        finally:
+            if generation == self._generation:
+                self.is_running = False
+
+    def get_simulation_status(self) -> Dict[str, Any]:
+        status = super().get_simulation_status()
+        status.update({
+            "runner": "replay",
+            "simulation_state": "running" if self.is_running else "stopped",
+            "recording": self.reader.path,
+            "position": self.position,
+            "start_time": self.reader.start_time,
+            "end_time": self.reader.end_time
+        })
+        return status
@@ -0,0 +1,181 @@
+"""
+Reward Log
+Buffered, rotating writer and incremental tailer for the per-step reward_log.csv
+"""
+
+import csv
+import io
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pandas as pd
+
+# Column order of reward_log.csv
+REWARD_LOG_COLUMNS = (
+    "step", "timestamp", "waiting_time_change", "queue_penalty", "throughput_reward", "efficiency_reward",
+    "total_reward", "current_waiting_time", "current_queue_length", "avg_speed", "vehicle_count"
+)
+
+# Buffered rows are written once this many accumulate or this many seconds pass
+DEFAULT_FLUSH_ROWS = 256
+DEFAULT_FLUSH_SECONDS = 2.0
+
+# The log is rotated to reward_log.csv.1 (.2, ...) once it reaches this size
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+# Rows the tailer keeps in memory
+DEFAULT_TAIL_ROWS = 100_000
+
+
+def _header() -> str:
+    return ",".join(REWARD_LOG_COLUMNS) + "\n"
+
+
+class RewardLogger:
+    """Per-step reward logging that stays off the training loop's hot path.
+
+    ``log`` only appends a tuple to a buffer; rows are formatted and written
+    with one ``write`` per batch, so readers see whole lines. The file is
+    rotated like ``logging.handlers.RotatingFileHandler`` once it exceeds
+    ``max_bytes`` or, with ``rotate_seconds``, once it is that old.
+    """
+
+    def __init__(self, path, flush_rows: int = DEFAULT_FLUSH_ROWS, flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, rotate_seconds: Optional[float] = None,
+                 backups: int = DEFAULT_BACKUPS):
+        self.path = Path(path)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self._rows: List[tuple] = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._opened_at = 0.0
+        self._open()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", newline="")
+        if self._file.tell() == 0:
+            self._file.write(_header())
+            self._file.flush()
+        self._opened_at = time.time()
+
+    def log(self, step: int, timestamp: Optional[float] = None, **fields: Any):
+        """Buffer one step; missing columns are left empty"""
+        fields["step"] = step
+        fields["timestamp"] = time.time() if timestamp is None else timestamp
+        self._rows.append(tuple(fields.get(column, "") for column in REWARD_LOG_COLUMNS))
+        if len(self._rows) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows in one call and rotate if due"""
+        self._last_flush = time.monotonic()
+        if not self._rows or self._file is None:
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(self._rows)
+        self._rows = []
+        self._file.write(buffer.getvalue())
+        self._file.flush()
+
+        too_big = self._file.tell() >= self.max_bytes
+        too_old = self.rotate_seconds is not None and time.time() - self._opened_at >= self.rotate_seconds
+        if too_big or too_old:
+            self.rotate()
+
+    def rotate(self):
+        """Move the log to .1 (shifting older backups) and start a new one"""
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._open()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RewardLogTailer:
+    """Incremental reader of a reward log that may still be written.
+
+    ``read`` parses only the complete lines added since the saved byte
+    offset and returns the last ``max_rows`` rows as a DataFrame (the same
+    object while nothing changed). After a rotation it finishes the rotated
+    file before starting on the new one.
+    """
+
+    def __init__(self, path, max_rows: int = DEFAULT_TAIL_ROWS):
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self._inode = None
+        self._offset = 0
+        self._df = pd.DataFrame(columns=list(REWARD_LOG_COLUMNS))
+        self._lock = threading.Lock()
+
+    def read(self) -> pd.DataFrame:
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                return self._df
+
+            chunks = []
+            if self._inode is not None and stat.st_ino != self._inode:
+                # Rotated: pick up what was appended to the old file after our last read
+                rotated = self.path.with_name(f"{self.path.name}.1")
+                if rotated.exists() and rotated.stat().st_ino == self._inode:
+                    chunks.append(self._read_from(rotated, self._offset))
+                self._offset = 0
+            elif stat.st_size < self._offset:
+                self._offset = 0
+            self._inode = stat.st_ino
+
+            if stat.st_size > self._offset:
+                chunk = self._read_from(self.path, self._offset)
+                self._offset += len(chunk)
+                chunks.append(chunk)
+
+            new_rows = [rows for rows in map(self._parse, chunks) if rows is not None]
+            if new_rows:
+                frames = [self._df, *new_rows] if len(self._df) else new_rows
+                self._df = pd.concat(frames, ignore_index=True).iloc[-self.max_rows:].reset_index(drop=True)
+            return self._df
+
+    @staticmethod
+    def _read_from(path: Path, offset: int) -> bytes:
+        """Complete lines from ``offset`` on"""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        return data[:data.rfind(b"\n") + 1]
+
+    @staticmethod
+    def _parse(chunk: bytes) -> Optional[pd.DataFrame]:
+        header = _header().encode()
+        if chunk.startswith(header):
+            chunk = chunk[len(header):]
+        if not chunk:
+            return None
+        return pd.read_csv(io.BytesIO(chunk), names=list(REWARD_LOG_COLUMNS), header=None)
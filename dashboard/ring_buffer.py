@@ -0,0 +1,171 @@
+"""
+Ring Buffer History
+Fixed-capacity NumPy ring buffers for live time-series metrics
+"""
+
+import numpy as np
+from typing import Dict, List, Optional
+
+# Four hours of 1 Hz samples per metric
+DEFAULT_HISTORY_CAPACITY = 4 * 3600
+
+# Maximum number of lanes tracked in the per-lane queue history
+DEFAULT_MAX_LANES = 32
+
+# Metric name -> key used in the dashboard "time_series_data" block
+HISTORY_METRICS = {
+    "simulation_time": "simulation_times",
+    "efficiency": "efficiency_scores",
+    "wait_time": "wait_times",
+    "vehicle_count": "vehicle_counts",
+    "queue_length": "queue_lengths",
+    "speed": "speeds"
+}
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer with O(1) append and zero-copy windows.
+
+    Every value is written twice (at ``i`` and ``i + size``) so the latest
+    values always form one contiguous slice of the backing array. ``headroom``
+    extra slots keep a window of up to ``capacity`` values unchanged for at
+    least ``headroom`` further appends, so readers on other threads can use
+    the views without copying.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64, width: Optional[int] = None, headroom: int = 0):
+        self.capacity = capacity
+        self._size = capacity + headroom
+        shape = (2 * self._size,) if width is None else (2 * self._size, width)
+        self._data = np.zeros(shape, dtype=dtype)
+        self.count = 0
+
+    def append(self, value):
+        """Append one value (or one row when the buffer has a width)"""
+        i = self.count % self._size
+        self._data[i] = value
+        self._data[i + self._size] = value
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def window(self, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the latest ``n`` values (all retained values by default)"""
+        size = len(self) if n is None else max(0, min(n, len(self)))
+        end = self._size + self.count % self._size
+        view = self._data[end - size:end]
+        view.flags.writeable = False
+        return view
+
+    def latest(self):
+        """Most recent value, or None when empty"""
+        if self.count == 0:
+            return None
+        return self._data[self._size + (self.count - 1) % self._size]
+
+    def clear(self):
+        """Drop all values without releasing memory"""
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+
+class MetricHistory:
+    """Per-metric ring buffers for the live dashboard history.
+
+    Holds one buffer per entry of ``HISTORY_METRICS`` plus a 2-D buffer of
+    per-lane queue lengths. Lanes are assigned columns in order of first
+    appearance; lanes beyond ``max_lanes`` are not tracked.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY, max_lanes: int = DEFAULT_MAX_LANES):
+        headroom = max(1, capacity // 4)
+        self.capacity = capacity
+        self.max_lanes = max_lanes
+        self.buffers = {name: RingBuffer(capacity, headroom=headroom) for name in HISTORY_METRICS}
+        self.lane_queues = RingBuffer(capacity, dtype=np.float32, width=max_lanes, headroom=headroom)
+        self.lane_ids: List[str] = []
+        self._lane_index: Dict[str, int] = {}
+        self._lane_row = np.zeros(max_lanes, dtype=np.float32)
+        # (LaneTable, table positions, history columns) of the last compact lane map
+        self._lane_columns = (None, None, None)
+
+    def append(self, simulation_time: float, efficiency: float, wait_time: float, vehicle_count: int,
+               queue_length: float, speed: float, lane_queues: Optional[Dict[str, float]] = None):
+        """Record one simulation step"""
+        buffers = self.buffers
+        buffers["simulation_time"].append(simulation_time)
+        buffers["efficiency"].append(efficiency)
+        buffers["wait_time"].append(wait_time)
+        buffers["vehicle_count"].append(vehicle_count)
+        buffers["queue_length"].append(queue_length)
+        buffers["speed"].append(speed)
+
+        row = self._lane_row
+        row.fill(0)
+        lanes = getattr(lane_queues, "lanes", None)
+        if lanes is not None:
+            # Array-backed LaneMap: map its table to columns once, then scatter
+            if self._lane_columns[0] is not lanes:
+                self._lane_columns = (lanes, *self._map_lanes(lanes))
+            _, positions, columns = self._lane_columns
+            row[columns] = lane_queues.values[positions]
+            self.lane_queues.append(row)
+            return
+        for lane_id, queue in (lane_queues or {}).items():
+            index = self._lane_index.get(lane_id)
+            if index is None:
+                if len(self.lane_ids) >= self.max_lanes:
+                    continue
+                index = self._lane_index[lane_id] = len(self.lane_ids)
+                self.lane_ids.append(lane_id)
+            row[index] = queue
+        self.lane_queues.append(row)
+
+    def _map_lanes(self, lane_ids):
+        """(positions in ``lane_ids``, history columns) for every tracked lane, registering new ones"""
+        positions, columns = [], []
+        for position, lane_id in enumerate(lane_ids):
+            index = self._lane_index.get(lane_id)
+            if index is None:
+                if len(self.lane_ids) >= self.max_lanes:
+                    continue
+                index = self._lane_index[lane_id] = len(self.lane_ids)
+                self.lane_ids.append(lane_id)
+            positions.append(position)
+            columns.append(index)
+        return np.array(positions, dtype=np.intp), np.array(columns, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.buffers["simulation_time"])
+
+    def window(self, n: Optional[int] = None, copy: bool = False) -> Dict[str, np.ndarray]:
+        """Latest ``n`` samples keyed like ``time_series_data``: zero-copy views,
+        or arrays of their own with ``copy`` (for data that outlives the next appends)"""
+        return {key: self.buffers[name].window(n).copy() if copy else self.buffers[name].window(n)
+                for name, key in HISTORY_METRICS.items()}
+
+    def lane_window(self, n: Optional[int] = None, copy: bool = False) -> Dict[str, np.ndarray]:
+        """Per-lane queues of the latest ``n`` samples: zero-copy views, or one
+        copy of the tracked lanes with ``copy``"""
+        queues = self.lane_queues.window(n)
+        if copy:
+            queues = queues[:, :len(self.lane_ids)].copy()
+        return {lane_id: queues[:, i] for i, lane_id in enumerate(self.lane_ids)}
+
+    def clear(self):
+        """Reset the history for a new run"""
+        for buffer in self.buffers.values():
+            buffer.clear()
+        self.lane_queues.clear()
+        self.lane_ids = []
+        self._lane_index = {}
+        self._lane_columns = (None, None, None)
+
+    @property
+    def nbytes(self) -> int:
+        """Fixed memory footprint of all buffers"""
+        return sum(b.nbytes for b in self.buffers.values()) + self.lane_queues.nbytes
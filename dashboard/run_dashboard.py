@@ -139,8 +139,17 @@ def main():
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     parser.add_argument("--install-deps", action="store_true", help="Install dependencies")
     parser.add_argument("--setup-only", action="store_true", help="Setup environment only, don't launch")
+    parser.add_argument("--batch", action="store_true",
+                        help="Run a headless batch evaluation instead of the UI (other options go to batch_eval.py)")
     
-    args = parser.parse_args()
+    args, batch_args = parser.parse_known_args()
+    if batch_args and not args.batch:
+        parser.error(f"unrecognized arguments: {' '.join(batch_args)}")
+    
+    if args.batch:
+        setup_environment()
+        from batch_eval import main as run_batch_evaluation
+        return run_batch_evaluation(batch_args)
     
     print("🚦 AI Traffic Management Dashboard Setup")
     print("=" * 50)
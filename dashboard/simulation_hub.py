@@ -0,0 +1,99 @@
+"""
+Simulation Hub
+One process-wide simulation shared by every browser session viewing the dashboard
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Seconds without a rerun after which a viewer counts as gone (when the
+# Streamlit runtime cannot tell us directly)
+VIEWER_IDLE_TIMEOUT = 30.0
+
+# Seconds between checks for departed viewers
+REAPER_INTERVAL = 5.0
+
+# Viewer id used outside a Streamlit session (scripts and tests)
+LOCAL_VIEWER_ID = "local"
+
+
+def current_viewer_id() -> str:
+    """Streamlit session id of the current script run"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else LOCAL_VIEWER_ID
+
+
+class SimulationHub:
+    """Reference-counted owner of the shared simulation runner.
+
+    Every dashboard rerun attaches its session as a viewer, so N operators
+    cost one simulation thread (or worker process) and one snapshot stream.
+    A background reaper drops viewers whose session disconnected (or that
+    have not rerun within ``idle_timeout``) and stops the simulation once
+    the last viewer is gone.
+    """
+
+    def __init__(self, runner: str = "thread", idle_timeout: float = VIEWER_IDLE_TIMEOUT,
+                 history_dir: Optional[str] = None, metrics_db: Optional[str] = None):
+        from sumo_integration import create_sumo_integration
+
+        self.integration = create_sumo_integration(runner, history_dir, metrics_db)
+        self.idle_timeout = idle_timeout
+        self._viewers: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._reaper = threading.Thread(target=self._reap_loop, name="simulation-hub-reaper", daemon=True)
+        self._reaper.start()
+
+    def attach(self, viewer_id: Optional[str] = None):
+        """Register (or refresh) a viewer and return the shared integration"""
+        with self._lock:
+            self._viewers[viewer_id or current_viewer_id()] = time.monotonic()
+        return self.integration
+
+    def detach(self, viewer_id: Optional[str] = None):
+        """Remove a viewer; stops the simulation when it was the last one"""
+        with self._lock:
+            self._viewers.pop(viewer_id or current_viewer_id(), None)
+            idle = not self._viewers
+        if idle:
+            self._stop_idle_simulation()
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self._viewers)
+
+    def _is_connected(self, viewer_id: str, last_seen: float, now: float) -> bool:
+        if runtime.exists() and viewer_id != LOCAL_VIEWER_ID:
+            return runtime.get_instance().is_active_session(viewer_id)
+        return now - last_seen < self.idle_timeout
+
+    def reap(self):
+        """Drop departed viewers and stop the simulation if none are left"""
+        now = time.monotonic()
+        with self._lock:
+            for viewer_id, last_seen in list(self._viewers.items()):
+                if not self._is_connected(viewer_id, last_seen, now):
+                    del self._viewers[viewer_id]
+            idle = not self._viewers
+        if idle:
+            self._stop_idle_simulation()
+
+    def _stop_idle_simulation(self):
+        if self.integration.is_running:
+            print("👋 Last viewer left - stopping shared simulation")
+            self.integration.stop_simulation()
+        if hasattr(self.integration, "shutdown"):
+            # Release the worker process of an out-of-process runner
+            self.integration.shutdown()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(REAPER_INTERVAL)
+            try:
+                self.reap()
+            except Exception as e:
+                print(f"⚠️ Simulation hub reaper error: {e}")
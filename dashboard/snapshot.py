@@ -0,0 +1,65 @@
+"""
+Snapshot Publishing
+Immutable, versioned dashboard snapshots shared between the simulation thread and the UI
+"""
+
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, List, Mapping, Optional
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One published dashboard state; never modified after publishing"""
+    version: int
+    data: Mapping[str, Any]
+    published_at: float
+
+
+class SnapshotPublisher:
+    """Single-writer, lock-free snapshot publisher.
+
+    The writer builds a complete dashboard dict and hands it over with
+    ``publish``; the new ``Snapshot`` replaces the previous one in a single
+    reference assignment, which is atomic under the GIL. Readers never block
+    the writer and use ``get(since_version)`` to skip work when nothing new
+    has been published. Published dicts are owned by the snapshot and must
+    not be mutated afterwards.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[Snapshot] = None
+        self._version = 0
+        self._listeners: List[Callable[[Snapshot], None]] = []
+
+    def publish(self, data: Mapping[str, Any]) -> Snapshot:
+        """Publish a new snapshot and notify listeners (called from the writer thread)"""
+        self._version += 1
+        snapshot = Snapshot(self._version, MappingProxyType(data), time.time())
+        self._snapshot = snapshot
+        for listener in list(self._listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"⚠️ Snapshot listener failed: {e}")
+        return snapshot
+
+    def get(self, since_version: Optional[int] = None) -> Optional[Snapshot]:
+        """Latest snapshot, or None if there is none newer than ``since_version``"""
+        snapshot = self._snapshot
+        if snapshot is None or (since_version is not None and snapshot.version <= since_version):
+            return None
+        return snapshot
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def add_listener(self, listener: Callable[[Snapshot], None]):
+        """Register a callback invoked with every published snapshot"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Snapshot], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
@@ -0,0 +1,213 @@
+"""
+Snapshot Codec
+Keyframe + field-level delta encoding of dashboard snapshots for cross-process transports
+"""
+
+import pickle
+import struct
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+# A keyframe is emitted after this many deltas so late joiners resync quickly
+DEFAULT_KEYFRAME_INTERVAL = 100
+
+# Candidate shifts tried when matching a sliding ring buffer window
+_MAX_SHIFT_CANDIDATES = 8
+
+KEYFRAME = "K"
+DELTA = "D"
+
+# Length prefix of one framed message in a byte stream
+_FRAME = struct.Struct("<I")
+
+Path = Tuple[str, ...]
+
+
+def _is_branch(value) -> bool:
+    return isinstance(value, (dict, MappingProxyType))
+
+
+def _flatten(data: Mapping[str, Any], prefix: Path = ()) -> Dict[Path, Any]:
+    """Leaves of nested dicts keyed by their path; arrays, lane maps and lists are leaves"""
+    leaves = {}
+    for key, value in data.items():
+        path = prefix + (key,)
+        if _is_branch(value) and value:
+            leaves.update(_flatten(value, path))
+        else:
+            leaves[path] = value
+    return leaves
+
+
+def _same(a, b) -> bool:
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and a.shape == b.shape
+                and a.dtype == b.dtype and np.array_equal(a, b))
+    values = getattr(a, "values", None)
+    if isinstance(values, np.ndarray):
+        # Array-backed LaneMap
+        return getattr(a, "lanes", None) is getattr(b, "lanes", False) and _same(values, getattr(b, "values", None))
+    try:
+        return type(a) is type(b) and bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _array_shift(old: np.ndarray, new: np.ndarray) -> Optional[Tuple[int, np.ndarray]]:
+    """(dropped, appended) if ``new`` is ``old`` minus its first rows plus a tail"""
+    if old.ndim == 0 or old.shape[1:] != new.shape[1:] or old.dtype != new.dtype or not len(old):
+        return None
+    if len(new) >= len(old) and np.array_equal(new[:len(old)], old):
+        return 0, new[len(old):]
+    if not len(new):
+        return None
+    # Full ring buffer window: find how far it slid
+    first = new[0] if new.ndim == 1 else new[0, 0]
+    column = old if old.ndim == 1 else old[:, 0]
+    for shift in np.flatnonzero(column == first)[:_MAX_SHIFT_CANDIDATES]:
+        kept = len(old) - shift
+        if shift and kept <= len(new) and np.array_equal(old[shift:], new[:kept]):
+            return int(shift), new[kept:]
+    return None
+
+
+class SnapshotEncoder:
+    """Simulation side: turns each published dict into a keyframe or a delta.
+
+    A delta lists only the leaves that changed since the previous snapshot:
+    replaced values, removed paths, and NumPy arrays that merely slid
+    forward (ring buffer windows) as the number of dropped rows plus the
+    appended rows. Messages are pickled ``(kind, version, base, body)``.
+    """
+
+    def __init__(self, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self._leaves: Optional[Dict[Path, Any]] = None
+        self._version: Optional[int] = None
+        self._since_keyframe = 0
+
+    def force_keyframe(self):
+        """Make the next message a keyframe (e.g. after a transport reset)"""
+        self._leaves = None
+
+    def encode(self, version: int, data: Mapping[str, Any]) -> Tuple[str, bytes]:
+        leaves = _flatten(data)
+        previous, base = self._leaves, self._version
+        # Ring buffer windows are views the simulation keeps writing into
+        self._leaves = {path: value.copy() if isinstance(value, np.ndarray) else value
+                        for path, value in leaves.items()}
+        self._version = version
+
+        if previous is None or self._since_keyframe >= self.keyframe_interval:
+            self._since_keyframe = 0
+            return KEYFRAME, pickle.dumps((KEYFRAME, version, None, dict(data)), protocol=pickle.HIGHEST_PROTOCOL)
+
+        changed, extended = {}, {}
+        for path, value in leaves.items():
+            old = previous.get(path, previous)
+            if old is previous:
+                changed[path] = value
+            elif not _same(old, value):
+                shift = _array_shift(old, value) if isinstance(old, np.ndarray) and isinstance(value, np.ndarray) else None
+                if shift is None:
+                    changed[path] = value
+                else:
+                    extended[path] = shift
+        removed = [path for path in previous if path not in leaves]
+        self._since_keyframe += 1
+        body = {"set": changed, "extend": extended, "del": removed}
+        return DELTA, pickle.dumps((DELTA, version, base, body), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SnapshotDecoder:
+    """Consumer side: rebuilds full snapshots from keyframes and deltas.
+
+    Applying a delta copies only the dicts on the changed paths, so earlier
+    returned states stay valid. A delta that does not follow the last
+    applied version is rejected until the next keyframe.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.data: Optional[Dict[str, Any]] = None
+
+    def reset(self):
+        self.version = None
+        self.data = None
+
+    def decode(self, message: bytes) -> bool:
+        """Apply one message; False if it could not be applied (missing base)"""
+        kind, version, base, body = pickle.loads(message)
+        if kind == KEYFRAME:
+            self.data, self.version = body, version
+            return True
+        if self.data is None or base != self.version:
+            return False
+
+        data = dict(self.data)
+        copied = {id(data)}
+        # Removals first: a dict that was an empty leaf may now have children
+        for path in body["del"]:
+            _remove(data, path, copied)
+        for path, value in body["set"].items():
+            _assign(data, path, value, copied)
+        for path, (dropped, tail) in body["extend"].items():
+            old = _lookup(self.data, path)
+            _assign(data, path, np.concatenate([old[dropped:], tail]), copied)
+        self.data, self.version = data, version
+        return True
+
+
+def _lookup(data: Mapping[str, Any], path: Path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def _child(data: Dict[str, Any], key: str, copied: set) -> Optional[Dict[str, Any]]:
+    """Writable copy of ``data[key]`` (copied once per decode), or None if it is not a dict"""
+    child = data.get(key)
+    if not _is_branch(child):
+        return None
+    if id(child) not in copied:
+        child = data[key] = dict(child)
+        copied.add(id(child))
+    return child
+
+
+def _assign(data: Dict[str, Any], path: Path, value, copied: set):
+    """Set ``path`` in ``data``, copying the nested dicts on the way"""
+    for key in path[:-1]:
+        child = _child(data, key, copied)
+        if child is None:
+            child = data[key] = {}
+            copied.add(id(child))
+        data = child
+    data[path[-1]] = value
+
+
+def _remove(data: Dict[str, Any], path: Path, copied: set):
+    for key in path[:-1]:
+        data = _child(data, key, copied)
+        if data is None:
+            return
+    data.pop(path[-1], None)
+
+
+def frame(message: bytes) -> bytes:
+    """Length-prefix one message for a byte stream"""
+    return _FRAME.pack(len(message)) + message
+
+
+def iter_frames(stream: bytes) -> Iterator[bytes]:
+    """Messages of a stream of complete frames"""
+    offset = 0
+    while offset + _FRAME.size <= len(stream):
+        (length,) = _FRAME.unpack_from(stream, offset)
+        offset += _FRAME.size
+        yield stream[offset:offset + length]
+        offset += length
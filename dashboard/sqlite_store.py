@@ -0,0 +1,203 @@
+"""
+SQLite Metrics Store
+Per-step metrics in SQLite (WAL) with 10 s, 1 min and 15 min rollups maintained on insert
+"""
+
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+# Rollup table -> bucket width (simulated seconds)
+ROLLUPS = {
+    "metrics_10s": 10,
+    "metrics_1m": 60,
+    "metrics_15m": 900
+}
+RAW_TABLE = "metrics_raw"
+
+# Metric columns shared by the raw and rollup tables
+METRIC_COLUMNS = ("efficiency", "wait_time", "vehicle_count", "queue_length", "speed")
+
+# Points a chart can usefully show; the coarsest resolution with at least this many buckets wins
+DEFAULT_CHART_POINTS = 600
+
+# Buffered rows are committed once this many accumulate or this many wall seconds pass
+DEFAULT_BATCH_ROWS = 500
+DEFAULT_BATCH_SECONDS = 1.0
+
+# PRAGMA user_version of the current layout; older rollup tables are rebuilt from the raw rows
+SCHEMA_VERSION = 1
+
+_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {RAW_TABLE} (
+        ts REAL NOT NULL,
+        run_id TEXT,
+        simulation_time REAL,
+        {", ".join(f"{c} REAL" for c in METRIC_COLUMNS)}
+    )""",
+    f"CREATE INDEX IF NOT EXISTS idx_{RAW_TABLE}_ts ON {RAW_TABLE}(ts)"
+]
+for _table in ROLLUPS:
+    _SCHEMA += [
+        f"""CREATE TABLE IF NOT EXISTS {_table} (
+            run_id TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            ts REAL NOT NULL,
+            n INTEGER NOT NULL,
+            {", ".join(f"{c}_sum REAL NOT NULL" for c in METRIC_COLUMNS)},
+            queue_length_max REAL NOT NULL,
+            PRIMARY KEY (run_id, bucket)
+        )""",
+        f"CREATE INDEX IF NOT EXISTS idx_{_table}_ts ON {_table}(ts)"
+    ]
+
+
+def _rollup_sql(table: str, width: int) -> str:
+    """Fold raw rows with rowid > ? into the rollup buckets.
+
+    Buckets are keyed on (run_id, simulation time), so runs never share a
+    bucket and a bucket spans ``width`` simulated seconds at any playback
+    speed; ``ts`` keeps the wall-clock time of the bucket's first row.
+    """
+    sums = ", ".join(f"SUM({c})" for c in METRIC_COLUMNS)
+    updates = ", ".join(f"{c}_sum = {c}_sum + excluded.{c}_sum" for c in METRIC_COLUMNS)
+    return (
+        f"INSERT INTO {table} (run_id, bucket, ts, n, {', '.join(f'{c}_sum' for c in METRIC_COLUMNS)}, "
+        f"queue_length_max) "
+        f"SELECT COALESCE(run_id, ''), CAST(simulation_time / {width} AS INTEGER) * {width}, MIN(ts), "
+        f"COUNT(*), {sums}, MAX(queue_length) "
+        f"FROM {RAW_TABLE} WHERE rowid > ? GROUP BY 1, 2 "
+        f"ON CONFLICT(run_id, bucket) DO UPDATE SET ts = MIN(ts, excluded.ts), n = n + excluded.n, {updates}, "
+        f"queue_length_max = MAX(queue_length_max, excluded.queue_length_max)"
+    )
+
+
+class SQLiteMetricsStore:
+    """Live metrics in SQLite for SQL access and fast long-range charts.
+
+    ``append`` buffers one row per observed step; ``flush`` inserts the batch
+    into ``metrics_raw`` and folds exactly those rows into every rollup table
+    with one ``INSERT ... SELECT ... ON CONFLICT`` each, inside the same
+    transaction. The database runs in WAL mode so readers (the dashboard or
+    an operator's SQL client) never block the writer. Timestamps are epoch
+    seconds of the step's wall-clock time; rollup buckets are per run and
+    simulated time (see ``_rollup_sql``).
+    """
+
+    def __init__(self, path, batch_rows: int = DEFAULT_BATCH_ROWS, batch_seconds: float = DEFAULT_BATCH_SECONDS):
+        self.path = str(path)
+        self.batch_rows = batch_rows
+        self.batch_seconds = batch_seconds
+        self._rows: List[Tuple] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                # Rollups of the old layout (wall-clock buckets shared by every run)
+                for table in ROLLUPS:
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            if version < SCHEMA_VERSION:
+                for table, width in ROLLUPS.items():
+                    self._conn.execute(_rollup_sql(table, width), (0,))
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def append(self, traffic_state, live_metrics=None, run_id: Optional[str] = None, timestamp: Optional[float] = None):
+        """Buffer one step's metrics"""
+        self._rows.append((
+            time.time() if timestamp is None else timestamp,
+            run_id,
+            float(traffic_state.timestamp),
+            live_metrics.efficiency_score if live_metrics else 85.0,
+            traffic_state.avg_waiting_time,
+            traffic_state.vehicle_count,
+            traffic_state.queue_length,
+            traffic_state.avg_speed * 3.6
+        ))
+        if len(self._rows) >= self.batch_rows or time.monotonic() - self._last_flush >= self.batch_seconds:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered rows and update the rollups in one transaction"""
+        rows, self._rows = self._rows, []
+        self._last_flush = time.monotonic()
+        if not rows:
+            return
+        placeholders = ", ".join("?" * (3 + len(METRIC_COLUMNS)))
+        with self._lock, self._conn:
+            last_rowid = self._conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {RAW_TABLE}").fetchone()[0]
+            self._conn.executemany(
+                f"INSERT INTO {RAW_TABLE} (ts, run_id, simulation_time, {', '.join(METRIC_COLUMNS)}) "
+                f"VALUES ({placeholders})", rows
+            )
+            for table, width in ROLLUPS.items():
+                self._conn.execute(_rollup_sql(table, width), (last_rowid,))
+
+    def runs(self, start: float, end: float) -> List[str]:
+        """Runs with rows in [start, end], most recent first (read from the coarsest rollup)"""
+        table = max(ROLLUPS, key=ROLLUPS.get)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT run_id FROM {table} WHERE ts >= ? AND ts <= ? GROUP BY run_id ORDER BY MAX(ts) DESC",
+                (start, end)
+            ).fetchall()
+        return [run_id for (run_id,) in rows]
+
+    def pick_resolution(self, start: float, end: float, points: int = DEFAULT_CHART_POINTS,
+                        run_id: Optional[str] = None) -> Optional[str]:
+        """Coarsest rollup table with at least ``points`` buckets in [start, end] (of ``run_id``
+        only, when given); None for raw rows"""
+        params: Tuple = (start, end)
+        run_filter = ""
+        if run_id is not None:
+            run_filter = " AND run_id = ?"
+            params += (run_id,)
+        with self._lock:
+            for table, _ in sorted(ROLLUPS.items(), key=lambda item: -item[1]):
+                count = self._conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE ts >= ? AND ts <= ?{run_filter}", params
+                ).fetchone()[0]
+                if count >= points:
+                    return table
+        return None
+
+    def query(self, start: float, end: float, resolution: Optional[str] = "auto",
+              points: int = DEFAULT_CHART_POINTS, run_id: Optional[str] = None) -> Tuple[Optional[str], pd.DataFrame]:
+        """(table used, rows in [start, end]) with per-bucket averages for rollups
+
+        ``resolution`` is a rollup table name, None for raw rows, or "auto" to
+        pick the coarsest table that still yields ``points`` buckets. Rollup
+        rows are placed at their first step's wall-clock time and carry the
+        bucket's start in ``simulation_time``. ``run_id`` limits the rows (and the
+        buckets counted for "auto") to one run; rows stored without a run have run_id "".
+        """
+        if resolution == "auto":
+            resolution = self.pick_resolution(start, end, points, run_id)
+        params: Tuple = (start, end)
+        run_filter = ""
+        if run_id is not None:
+            run_filter = " AND run_id = ?" if resolution else " AND COALESCE(run_id, '') = ?"
+            params += (run_id,)
+        if resolution is None:
+            sql = (f"SELECT ts, run_id, simulation_time, {', '.join(METRIC_COLUMNS)}, queue_length AS queue_length_max "
+                   f"FROM {RAW_TABLE} WHERE ts >= ? AND ts <= ?{run_filter} ORDER BY ts")
+        else:
+            averages = ", ".join(f"{c}_sum / n AS {c}" for c in METRIC_COLUMNS)
+            sql = (f"SELECT ts, run_id, bucket AS simulation_time, {averages}, queue_length_max "
+                   f"FROM {resolution} WHERE ts >= ? AND ts <= ?{run_filter} ORDER BY ts")
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=params)
+        return resolution, df
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
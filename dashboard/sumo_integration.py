@@ -9,12 +9,21 @@ import sys
 import time
 import threading
 import json
+import uuid
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import streamlit as st
+import dataclasses
 from dataclasses import dataclass
 from enum import Enum
-import random
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+from ring_buffer import MetricHistory
+from snapshot import Snapshot, SnapshotPublisher
+from traci_collector import SubscriptionStateCollector
+from mock_engine import PointQueueEngine
+from recording import SnapshotRecorder
 
 # Add SUMO traffic simulation path
 SUMO_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "sumo", "Traffic-simulation-rl")
@@ -43,6 +52,56 @@ except ImportError as e:
     print(f"⚠️ SUMO modules not available: {e}")
     SUMO_AVAILABLE = False
 
+# Scenario name -> SUMO config, relative to SUMO_PATH
+SIMULATION_CONFIGS = {
+    "uniform": "Sumo_env/Single intersection lhd/uniform_simulation.sumocfg",
+    "tidal": "Sumo_env/Single intersection lhd/tidal_simulation.sumocfg",
+    "asymmetric": "Sumo_env/Single intersection lhd/asymmetric_simulation.sumocfg",
+    "congested": "Sumo_env/Single intersection lhd/congested_simulation.sumocfg",
+    "random": "Sumo_env/Single intersection lhd/random_simulation.sumocfg",
+    "enhanced": "Sumo_env/Single intersection lhd/cross_enhanced.sumocfg"
+}
+
+ET.register_namespace("xsi", "http://www.w3.org/2001/XMLSchema-instance")
+
+
+def seeded_config(config_path: str, seed: int) -> str:
+    """Copy of a SUMO config whose random number seed is ``seed`` (SUMO's ``--seed``).
+
+    The copy (``<name>.seed<seed>.<pid>-<id>.sumocfg``) sits next to the
+    original so its relative file paths still resolve, and is unique to the
+    call, so parallel runs of one scenario and seed never rewrite a config
+    another SUMO is reading; the caller deletes it after the run. A
+    ``random`` option, which would override the seed, is dropped.
+    """
+    tree = ET.parse(config_path)
+    random_number = tree.getroot().find("random_number")
+    if random_number is None:
+        random_number = ET.SubElement(tree.getroot(), "random_number")
+    for option in random_number.findall("random"):
+        random_number.remove(option)
+    seed_option = random_number.find("seed")
+    if seed_option is None:
+        seed_option = ET.SubElement(random_number, "seed")
+    seed_option.set("value", str(seed))
+    base, extension = os.path.splitext(config_path)
+    path = f"{base}.seed{seed}.{os.getpid()}-{uuid.uuid4().hex[:8]}{extension}"
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+# Wall-clock seconds spent per simulated second at 1x speed
+REAL_STEP_DELAY = 0.5
+MOCK_STEP_DELAY = 1.0
+
+# Snapshot publish rate (wall-clock seconds) when stepping faster than real time
+FAST_PUBLISH_INTERVAL = 0.5
+
+# Wall-clock seconds between progress log lines when stepping faster than real time
+FAST_LOG_INTERVAL = 5.0
+
+# Intersections simulated by the mock engine (the dashboard shows the first one)
+MOCK_INTERSECTIONS = int(os.environ.get("TRAFFIC_MOCK_INTERSECTIONS", "1"))
+
 # Define fallback classes if SUMO modules are not available
 if not SUMO_AVAILABLE:
     @dataclass
@@ -90,17 +149,24 @@ if not SUMO_AVAILABLE:
         density: float
 
     class FallbackTraciManager:
-        """Mock TraCI manager for demo purposes"""
-        def __init__(self):
+        """Mock TraCI manager backed by the vectorized point-queue engine"""
+        def __init__(self, n_intersections: int = MOCK_INTERSECTIONS, seed: Optional[int] = None):
             self.simulation_state = SimulationState.STOPPED
             self.is_running = False
+            self.n_intersections = n_intersections
+            self.seed = seed
+            self.engine = None
             self._simulation_time = 0
             self._step_count = 0
             
         def start_simulation(self, config_file: str) -> bool:
             st.warning("⚠️ SUMO not available - using simulation mode")
+            # Accepts a scenario name or a "<scenario>_simulation.sumocfg" path
+            scenario = os.path.basename(config_file).split("_")[0]
+            self.engine = PointQueueEngine(self.n_intersections, scenario=scenario, seed=self.seed)
             self.simulation_state = SimulationState.RUNNING
             self.is_running = True
+            self._simulation_time = 0
             self._step_count = 0
             return True
         
@@ -109,6 +175,9 @@ if not SUMO_AVAILABLE:
             self.is_running = False
         
         def step_simulation(self, steps: int = 1) -> bool:
+            if self.engine is None:
+                return False
+            self.engine.step(steps)
             self._simulation_time += steps
             self._step_count += steps
             return True
@@ -116,41 +185,19 @@ if not SUMO_AVAILABLE:
         def is_simulation_running(self) -> bool:
             return self.is_running
         
+        def collect(self):
+            """State of the displayed intersection (see PointQueueEngine.collect)"""
+            return self.engine.collect()
+        
         def get_traffic_state(self) -> Optional[TrafficState]:
-            if not self.is_running:
+            if not self.is_running or self.engine is None:
                 return None
-            
-            # Generate more realistic simulated traffic data that changes over time
-            time_factor = (self._step_count % 120) / 120.0  # 2-minute cycles
-            rush_hour = 0.5 + 0.5 * abs(0.5 - time_factor)  # Traffic intensity
-            
-            base_vehicles = int(80 + 40 * rush_hour + random.randint(-10, 10))
-            base_waiting = int(base_vehicles * 0.15 + random.randint(0, 8))
-            
-            return TrafficState(
-                timestamp=self._simulation_time,
-                vehicle_count=base_vehicles,
-                waiting_vehicles=base_waiting,
-                avg_waiting_time=15.0 + 25.0 * rush_hour + random.uniform(-5, 5),
-                avg_speed=45.0 - 15.0 * rush_hour + random.uniform(-3, 3),
-                queue_length=base_waiting,
-                current_phase=random.randint(0, 3),
-                phase_duration=random.uniform(20, 45),
-                per_lane_queues={f"lane_{i}": random.randint(0, 8) for i in range(1, 5)},
-                per_lane_waiting_times={f"lane_{i}": random.uniform(10, 40) for i in range(1, 5)},
-                per_lane_vehicle_counts={f"lane_{i}": random.randint(5, 15) for i in range(1, 5)},
-                directional_flow={f"dir_{i}": random.uniform(0.3, 0.8) for i in range(4)},
-                emergency_vehicles=[],
-                pedestrian_waiting=random.randint(0, 3)
-            )
+            return self.engine.collect().to_traffic_state()
         
         def get_signal_info(self) -> Dict[str, Any]:
-            phases = ["rrrr", "GGrr", "yyrr", "rrGG", "rryy"]
-            return {
-                "state": random.choice(phases),
-                "phase_name": f"Phase {random.randint(0, 4)}",
-                "remaining_time": random.uniform(10, 30)
-            }
+            if self.engine is None:
+                return {"state": "rrrr", "phase_name": "Phase 0", "remaining_time": 0.0}
+            return self.engine.collect().signal_info()
 
     class FallbackMetricsCollector:
         """Mock metrics collector"""
@@ -158,65 +205,176 @@ if not SUMO_AVAILABLE:
             self.traci_manager = traci_manager
             
         def get_current_metrics(self) -> Optional[LiveMetrics]:
-            if not self.traci_manager.is_running:
-                return None
-                
-            traffic_state = self.traci_manager.get_traffic_state()
-            if not traffic_state:
+            if not self.traci_manager.is_running or self.traci_manager.engine is None:
                 return None
-                
-            return LiveMetrics(
-                timestamp=time.time(),
-                simulation_time=traffic_state.timestamp,
-                vehicle_count=traffic_state.vehicle_count,
-                waiting_vehicles=traffic_state.waiting_vehicles,
-                avg_waiting_time=traffic_state.avg_waiting_time,
-                avg_speed=traffic_state.avg_speed,
-                queue_length=traffic_state.queue_length,
-                current_phase=traffic_state.current_phase,
-                phase_duration=traffic_state.phase_duration,
-                efficiency_score=85.0 + random.uniform(-5, 10),  # Mock AI efficiency
-                congestion_level="moderate",
-                throughput=traffic_state.vehicle_count * 0.8,
-                density=traffic_state.vehicle_count / 100.0
-            )
+            return self.traci_manager.collect().to_live_metrics(LiveMetrics)
         
         def stop_collection(self):
             pass
 
     class FallbackSignalController:
-        """Mock signal controller"""
+        """Mock signal controller: queue-actuated control of every mock intersection"""
         def __init__(self, traci_manager):
             self.traci_manager = traci_manager
             
         def make_decision(self, traffic_state) -> Dict[str, Any]:
-            return {"phase": random.randint(0, 3), "duration": 30}
+            return {"policy": "queue_actuated"}
             
         def execute_decision(self, decision):
-            pass
+            if self.traci_manager.engine is not None:
+                self.traci_manager.engine.actuate()
             
         def change_signal_phase(self, phase_id: int, duration: float) -> bool:
+            if self.traci_manager.engine is None:
+                return False
+            self.traci_manager.engine.set_phase(0, phase_id, duration)
             return True
 
+class SimulationPacer:
+    """Paces simulation steps against the wall clock and rate-limits publishing.
+
+    ``speed`` is a multiplier on the loop's real-time step delay; ``None`` or a
+    value <= 0 runs as fast as possible. Publishing is decoupled from stepping:
+    snapshots go out at most once per ``publish_interval`` wall-clock seconds
+    (every step when 0). When left as ``None`` it is every step at real-time
+    pace and ``FAST_PUBLISH_INTERVAL`` otherwise.
+    """
+
+    def __init__(self, step_delay: float, speed: Optional[float] = 1.0,
+                 publish_interval: Optional[float] = None):
+        self.step_delay = step_delay / speed if speed and speed > 0 else 0.0
+        self.is_fast = self.step_delay < step_delay
+        if publish_interval is None:
+            publish_interval = FAST_PUBLISH_INTERVAL if self.is_fast else 0.0
+        self.publish_interval = max(0.0, publish_interval)
+        self._started = time.monotonic()
+        self._steps = 0
+        self._last_publish = None
+        self._last_log = self._started
+
+    def wait(self, steps: int = 1):
+        """Sleep until the wall-clock slot of the next step (no-op when unpaced)"""
+        self._steps += steps
+        if self.step_delay <= 0:
+            return
+        remaining = self._started + self._steps * self.step_delay - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def should_publish(self) -> bool:
+        """True when a snapshot is due; marks it as published"""
+        now = time.monotonic()
+        if self._last_publish is not None and now - self._last_publish < self.publish_interval:
+            return False
+        self._last_publish = now
+        return True
+
+    def should_log(self, simulation_time: float) -> bool:
+        """Every 10 simulated seconds in real time, every FAST_LOG_INTERVAL otherwise"""
+        if not self.is_fast:
+            return simulation_time % 10 == 0
+        now = time.monotonic()
+        if now - self._last_log < FAST_LOG_INTERVAL:
+            return False
+        self._last_log = now
+        return True
+
+    def steps_per_second(self) -> float:
+        """Achieved stepping rate since the loop started"""
+        elapsed = time.monotonic() - self._started
+        return self._steps / elapsed if elapsed > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class LoopIntervals:
+    """How often each stage of the control loop runs, in simulated seconds.
+
+    ``step`` seconds are advanced per ``step_simulation`` call; state is
+    observed every ``observe`` seconds and the controller decides every
+    ``decision`` seconds (on observed states only). Publishing is wall-clock
+    paced by ``SimulationPacer``.
+    """
+    step: int = 1
+    observe: int = 1
+    decision: int = 1
+
+    @classmethod
+    def create(cls, step: int = 1, observe: Optional[int] = None, decision: Optional[int] = None) -> "LoopIntervals":
+        """Intervals with observe/decision defaulting to the step interval"""
+        step = max(1, int(step))
+        observe = max(step, int(observe or step))
+        return cls(step, observe, max(observe, int(decision or observe)))
+
+
+class LoopProfiler:
+    """Accumulates wall-clock cost of the loop stages (step, observe, decide, publish)"""
+
+    STAGES = ("step", "observe", "decide", "publish")
+
+    def __init__(self):
+        self.totals = dict.fromkeys(self.STAGES, 0.0)
+        self.calls = dict.fromkeys(self.STAGES, 0)
+        self.simulated_seconds = 0
+
+    @contextmanager
+    def measure(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[stage] += time.perf_counter() - started
+            self.calls[stage] += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Per-stage call counts and mean cost, plus loop cost per simulated second (ms)"""
+        simulated = self.simulated_seconds or 1
+        return {
+            "simulated_seconds": self.simulated_seconds,
+            "ms_per_sim_second": 1000.0 * sum(self.totals.values()) / simulated,
+            "stages": {
+                stage: {
+                    "calls": self.calls[stage],
+                    "mean_ms": 1000.0 * self.totals[stage] / self.calls[stage] if self.calls[stage] else 0.0,
+                    "ms_per_sim_second": 1000.0 * self.totals[stage] / simulated
+                }
+                for stage in self.STAGES
+            }
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        stages = " ".join(f"{stage}={stats['ms_per_sim_second']:.2f}" for stage, stats in report["stages"].items())
+        return f"{report['ms_per_sim_second']:.2f}ms/sim-s ({stages})"
+
+
 class SumoStreamlitIntegration:
     """Real-time SUMO integration for Streamlit dashboard"""
     
-    def __init__(self):
+    def __init__(self, history_store=None, metrics_store=None):
         self.traci_manager = None
         self.metrics_collector = None
         self.signal_controller = None
+        self.state_collector = None
         self.is_running = False
         self.simulation_thread = None
-        self.data_lock = threading.Lock()
-        self.current_data = None
-        self.simulation_configs = {
-            "uniform": "Sumo_env/Single intersection lhd/uniform_simulation.sumocfg",
-            "tidal": "Sumo_env/Single intersection lhd/tidal_simulation.sumocfg",
-            "asymmetric": "Sumo_env/Single intersection lhd/asymmetric_simulation.sumocfg",
-            "congested": "Sumo_env/Single intersection lhd/congested_simulation.sumocfg",
-            "random": "Sumo_env/Single intersection lhd/random_simulation.sumocfg",
-            "enhanced": "Sumo_env/Single intersection lhd/cross_enhanced.sumocfg"
-        }
+        self.speed = 1.0
+        self.publish_interval = None
+        self.intervals = LoopIntervals()
+        self.profiler = LoopProfiler()
+        self.recorder = None
+        self.seed = None
+        # Seeded copy of the scenario config used by the current SUMO run (see seeded_config)
+        self.seeded_config_path = None
+        self.run_id = None
+        self.publisher = SnapshotPublisher()
+        # Persist every published snapshot (see history_store.HistoryStore)
+        self.history_store = history_store
+        if history_store is not None:
+            self.publisher.add_listener(history_store.on_snapshot)
+        # Per-step rows with SQL rollups (see sqlite_store.SQLiteMetricsStore)
+        self.metrics_store = metrics_store
+        self.history = MetricHistory()
+        self.simulation_configs = dict(SIMULATION_CONFIGS)
         
     def initialize_components(self):
         """Initialize SUMO components"""
@@ -231,7 +389,7 @@ class SumoStreamlitIntegration:
             else:
                 # Use fallback classes
                 print("🔄 Initializing fallback simulation components...")
-                self.traci_manager = FallbackTraciManager()
+                self.traci_manager = FallbackTraciManager(seed=self.seed)
                 self.metrics_collector = FallbackMetricsCollector(self.traci_manager)
                 self.signal_controller = FallbackSignalController(self.traci_manager)
                 st.warning("🔄 Using fallback simulation components")
@@ -241,13 +399,45 @@ class SumoStreamlitIntegration:
             print(f"Error details: {e}")
             return False
     
-    def start_simulation(self, scenario: str = "uniform", duration: int = 3600, control_mode: str = "adaptive") -> bool:
-        """Start SUMO simulation with specified parameters"""
+    def start_simulation(self, scenario: str = "uniform", duration: int = 3600, control_mode: str = "adaptive",
+                         speed: Optional[float] = 1.0, publish_interval: Optional[float] = None,
+                         step_interval: int = 1, observe_interval: Optional[int] = None,
+                         decision_interval: Optional[int] = None, record_path: Optional[str] = None,
+                         seed: Optional[int] = None) -> bool:
+        """Start SUMO simulation with specified parameters
+
+        ``speed`` multiplies the real-time stepping rate (``None``/0 = as fast as
+        possible); ``publish_interval`` is the wall-clock time between dashboard
+        snapshots, see ``SimulationPacer``. ``step_interval``, ``observe_interval``
+        and ``decision_interval`` are simulated seconds, see ``LoopIntervals``.
+        Every observed step is written to ``record_path`` when given (see ``recording``).
+        ``seed`` makes runs reproducible; SUMO gets it through a seeded copy of
+        the scenario config (see ``seeded_config``).
+        """
         try:
+            self.speed = speed
+            self.publish_interval = publish_interval
+            self.seed = seed
+            self.run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{scenario}-{control_mode}"
+            self.intervals = LoopIntervals.create(step_interval, observe_interval, decision_interval)
+            self.state_collector = None
+            self.history.clear()
+            self._close_recorder()
+
             # Initialize components
             if not self.initialize_components():
                 return False
             
+            if record_path:
+                self.recorder = SnapshotRecorder(record_path, metadata={
+                    "scenario": scenario,
+                    "duration": duration,
+                    "control_mode": control_mode,
+                    "intervals": dataclasses.asdict(self.intervals),
+                    "seed": seed,
+                    "sumo_available": SUMO_AVAILABLE
+                })
+            
             if SUMO_AVAILABLE:
                 # Use real SUMO simulation
                 st.success("🚦 Starting REAL SUMO simulation!")
@@ -264,12 +454,20 @@ class SumoStreamlitIntegration:
                     st.error(f"Config file not found: {full_config_path}")
                     return False
                 
+                self._remove_seeded_config()
+                if seed is not None:
+                    full_config_path = self.seeded_config_path = seeded_config(full_config_path, seed)
+                
                 # Start real SUMO simulation
                 success = self.traci_manager.start_simulation(full_config_path)
                 if not success:
+                    self._remove_seeded_config()
                     st.error("Failed to start SUMO simulation")
                     return False
                 
+                # Register TraCI subscriptions once for this scenario
+                self.state_collector = self._create_state_collector()
+                
                 # Set running state
                 self.is_running = True
                 
@@ -285,6 +483,11 @@ class SumoStreamlitIntegration:
                 # Use fallback mock simulation
                 st.warning("🔄 Starting simulation in DEMO mode with mock data")
                 
+                # Start the mock TraCI manager so it produces traffic states
+                self.traci_manager.start_simulation(scenario)
+                # The mock engine yields collector-format state directly
+                self.state_collector = self.traci_manager
+                
                 # Set running state
                 self.is_running = True
                 
@@ -299,175 +502,228 @@ class SumoStreamlitIntegration:
             return True
             
         except Exception as e:
+            self._remove_seeded_config()
             st.error(f"Failed to start simulation: {e}")
             print(f"Simulation start error: {e}")
             return False
 
     def _run_real_simulation_loop(self, duration: int, control_mode: str):
         """Real SUMO simulation loop"""
-        try:
-            print(f"🚦 Starting REAL SUMO simulation loop for {duration}s in {control_mode} mode")
-            current_time = 0
-            
-            # Initialize with some data immediately
-            initial_state = self.traci_manager.get_traffic_state()
-            initial_metrics = self.metrics_collector.get_current_metrics()
-            if initial_state and initial_metrics:
-                self._update_dashboard_data(initial_state, initial_metrics)
-            
-            while current_time < duration and self.is_running:
-                # Step SUMO simulation
-                self.traci_manager.step_simulation(1)
-                current_time += 1
-                
-                # Get real traffic state from SUMO
-                traffic_state = self.traci_manager.get_traffic_state()
-                if traffic_state:
-                    # Get real metrics from SUMO
-                    live_metrics = self.metrics_collector.get_current_metrics()
-                    
-                    # Apply traffic control based on mode
-                    if control_mode == "adaptive" and live_metrics:
-                        decision = self.signal_controller.make_decision(traffic_state)
-                        self.signal_controller.execute_decision(decision)
-                    
-                    # Update dashboard data
-                    self._update_dashboard_data(traffic_state, live_metrics)
-                
-                # Real-time logging every 10 seconds
-                if current_time % 10 == 0:
-                    print(f"⏱️  REAL SUMO Time {current_time}s: Vehicles={traffic_state.vehicle_count if traffic_state else 0}, Wait={traffic_state.avg_waiting_time if traffic_state else 0:.1f}s, Efficiency={live_metrics.efficiency_score if live_metrics else 0:.1f}%")
-                
-                time.sleep(0.5)  # Faster update for real SUMO
-                
-        except Exception as e:
-            print(f"Real SUMO simulation error: {e}")
-            st.error(f"Real simulation error: {e}")
-        finally:
-            print("🛑 Real SUMO simulation stopped")
-            self.is_running = False
+        self._run_simulation_loop(duration, control_mode, REAL_STEP_DELAY, "REAL SUMO")
 
     def _run_mock_simulation_loop(self, duration: int, control_mode: str):
         """Mock simulation loop for demo mode"""
+        self._run_simulation_loop(duration, control_mode, MOCK_STEP_DELAY, "Mock")
+    
+    def _run_simulation_loop(self, duration: int, control_mode: str, step_delay: float, label: str):
+        """Step, observe, decide and publish, each at its own interval"""
         try:
-            print(f"🚦 Starting mock simulation loop for {duration}s in {control_mode} mode")
+            print(f"🚦 Starting {label} simulation loop for {duration}s in {control_mode} mode")
             current_time = 0
+            traffic_state = live_metrics = signal_info = None
+            intervals = self.intervals
+            pacer = SimulationPacer(step_delay, self.speed, self.publish_interval)
+            profiler = self.profiler = LoopProfiler()
+            since_observe = since_decision = 0
             
             # Initialize with some data immediately
-            initial_state = self.traci_manager.get_traffic_state()
-            initial_metrics = self.metrics_collector.get_current_metrics()
+            initial_state, initial_metrics, initial_signal_info = self._observe()
             if initial_state and initial_metrics:
-                self._update_dashboard_data(initial_state, initial_metrics)
+                self._record_history(initial_state, initial_metrics, initial_signal_info)
+                self._update_dashboard_data(initial_state, initial_metrics, initial_signal_info)
             
             while current_time < duration and self.is_running:
-                # Step simulation
-                self.traci_manager.step_simulation(1)
-                current_time += 1
+                # Advance the simulation by several seconds per call when configured
+                steps = min(intervals.step, duration - current_time)
+                with profiler.measure("step"):
+                    self.traci_manager.step_simulation(steps)
+                current_time += steps
+                profiler.simulated_seconds += steps
+                since_observe += steps
+                since_decision += steps
                 
-                # Get mock traffic state
-                traffic_state = self.traci_manager.get_traffic_state()
-                if traffic_state:
-                    # Get mock metrics
-                    live_metrics = self.metrics_collector.get_current_metrics()
+                # Sample traffic state only as often as needed
+                if since_observe >= intervals.observe:
+                    since_observe = 0
+                    with profiler.measure("observe"):
+                        traffic_state, live_metrics, signal_info = self._observe()
                     
-                    # Update dashboard data
-                    self._update_dashboard_data(traffic_state, live_metrics)
+                    if traffic_state:
+                        # Apply traffic control based on mode
+                        if control_mode == "adaptive" and live_metrics and since_decision >= intervals.decision:
+                            since_decision = 0
+                            with profiler.measure("decide"):
+                                decision = self.signal_controller.make_decision(traffic_state)
+                                self.signal_controller.execute_decision(decision)
+                        
+                        # Record history and update dashboard data
+                        self._record_history(traffic_state, live_metrics, signal_info)
+                        if pacer.should_publish():
+                            with profiler.measure("publish"):
+                                self._update_dashboard_data(traffic_state, live_metrics, signal_info)
                 
                 # Logging every 10 seconds
-                if current_time % 10 == 0:
-                    print(f"⏱️  Mock Time {current_time}s: Vehicles={traffic_state.vehicle_count if traffic_state else 0}, Wait={traffic_state.avg_waiting_time if traffic_state else 0:.1f}s, Efficiency={live_metrics.efficiency_score if live_metrics else 0:.1f}%")
+                if pacer.should_log(current_time):
+                    print(f"⏱️  {label} Time {current_time}s: Vehicles={traffic_state.vehicle_count if traffic_state else 0}, Wait={traffic_state.avg_waiting_time if traffic_state else 0:.1f}s, Efficiency={live_metrics.efficiency_score if live_metrics else 0:.1f}%, Rate={pacer.steps_per_second():.0f} steps/s, Cost={profiler.summary()}")
                 
-                time.sleep(1.0)  # 1 second delay for demo
+                pacer.wait(steps)
+            
+            # Always publish the final state of the run
+            if traffic_state:
+                self._update_dashboard_data(traffic_state, live_metrics, signal_info)
+            print(f"📈 {label} loop cost per simulated second: {profiler.summary()}")
                 
         except Exception as e:
-            print(f"Mock simulation error: {e}")
+            print(f"{label} simulation error: {e}")
+            if SUMO_AVAILABLE:
+                st.error(f"Real simulation error: {e}")
         finally:
-            print("🛑 Mock simulation stopped")
+            print(f"🛑 {label} simulation stopped")
+            self._close_recorder()
+            if self.history_store is not None:
+                self.history_store.flush()
+            if self.metrics_store is not None:
+                self.metrics_store.flush()
+            self._remove_seeded_config()
             self.is_running = False
     
-    def _update_dashboard_data(self, traffic_state, live_metrics = None):
-        """Update dashboard data with current simulation state"""
-        with self.data_lock:
+    def _remove_seeded_config(self):
+        """Delete the run's seeded config copy, if any"""
+        if self.seeded_config_path is not None:
             try:
-                # Get signal information
+                os.remove(self.seeded_config_path)
+            except FileNotFoundError:
+                pass
+            self.seeded_config_path = None
+    
+    def _create_state_collector(self) -> Optional[SubscriptionStateCollector]:
+        """Subscription-based collector for the loaded scenario, or None to query per call"""
+        try:
+            collector = SubscriptionStateCollector(traci)
+            collector.subscribe()
+            print(f"📡 TraCI subscriptions registered for {len(collector.lane_ids)} lanes")
+            return collector
+        except Exception as e:
+            print(f"⚠️ TraCI subscriptions unavailable, using per-call queries: {e}")
+            return None
+    
+    def _observe(self):
+        """Collect (traffic_state, live_metrics, signal_info) for the current step"""
+        if self.state_collector:
+            # One batch of subscription results, no extra TraCI round trips
+            state = self.state_collector.collect()
+            return state.to_traffic_state(), state.to_live_metrics(LiveMetrics), state.signal_info()
+        
+        traffic_state = self.traci_manager.get_traffic_state()
+        live_metrics = self.metrics_collector.get_current_metrics() if traffic_state else None
+        return traffic_state, live_metrics, None
+    
+    def _update_dashboard_data(self, traffic_state, live_metrics = None, signal_info: Optional[Dict[str, Any]] = None):
+        """Publish a new dashboard snapshot for the current simulation state"""
+        try:
+            # Build the complete snapshot without holding any lock, then swap it in
+            if signal_info is None:
                 signal_info = self.traci_manager.get_signal_info()
-                
-                # Create dashboard data structure
-                dashboard_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "simulation_time": traffic_state.timestamp,
-                    "status": "running" if self.is_running else "stopped",
-                    
-                    # KPI Data
-                    "kpi_data": {
-                        "ai_efficiency": live_metrics.efficiency_score if live_metrics else 85.0,
-                        "traditional_efficiency": max(0, (live_metrics.efficiency_score - 15) if live_metrics else 70.0),
-                        "avg_wait_time": traffic_state.avg_waiting_time,
-                        "avg_speed": traffic_state.avg_speed * 3.6,  # Convert m/s to km/h
-                        "vehicle_count": traffic_state.vehicle_count,
-                        "queue_length": traffic_state.queue_length,
-                        "congestion_level": self._get_congestion_level(traffic_state.queue_length)
-                    },
-                    
-                    # Intersection Data
-                    "intersection_data": {
-                        "current_phase": traffic_state.current_phase,
-                        "phase_duration": traffic_state.phase_duration,
-                        "signal_state": signal_info.get("state", "rrrr"),
-                        "phase_name": signal_info.get("phase_name", f"Phase {traffic_state.current_phase}"),
-                        "waiting_vehicles": traffic_state.waiting_vehicles,
-                        "per_lane_queues": traffic_state.per_lane_queues or {},
-                        "per_lane_waiting_times": traffic_state.per_lane_waiting_times or {},
-                        "directional_flow": traffic_state.directional_flow or {}
-                    },
-                    
-                    # Time Series Data
-                    "time_series_data": {
-                        "timestamps": [datetime.now().isoformat()],
-                        "efficiency_scores": [live_metrics.efficiency_score if live_metrics else 85.0],
-                        "wait_times": [traffic_state.avg_waiting_time],
-                        "vehicle_counts": [traffic_state.vehicle_count],
-                        "queue_lengths": [traffic_state.queue_length],
-                        "speeds": [traffic_state.avg_speed * 3.6]
-                    },
-                    
-                    # Enhanced metrics
-                    "enhanced_metrics": {
-                        "per_lane_vehicle_counts": traffic_state.per_lane_vehicle_counts or {},
-                        "congestion_per_lane": traffic_state.congestion_per_lane or {},
-                        "emergency_vehicles": traffic_state.emergency_vehicles or [],
-                        "pedestrian_waiting": traffic_state.pedestrian_waiting or 0,
-                        "signal_phase_timing": traffic_state.signal_phase_timing or {}
-                    },
-                    
-                    # Video/Camera simulation (placeholder)
-                    "camera_feeds": [
-                        {"id": "cam_1", "location": "North Approach", "status": "online", "frame": None},
-                        {"id": "cam_2", "location": "South Approach", "status": "online", "frame": None},
-                        {"id": "cam_3", "location": "East Approach", "status": "online", "frame": None},
-                        {"id": "cam_4", "location": "West Approach", "status": "online", "frame": None}
-                    ]
-                }
-                
-                self.current_data = dashboard_data
-                
-            except Exception as e:
-                st.error(f"Error updating dashboard data: {e}")
-                # Create minimal fallback data
-                self.current_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "simulation_time": 0,
-                    "status": "error",
-                    "kpi_data": {
-                        "ai_efficiency": 0,
-                        "traditional_efficiency": 0,
-                        "avg_wait_time": 0,
-                        "avg_speed": 0,
-                        "vehicle_count": 0,
-                        "queue_length": 0,
-                        "congestion_level": "unknown"
-                    }
+            self.publisher.publish(self._build_dashboard_data(traffic_state, live_metrics, signal_info))
+            
+        except Exception as e:
+            st.error(f"Error updating dashboard data: {e}")
+            # Create minimal fallback data
+            self.publisher.publish({
+                "timestamp": datetime.now().isoformat(),
+                "simulation_time": 0,
+                "status": "error",
+                "kpi_data": {
+                    "ai_efficiency": 0,
+                    "traditional_efficiency": 0,
+                    "avg_wait_time": 0,
+                    "avg_speed": 0,
+                    "vehicle_count": 0,
+                    "queue_length": 0,
+                    "congestion_level": "unknown"
                 }
+            })
+    
+    def _build_dashboard_data(self, traffic_state, live_metrics, signal_info: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the dashboard data structure for one snapshot"""
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "simulation_time": traffic_state.timestamp,
+            "status": "running" if self.is_running else "stopped",
+            "run_id": self.run_id,
+            
+            # KPI Data
+            "kpi_data": {
+                "ai_efficiency": live_metrics.efficiency_score if live_metrics else 85.0,
+                "traditional_efficiency": max(0, (live_metrics.efficiency_score - 15) if live_metrics else 70.0),
+                "avg_wait_time": traffic_state.avg_waiting_time,
+                "avg_speed": traffic_state.avg_speed * 3.6,  # Convert m/s to km/h
+                "vehicle_count": traffic_state.vehicle_count,
+                "queue_length": traffic_state.queue_length,
+                "congestion_level": self._get_congestion_level(traffic_state.queue_length)
+            },
+            
+            # Intersection Data
+            "intersection_data": {
+                "current_phase": traffic_state.current_phase,
+                "phase_duration": traffic_state.phase_duration,
+                "signal_state": signal_info.get("state", "rrrr"),
+                "phase_name": signal_info.get("phase_name", f"Phase {traffic_state.current_phase}"),
+                "waiting_vehicles": traffic_state.waiting_vehicles,
+                "per_lane_queues": traffic_state.per_lane_queues or {},
+                "per_lane_waiting_times": traffic_state.per_lane_waiting_times or {},
+                "directional_flow": traffic_state.directional_flow or {}
+            },
+            
+            # Time Series Data, copied out of the history ring buffers: the
+            # snapshot stays valid however long a viewer holds it
+            "time_series_data": {
+                **self.history.window(copy=True),
+                "per_lane_queues": self.history.lane_window(copy=True)
+            },
+            
+            # Control loop cost per stage
+            "loop_stats": self.profiler.report(),
+            
+            # Enhanced metrics
+            "enhanced_metrics": {
+                "per_lane_vehicle_counts": traffic_state.per_lane_vehicle_counts or {},
+                "congestion_per_lane": traffic_state.congestion_per_lane or {},
+                "emergency_vehicles": traffic_state.emergency_vehicles or [],
+                "pedestrian_waiting": traffic_state.pedestrian_waiting or 0,
+                "signal_phase_timing": traffic_state.signal_phase_timing or {}
+            },
+            
+            # Video/Camera simulation (placeholder)
+            "camera_feeds": [
+                {"id": "cam_1", "location": "North Approach", "status": "online", "frame": None},
+                {"id": "cam_2", "location": "South Approach", "status": "online", "frame": None},
+                {"id": "cam_3", "location": "East Approach", "status": "online", "frame": None},
+                {"id": "cam_4", "location": "West Approach", "status": "online", "frame": None}
+            ]
+        }
+    
+    def _record_history(self, traffic_state, live_metrics=None, signal_info: Optional[Dict[str, Any]] = None):
+        """Append the current step to the time-series ring buffers (and the recording, if any)"""
+        if self.recorder:
+            self.recorder.append(traffic_state, live_metrics, signal_info)
+        if self.metrics_store is not None:
+            self.metrics_store.append(traffic_state, live_metrics, self.run_id)
+        self.history.append(
+            simulation_time=traffic_state.timestamp,
+            efficiency=live_metrics.efficiency_score if live_metrics else 85.0,
+            wait_time=traffic_state.avg_waiting_time,
+            vehicle_count=traffic_state.vehicle_count,
+            queue_length=traffic_state.queue_length,
+            speed=traffic_state.avg_speed * 3.6,
+            lane_queues=traffic_state.per_lane_queues
+        )
+    
+    def _close_recorder(self):
+        if self.recorder:
+            self.recorder.close()
+            print(f"📼 Recorded {self.recorder.frame_count} frames to {self.recorder.path}")
+            self.recorder = None
     
     def _get_congestion_level(self, queue_length: int) -> str:
         """Get congestion level based on queue length"""
@@ -480,7 +736,8 @@ class SumoStreamlitIntegration:
         else:
             return "severe"
     
-    def _get_default_dashboard_data(self) -> Dict[str, Any]:
+    @staticmethod
+    def _get_default_dashboard_data() -> Dict[str, Any]:
         """Provide default dashboard data when simulation is not running"""
         from datetime import datetime
         
@@ -512,14 +769,15 @@ class SumoStreamlitIntegration:
                 "directional_flow": {}
             },
             
-            # Default Time Series Data
+            # Default Time Series Data (empty history)
             "time_series_data": {
-                "timestamps": [datetime.now().isoformat()],
-                "efficiency_scores": [0.0],
-                "wait_times": [0.0],
-                "vehicle_counts": [0],
-                "queue_lengths": [0.0],
-                "speeds": [0.0]
+                "simulation_times": [],
+                "efficiency_scores": [],
+                "wait_times": [],
+                "vehicle_counts": [],
+                "queue_lengths": [],
+                "speeds": [],
+                "per_lane_queues": {}
             },
             
             # Default Additional Metrics
@@ -532,14 +790,18 @@ class SumoStreamlitIntegration:
             }
         }
     
+    def get_snapshot(self, since_version: Optional[int] = None) -> Optional[Snapshot]:
+        """Latest published snapshot, or None if nothing newer than since_version (never blocks)"""
+        return self.publisher.get(since_version)
+    
     def get_current_data(self) -> Optional[Dict[str, Any]]:
-        """Get current dashboard data (thread-safe)"""
-        with self.data_lock:
-            if self.current_data:
-                return self.current_data.copy()
-            else:
-                # Provide default data when simulation hasn't started
-                return self._get_default_dashboard_data()
+        """Get current dashboard data (read-only, never blocks the simulation thread)"""
+        snapshot = self.publisher.get()
+        if snapshot:
+            return snapshot.data
+        else:
+            # Provide default data when simulation hasn't started
+            return self._get_default_dashboard_data()
     
     def stop_simulation(self):
         """Stop the simulation"""
@@ -564,9 +826,14 @@ class SumoStreamlitIntegration:
         """Get current simulation status"""
         return {
             "is_running": self.is_running,
+            "speed": self.speed,
+            "intervals": dataclasses.asdict(self.intervals),
+            "recording": self.recorder.path if self.recorder else None,
+            "loop_stats": self.profiler.report(),
             "simulation_state": self.traci_manager.simulation_state.value if self.traci_manager else "stopped",
             "available_scenarios": list(self.simulation_configs.keys()),
-            "sumo_available": SUMO_AVAILABLE
+            "sumo_available": SUMO_AVAILABLE,
+            "runner": "thread"
         }
     
     def emergency_stop(self):
@@ -578,15 +845,37 @@ class SumoStreamlitIntegration:
         except Exception as e:
             st.error(f"Error during emergency stop: {e}")
 
-# Global instance for Streamlit session state
+def create_sumo_integration(runner: str = "thread", history_dir: Optional[str] = None,
+                            metrics_db: Optional[str] = None):
+    """Create a simulation runner: 'thread' (in-process) or 'process' (worker process)
+
+    Published snapshots are persisted to ``history_dir`` and per-step metrics
+    to the SQLite database ``metrics_db`` when given.
+    """
+    if runner == "process":
+        from process_runner import ProcessSimulationRunner
+        return ProcessSimulationRunner(history_dir=history_dir, metrics_db=metrics_db)
+    history_store = metrics_store = None
+    if history_dir:
+        from history_store import HistoryStore
+        history_store = HistoryStore(history_dir)
+    if metrics_db:
+        from sqlite_store import SQLiteMetricsStore
+        metrics_store = SQLiteMetricsStore(metrics_db)
+    return SumoStreamlitIntegration(history_store=history_store, metrics_store=metrics_store)
+
+# Process-wide hub shared by all browser sessions
 @st.cache_resource
-def get_sumo_integration():
-    """Get or create SUMO integration instance"""
-    return SumoStreamlitIntegration()
-
-def initialize_sumo_integration():
-    """Initialize SUMO integration in Streamlit session state"""
-    if 'sumo_integration' not in st.session_state:
-        st.session_state.sumo_integration = SumoStreamlitIntegration()
-    
-    return st.session_state.sumo_integration
+def get_simulation_hub(runner: str = "thread", history_dir: Optional[str] = None, metrics_db: Optional[str] = None):
+    """Get or create the shared simulation hub"""
+    from simulation_hub import SimulationHub
+    return SimulationHub(runner, history_dir=history_dir, metrics_db=metrics_db)
+
+def get_sumo_integration(runner: str = "thread", history_dir: Optional[str] = None, metrics_db: Optional[str] = None):
+    """Get the shared SUMO integration instance"""
+    return get_simulation_hub(runner, history_dir, metrics_db).integration
+
+def initialize_sumo_integration(runner: str = "thread", history_dir: Optional[str] = None,
+                                metrics_db: Optional[str] = None):
+    """Attach the current browser session to the shared simulation as a viewer"""
+    return get_simulation_hub(runner, history_dir, metrics_db).attach()
\ No newline at end of file
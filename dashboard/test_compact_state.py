@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact array-backed TrafficState
+"""
+
+import sys
+import os
+import pickle
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from compact_state import CompactTrafficState, LaneTable
+from mock_engine import PointQueueEngine
+from ring_buffer import MetricHistory
+from sumo_integration import TrafficState
+
+def test_views_match_dict_state():
+    """Lane views read exactly like the dict-based TrafficState"""
+    print("🧪 Testing CompactTrafficState views")
+
+    engine = PointQueueEngine(scenario="congested", seed=3)
+    engine.step(300)
+    collected = engine.collect()
+    compact = collected.to_traffic_state()
+    legacy = collected.to_traffic_state(TrafficState)
+
+    assert isinstance(compact, CompactTrafficState)
+    assert not hasattr(compact, "__dict__")
+    assert compact.per_lane_queues.to_dict() == legacy.per_lane_queues
+    assert dict(compact.per_lane_waiting_times) == legacy.per_lane_waiting_times
+    assert dict(compact.per_lane_vehicle_counts) == legacy.per_lane_vehicle_counts
+    assert dict(compact.congestion_per_lane) == legacy.congestion_per_lane
+    assert compact.to_dict().keys() == vars(legacy).keys()
+    print("✅ Views match the dict representation")
+
+def test_lane_tables_are_interned():
+    """Equal lane id lists share one table, also across pickling"""
+    table = LaneTable.intern(["a_0", "b_0", "c_0"])
+    assert LaneTable.intern(("a_0", "b_0", "c_0")) is table
+    state = CompactTrafficState(0.0, 3, 1, 0.0, 0.0, 1, 0, 10.0, table, np.array([0, 1, 0]),
+                                np.zeros(3), np.array([1, 1, 1]))
+    restored = pickle.loads(pickle.dumps(state.per_lane_queues))
+    assert restored.lanes is table and restored["b_0"] == 1
+
+def test_history_accepts_lane_views():
+    """The ring buffer history scatters lane arrays like it maps dicts"""
+    engine = PointQueueEngine(scenario="tidal", seed=1)
+    compact_history, dict_history = MetricHistory(capacity=64), MetricHistory(capacity=64)
+    for _ in range(20):
+        engine.step(1)
+        collected = engine.collect()
+        for history, state in ((compact_history, collected.to_traffic_state()),
+                               (dict_history, collected.to_traffic_state(TrafficState))):
+            history.append(state.timestamp, 0.0, state.avg_waiting_time, state.vehicle_count,
+                           state.queue_length, state.avg_speed, lane_queues=state.per_lane_queues)
+    assert compact_history.lane_ids == dict_history.lane_ids
+    for lane_id, queues in compact_history.lane_window().items():
+        assert np.array_equal(queues, dict_history.lane_window()[lane_id])
+
+if __name__ == "__main__":
+    test_views_match_dict_state()
+    test_lane_tables_are_interned()
+    test_history_accepts_lane_views()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for choosing between the in-process simulation and external producers
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_sources import DEFAULT_SOURCE, IN_PROCESS_SOURCE, load_dashboard_data
+from file_source import DashboardFileReader, DashboardFileWriter
+from mmap_channel import MmapSnapshotReader, MmapSnapshotWriter
+from sumo_integration import SumoStreamlitIntegration
+
+def test_idle_simulation_shows_producers():
+    """An idle simulation that never published leaves the dashboard to the external writers"""
+    print("🧪 Testing producer fallback")
+
+    integration = SumoStreamlitIntegration()
+    with tempfile.TemporaryDirectory() as tmp:
+        file_writer = DashboardFileWriter(Path(tmp) / "dashboard_data.json")
+        file_writer.write_snapshot({"ts": 0, "vehicles_in_system": 500})
+        file_writer.update(values={"ts": 1, "vehicles_in_system": 777})
+        producers = [("JSON file", DashboardFileReader(file_writer.path).read)]
+        state = {}
+        data = load_dashboard_data(integration, state, producers)
+        assert data["vehicles_in_system"] == 777 and state["data_source"] == "JSON file"
+
+        # The memory-mapped producer takes precedence once it has published
+        mmap_path = Path(tmp) / "dashboard_snapshot.bin"
+        mmap_writer = MmapSnapshotWriter(mmap_path, 2, 4)
+        mmap_reader = MmapSnapshotReader(mmap_path)
+        producers.insert(0, ("Memory-mapped producer", mmap_reader.read))
+        assert load_dashboard_data(integration, state, producers)["vehicles_in_system"] == 777
+        assert state["data_source"] == "JSON file"
+        mmap_writer.publish(ts=2.0, vehicles_in_system=888, queues=[[1, 2, 3, 4], [0, 0, 0, 0]])
+        data = load_dashboard_data(integration, state, producers)
+        assert data["vehicles_in_system"] == 888 and state["data_source"] == "Memory-mapped producer"
+        mmap_writer.close()
+        file_writer.close()
+
+    state = {}
+    data = load_dashboard_data(integration, state, [])
+    assert data["vehicles_in_system"] == 0 and data["status"] == "stopped"
+    assert state["data_source"] == DEFAULT_SOURCE
+    print("✅ Producer fallback OK")
+
+def test_published_simulation_wins():
+    """Once the simulation publishes, its snapshots are shown and cached per version"""
+    print("🧪 Testing in-process snapshots")
+
+    integration = SumoStreamlitIntegration()
+    state = {}
+    producers = [("JSON file", lambda: {"vehicles_in_system": 777})]
+    load_dashboard_data(integration, state, producers)
+    integration.publisher.publish({"simulation_time": 5, "kpi_data": {"vehicle_count": 42}})
+    data = load_dashboard_data(integration, state, producers)
+    assert data["vehicles_in_system"] == 42 and state["data_source"] == IN_PROCESS_SOURCE
+    assert load_dashboard_data(integration, state, producers) is data
+
+    # A running simulation that has not published yet shows its defaults
+    integration = SumoStreamlitIntegration()
+    integration.is_running = True
+    state = {}
+    assert load_dashboard_data(integration, state, producers)["vehicles_in_system"] == 0
+    assert state["data_source"] == IN_PROCESS_SOURCE
+    print("✅ In-process snapshots OK")
+
+def test_stopped_simulation_gives_way_to_producers():
+    """A finished run keeps the dashboard only until its last publish goes stale"""
+    print("🧪 Testing fallback after a finished run")
+
+    integration = SumoStreamlitIntegration()
+    integration.publisher.publish({"simulation_time": 5, "kpi_data": {"vehicle_count": 42}})
+    producers = [("JSON file", lambda: {"vehicles_in_system": 777})]
+    state = {}
+    assert load_dashboard_data(integration, state, producers, stale_after=60.0)["vehicles_in_system"] == 42
+    time.sleep(0.05)
+    assert load_dashboard_data(integration, state, producers, stale_after=0.01)["vehicles_in_system"] == 777
+    assert state["data_source"] == "JSON file"
+
+    # Without producer data the last run stays on screen; a paused replay keeps it regardless
+    data = load_dashboard_data(integration, state, [], stale_after=0.01)
+    assert data["vehicles_in_system"] == 42 and state["data_source"] == IN_PROCESS_SOURCE
+    assert load_dashboard_data(integration, state, producers, stale_after=None) is data
+
+    # A running simulation is shown however long ago it published
+    integration.is_running = True
+    assert load_dashboard_data(integration, state, producers, stale_after=0.01) is data
+    print("✅ Fallback after a finished run OK")
+
+if __name__ == "__main__":
+    test_idle_simulation_shows_producers()
+    test_published_simulation_wins()
+    test_stopped_simulation_gives_way_to_producers()
+    print("🎉 All data source tests passed")
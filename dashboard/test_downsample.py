@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for time-series downsampling
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import plotly.graph_objects as go
+from downsample import WEBGL_THRESHOLD, downsample, line_trace, lttb_indices, minmax_indices
+
+def test_downsample_budget_and_extremes():
+    """Every method stays within budget, keeps the ends and keeps a single spike"""
+    print("🧪 Testing downsampling budgets")
+
+    rng = np.random.default_rng(0)
+    x = np.arange(100_000)
+    y = np.cumsum(rng.normal(size=len(x)))
+    y[31_337] = 1e4
+
+    for method in ("auto", "lttb", "minmax"):
+        xs, ys = downsample(x, y, 500, method)
+        assert 0 < len(xs) <= 500, method
+        assert np.all(np.diff(xs) > 0), method
+        assert xs[0] == 0 and xs[-1] == len(x) - 1, method
+        assert ys.max() == 1e4, method
+        assert np.array_equal(ys, y[xs]), method
+
+    # Short series come back unchanged, NaN gaps are dropped
+    xs, ys = downsample([1, 2, 3], [1.0, 2.0, 3.0], 500)
+    assert xs.tolist() == [1, 2, 3]
+    y[::2] = np.nan
+    xs, ys = downsample(x, y, 500)
+    assert len(xs) <= 500 and not np.isnan(ys).any()
+    print("✅ Budgets OK")
+
+def test_lttb_and_minmax_shapes():
+    """LTTB picks the corner of a step, min-max picks both extremes of each bucket"""
+    print("🧪 Testing LTTB and min-max selections")
+
+    y = np.zeros(1000)
+    y[500:] = 10.0
+    kept = lttb_indices(np.arange(1000, dtype=float), y, 10)
+    assert len(kept) == 10 and kept[0] == 0 and kept[-1] == 999
+    assert 499 in kept or 500 in kept
+
+    y = np.tile([0.0, 5.0, -5.0, 0.0], 250)
+    kept = minmax_indices(y, 52)
+    assert len(kept) <= 52
+    assert set(y[kept]) == {0.0, 5.0, -5.0}
+    print("✅ Selections OK")
+
+def test_line_trace_switches_to_webgl():
+    """Dense traces become Scattergl lines without markers or splines"""
+    print("🧪 Testing WebGL switch")
+
+    style = dict(mode="lines+markers", line=dict(color="#4f46e5", width=3, shape="spline"), marker=dict(size=8))
+    small = line_trace(np.arange(100), np.arange(100.0), **style)
+    assert isinstance(small, go.Scatter) and small.line.shape == "spline"
+
+    dense = line_trace(np.arange(50_000), np.sin(np.arange(50_000) / 100), budget=5000, **style)
+    assert isinstance(dense, go.Scattergl) and len(dense.x) > WEBGL_THRESHOLD
+    assert dense.mode == "lines" and dense.line.shape is None and dense.line.color == "#4f46e5"
+    print("✅ WebGL switch OK")
+
+if __name__ == "__main__":
+    test_downsample_budget_and_extremes()
+    test_lttb_and_minmax_shapes()
+    test_line_trace_switches_to_webgl()
+    print("🎉 All downsampling tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk episode cache
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from episode_cache import EpisodeCache, code_digest, episode_key, file_digest
+
+def _episode(steps: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "time": np.arange(steps),
+        "action": np.arange(steps) % 4,
+        "reward": np.linspace(0, 1, steps),
+        "avg_wait_time": [None] * steps,
+        "junction_id": ["J1"] * steps
+    })
+
+def test_keys_follow_model_content():
+    """Overwriting a model under the same name changes its key"""
+    print("🧪 Testing content-addressed episode keys")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = Path(tmp) / "uploaded_demo.pth"
+        model.write_bytes(b"weights v1")
+        first = episode_key(file_digest(model), 100)
+        assert episode_key(file_digest(model), 100) == first
+        assert episode_key(file_digest(model), 200) != first
+        assert episode_key(file_digest(model), 100, scenario="rush_hour", seed=1) != first
+
+        time.sleep(0.01)
+        model.write_bytes(b"weights v2")
+        assert episode_key(file_digest(model), 100) != first
+        print("✅ Keys change with the model content and run parameters")
+
+def test_keys_follow_episode_code():
+    """Editing the module that produces episodes changes the code digest in the key"""
+    import importlib.util
+
+    with tempfile.TemporaryDirectory() as tmp:
+        module_path = Path(tmp) / "rl_api.py"
+
+        def load(source):
+            module_path.write_text(source)
+            spec = importlib.util.spec_from_file_location("rl_api", module_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module.simulate
+
+        first = code_digest(load("def simulate():\n    return 1\n"))
+        assert code_digest(load("def simulate():\n    return 1\n")) == first
+        time.sleep(0.01)
+        assert code_digest(load("def simulate():\n    return 2\n")) != first
+        assert episode_key("model", 100, api=first) != episode_key("model", 100)
+
+def test_round_trip_across_instances_and_lru_eviction():
+    """Entries survive a new cache instance and the least recently used go first"""
+    print("🧪 Testing episode cache persistence and eviction")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EpisodeCache(tmp)
+        calls = []
+        df = cache.get_or_compute("a", lambda: calls.append(1) or _episode(500))
+        again = EpisodeCache(tmp).get_or_compute("a", lambda: calls.append(1) or _episode(500))
+        assert len(calls) == 1
+        pd.testing.assert_frame_equal(df, again)
+
+        entry_size = cache.size()
+        cache = EpisodeCache(tmp, max_bytes=int(entry_size * 2.5))
+        cache.put("b", _episode(500))
+        time.sleep(0.01)
+        assert cache.get("a") is not None      # "a" is now more recent than "b"
+        time.sleep(0.01)
+        cache.put("c", _episode(500))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert not list(Path(tmp).glob("*.tmp"))
+        print(f"✅ {entry_size} B per entry, LRU entry evicted")
+
+def test_write_through_stream():
+    """A streamed episode is cached only once the stream completes"""
+    print("🧪 Testing streamed episode caching")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EpisodeCache(tmp)
+        batches = lambda: (_episode(500).assign(time=lambda d: d["time"] + start) for start in range(0, 5000, 500))
+
+        abandoned = cache.stream("k", batches)
+        next(abandoned)
+        abandoned.close()
+        assert cache.get("k") is None and not list(Path(tmp).glob(".*"))
+
+        streamed = pd.concat(cache.stream("k", batches), ignore_index=True)
+        replayed = list(cache.stream("k", lambda: None, batch_rows=1000))
+        assert [len(batch) for batch in replayed] == [1000] * 5
+        pd.testing.assert_frame_equal(pd.concat(replayed, ignore_index=True), streamed)
+        print(f"✅ {len(streamed)} streamed rows replayed from the cache")
+
+if __name__ == "__main__":
+    test_keys_follow_model_content()
+    test_keys_follow_episode_code()
+    test_round_trip_across_instances_and_lru_eviction()
+    test_write_through_stream()
+    print("🎉 Episode cache tests passed")
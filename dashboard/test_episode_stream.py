@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded episode accumulator
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from episode_stream import EpisodeAccumulator
+from traffic_rl._vendored_api_rl import make_dummy_episode, make_dummy_episode_stream
+
+def _episode(steps: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        "time": np.arange(steps),
+        "action": rng.integers(0, 4, steps),
+        "reward": rng.normal(0.5, 0.1, steps),
+        "avg_wait_time": np.where(rng.random(steps) < 0.1, np.nan, rng.uniform(0, 20, steps)),
+        "queue_length": rng.integers(0, 40, steps),
+        "junction_id": rng.choice(["J1", "J2", "J3"], steps)
+    })
+
+def test_aggregates_match_full_episode():
+    """Running aggregates over batches equal those of the whole DataFrame"""
+    print("🧪 Testing episode accumulator aggregates")
+
+    df = _episode(25_000)
+    episode = EpisodeAccumulator(chart_points=1000, tail_rows=500)
+    for start in range(0, len(df), 1000):
+        episode.add(df.iloc[start:start + 1000])
+
+    kpis = episode.kpis()
+    assert kpis["steps_simulated"] == len(df)
+    assert np.isclose(kpis["avg_reward"], df["reward"].mean())
+    assert np.isclose(kpis["avg_wait_time"], df["avg_wait_time"].mean())
+    assert kpis["peak_queue_length"] == df["queue_length"].max()
+    assert kpis["unique_actions"] == df["action"].nunique()
+
+    assert episode.action_counts().to_dict() == df["action"].value_counts().sort_index().to_dict()
+    expected = df.groupby("action").agg({"reward": "mean", "avg_wait_time": "mean", "queue_length": "mean"}).round(2)
+    pd.testing.assert_frame_equal(episode.action_aggregates(), expected, check_names=False)
+    junctions = episode.junction_stats().set_index("junction_id")
+    assert np.allclose(junctions["queue_length"], df.groupby("junction_id")["queue_length"].mean())
+    print(f"✅ KPIs and aggregates exact over {len(df)} steps")
+
+def test_buffers_stay_bounded():
+    """Chart samples and the raw tail never exceed their budgets"""
+    print("🧪 Testing episode accumulator memory bounds")
+
+    df = _episode(200_000)
+    episode = EpisodeAccumulator(chart_points=2000, tail_rows=1000)
+    for start in range(0, len(df), 5000):
+        episode.add(df.iloc[start:start + 5000])
+        assert len(episode.chart_frame()) <= 2000
+
+    chart = episode.chart_frame()
+    assert chart["time"].iloc[0] == 0
+    assert (np.diff(chart["time"]) == episode.stride).all()
+    tail = episode.tail()
+    assert len(tail) == 1000 and tail["time"].iloc[-1] == len(df) - 1
+    print(f"✅ {len(chart)} chart points (stride {episode.stride}), {len(tail)} tail rows")
+
+def test_multi_junction_dummy_episode():
+    """Chunked dummy episodes are reproducible and charted as per-step means"""
+    print("🧪 Testing multi-junction dummy episodes")
+
+    chunks = list(make_dummy_episode_stream(2500, junctions=4, seed=3, batch_size=1000))
+    assert [len(chunk) for chunk in chunks] == [4000, 4000, 2000]
+    df = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(df, make_dummy_episode(2500, junctions=4, seed=3))
+    assert not df.equals(make_dummy_episode(2500, junctions=4, seed=4))
+    assert set(df.columns) >= {"time", "action", "reward", "avg_wait_time", "queue_length", "throughput", "junction_id"}
+    assert list(df["junction_id"].cat.categories) == ["J1", "J2", "J3", "J4"]
+    assert (df["avg_wait_time"] >= 0).all() and (df["queue_length"] >= 0).all()
+
+    episode = EpisodeAccumulator()
+    for chunk in chunks:
+        episode.add(chunk)
+    assert episode.steps == 2500 and episode.rows == 10_000
+    chart = episode.chart_frame()
+    assert chart["time"].tolist() == list(range(2500))
+    assert np.allclose(chart["reward"], df.groupby("time")["reward"].mean())
+    assert len(episode.junction_stats()) == 4
+    print(f"✅ {len(df)} rows over {episode.steps} steps")
+
+if __name__ == "__main__":
+    test_aggregates_match_full_episode()
+    test_buffers_stay_bounded()
+    test_multi_junction_dummy_episode()
+    print("🎉 Episode stream tests passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the dashboard_data.json file protocol
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from file_source import DashboardFileReader, DashboardFileWriter, apply_updates, update_log_path
+
+def test_reader_tails_updates():
+    """Updates are applied incrementally and unchanged files return the cached state"""
+    print("🧪 Testing file data source")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dashboard_data.json"
+        writer = DashboardFileWriter(path, compact_every=50)
+        writer.write_snapshot({"ts": 0, "time_series": {"t": []}})
+        reader = DashboardFileReader(path)
+        first = reader.read()
+        assert first["time_series"]["t"] == []
+        assert reader.read() is first
+
+        for t in range(1, 121):
+            writer.update(values={"ts": t}, append={"time_series": {"t": [t]}})
+            if t % 7 == 0:
+                data = reader.read()
+                assert data["ts"] == t and data["time_series"]["t"] == list(range(1, t + 1))
+        data = reader.read()
+        assert data == writer.state
+        assert first["time_series"]["t"] == []  # earlier states are never mutated
+        writer.close()
+        print(f"✅ {writer.seq} updates across {writer.seq // 50 + 1} snapshots, reader version {reader.version}")
+
+def test_partial_line_is_not_consumed():
+    """A torn trailing line is applied only once it is complete"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dashboard_data.json"
+        writer = DashboardFileWriter(path)
+        writer.write_snapshot({"ts": 0})
+        reader = DashboardFileReader(path)
+        reader.read()
+
+        log_path = update_log_path(path)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write('{"update_seq": 1, "set": {"ts"')
+        assert reader.read()["ts"] == 0
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(': 5}}\n')
+        assert reader.read()["ts"] == 5
+
+def test_batches_copy_once_and_stay_bounded():
+    """A batch extends one copy of each list, and lists keep only their latest items"""
+    data = {"ts": 0, "time_series": {"t": [0]}}
+    updates = [{"update_seq": t, "set": {"ts": t}, "append": {"time_series": {"t": [t]}}} for t in range(1, 10)]
+    result = apply_updates(data, updates, max_items=5)
+    assert result["ts"] == 9 and result["time_series"]["t"] == [5, 6, 7, 8, 9]
+    assert data == {"ts": 0, "time_series": {"t": [0]}}
+
+    # Lists handed in through "set" belong to the caller and are copied before appending
+    values = [1]
+    result = apply_updates({}, [{"set": {"log": values}, "append": {"log": [2]}}])
+    assert result["log"] == [1, 2] and values == [1]
+
+def test_plain_json_file():
+    """Files written without the protocol still load"""
+    data = DashboardFileReader(Path(__file__).parents[1] / "data" / "dashboard_data.json").read()
+    assert data["selected_intersection"] == "intersection_1"
+
+if __name__ == "__main__":
+    test_reader_tails_updates()
+    test_partial_line_is_not_consumed()
+    test_batches_copy_once_and_stay_bounded()
+    test_plain_json_file()
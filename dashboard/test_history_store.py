@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for the chunked columnar history store
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from history_store import HistoryStore, HISTORY_SCHEMA
+from sumo_integration import SumoStreamlitIntegration
+
+def _row(t):
+    return {name: 0 for name in HISTORY_SCHEMA} | {"timestamp": float(t), "run_id": "run", "avg_wait_time": t / 10}
+
+def test_window_reads_touch_only_overlapping_chunks():
+    """A one-hour window out of a week reads one or two chunks"""
+    print("🧪 Testing HistoryStore windowed reads")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(tmp, chunk_rows=3600)
+        week = 7 * 24 * 3600
+        for t in range(0, week, 10):
+            store.append(_row(t))
+        store.flush()
+
+        reader = HistoryStore(tmp)
+        assert len(reader.chunks()) == 17
+        start, end = 3 * 24 * 3600, 3 * 24 * 3600 + 3600
+        assert len(reader.chunks(start, end)) <= 2
+        df = reader.read(start, end, columns=["timestamp", "avg_wait_time"])
+        assert list(df.columns) == ["timestamp", "avg_wait_time"]
+        assert len(df) == 361
+        assert df["timestamp"].min() == start and df["timestamp"].max() == end
+        print(f"✅ {len(df)} rows from {len(reader.chunks(start, end))} of {len(reader.chunks())} chunks")
+
+def test_integration_persists_published_snapshots():
+    """Every published snapshot of a run ends up in the store"""
+    with tempfile.TemporaryDirectory() as tmp:
+        integration = SumoStreamlitIntegration(history_store=HistoryStore(tmp))
+        assert integration.start_simulation("uniform", 120, "adaptive", speed=None, publish_interval=0)
+        integration.simulation_thread.join(timeout=10.0)
+
+        df = HistoryStore(tmp).read(run_id=integration.run_id)
+        assert len(df) == integration.publisher.version
+        assert df["simulation_time"].max() == 120
+
+if __name__ == "__main__":
+    test_window_reads_touch_only_overlapping_chunks()
+    test_integration_persists_published_snapshots()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for the incrementally styled intersection map
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import streamlit as st
+
+from intersection_components import (
+    MAP_LIGHT_SHAPES, MAP_PHASE_ANNOTATION, MAP_QUEUE_ANNOTATIONS, MAP_ROAD_SHAPES,
+    intersection_map_base, intersection_map_figure, map_element_paths, styled_intersection_map
+)
+
+def _snapshot(selected, phase, queues):
+    return {
+        "selected_intersection": selected,
+        "intersections": {
+            "intersection_1": {"name": "Main St & Oak Ave", "current_phase": phase, "queues": queues},
+            "intersection_2": {"name": "First St & Elm St", "current_phase": (phase + 1) % 5,
+                               "queues": queues[::-1]}
+        }
+    }
+
+def test_styled_map_matches_full_rebuild():
+    """Reusing the base figure and relayouting what changed gives the same figure as building it anew"""
+    print("🧪 Testing styled intersection map")
+
+    st.session_state.pop("_intersection_map_bases", None)
+    snapshots = [
+        _snapshot("intersection_1", 1, [0, 3, 6, 12]),
+        _snapshot("intersection_1", 2, [1, 3, 9, 0]),
+        _snapshot("intersection_2", 3, [4, 4, 2, 10]),
+        _snapshot("intersection_1", 4, [2, 7, 0, 5]),
+        _snapshot("intersection_2", 0, [0, 0, 0, 0])
+    ]
+    for d in snapshots:
+        assert styled_intersection_map(d).to_dict() == intersection_map_figure(d).to_dict()
+    print(f"✅ {len(snapshots)} snapshots match")
+
+def test_dynamic_elements_are_named():
+    """Every element the styles update is found by name in the base figure"""
+    paths = map_element_paths(intersection_map_base("Main St & Oak Ave"))
+    for name in MAP_ROAD_SHAPES + MAP_LIGHT_SHAPES:
+        assert paths[name].startswith("shapes[")
+    for name in MAP_QUEUE_ANNOTATIONS + (MAP_PHASE_ANNOTATION,):
+        assert paths[name].startswith("annotations[")
+
+if __name__ == "__main__":
+    test_styled_map_matches_full_rebuild()
+    test_dynamic_elements_are_named()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for minified HTML and CSS
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from markup import minify_css, minify_html
+
+def test_minify_css():
+    """Comments, style tags and layout whitespace go, values keep their spaces"""
+    print("🧪 Testing CSS minification")
+
+    css = """
+    <style>
+        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600&display=swap');
+        /* Cards */
+        .kpi-card {
+            color: #fff;
+            margin: 0 auto;
+        }
+        .grid > div, .row { padding: 1rem 2rem; }
+    </style>
+    """
+    assert minify_css(css) == ("@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600&display=swap');"
+                               ".kpi-card{color:#fff;margin:0 auto}.grid>div,.row{padding:1rem 2rem}")
+    print("✅ CSS minification OK")
+
+def test_minify_html():
+    """Line breaks and indentation collapse to one space, text is untouched"""
+    print("🧪 Testing HTML minification")
+
+    assert minify_html("""
+        <div class="kpi-card">
+            <span>Avg Wait</span> <b>12 s</b>
+        </div>
+    """) == '<div class="kpi-card"> <span>Avg Wait</span> <b>12 s</b> </div>'
+    print("✅ HTML minification OK")
+
+if __name__ == "__main__":
+    test_minify_css()
+    test_minify_html()
+    print("🎉 All markup tests passed")
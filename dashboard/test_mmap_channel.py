@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped snapshot channel
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mmap_channel import MmapSnapshotReader, MmapSnapshotWriter
+
+def test_round_trip():
+    """Published fields come back in the dashboard_data.json shape"""
+    print("🧪 Testing mmap snapshot channel")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.bin")
+        writer = MmapSnapshotWriter(path, 2, 4, names=["Main St & Oak Ave", "First St & Elm St"])
+        reader = MmapSnapshotReader(path)
+        assert reader.read() is None
+
+        writer.publish(phases=[1, 2], queues=[[1, 2, 3, 4], [5, 6, 7, 8]], selected_intersection=1,
+                       ts=10.0, avg_travel_time=150.0, baseline_avg_travel_time=165.0,
+                       avg_wait_time=30.0, vehicles_in_system=500)
+        data = reader.read()
+        assert data["vehicles_in_system"] == 500 and data["ts"] == 10.0
+        assert data["selected_intersection"] == "intersection_2"
+        assert data["intersections"]["intersection_2"] == {"current_phase": 2, "queues": [5, 6, 7, 8],
+                                                           "name": "First St & Elm St"}
+        assert reader.read() is data  # unchanged: header check only
+
+        writer.publish(ts=11.0, avg_travel_time=149.0)
+        data = reader.read()
+        assert list(data["time_series"]["t"]) == [10.0, 11.0]
+        assert data["intersections"]["intersection_1"]["queues"] == [1, 2, 3, 4]
+        writer.close()
+        print("✅ Round trip OK")
+
+def test_reads_are_never_torn():
+    """A reader racing the writer only sees complete updates"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.bin")
+        writer = MmapSnapshotWriter(path, 8, 16)
+        writer.publish(phases=[0] * 8, queues=[[0] * 16] * 8, ts=0.0)
+        reader = MmapSnapshotReader(path)
+        done = threading.Event()
+
+        def produce():
+            for k in range(1, 3000):
+                writer.publish(phases=[k] * 8, queues=[[k] * 16] * 8, ts=float(k))
+            done.set()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        reads = 0
+        while not done.is_set():
+            record = reader.snapshot()
+            if record is not None:
+                k = int(record["ts"])
+                assert (record["phases"] == k).all() and (record["queues"] == k).all()
+                reads += 1
+        thread.join()
+        writer.close()
+        print(f"✅ {reads} consistent reads during 3000 writes")
+
+def test_returned_history_outlives_later_reads():
+    """A time series handed out stays as it was while the reader's history wraps around"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.bin")
+        writer = MmapSnapshotWriter(path, 1, 4)
+        reader = MmapSnapshotReader(path, history=3)
+        writer.publish(ts=1.0)
+        held = reader.read()["time_series"]["t"]
+        for t in range(2, 10):
+            writer.publish(ts=float(t))
+            reader.read()
+        assert list(held) == [1.0]
+        assert list(reader.read()["time_series"]["t"]) == [7.0, 8.0, 9.0]
+        writer.close()
+
+def test_failed_or_abandoned_write_does_not_hang_readers():
+    """A rejected publish leaves the record readable; a writer killed mid-update only delays readers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snapshot.bin")
+        writer = MmapSnapshotWriter(path, 1, 4)
+        reader = MmapSnapshotReader(path)
+        writer.publish(ts=1.0, vehicles_in_system=10)
+        data = reader.read()
+
+        try:
+            writer.publish(ts=2.0, avg_speed=3.0)
+            assert False, "unknown KPI must be rejected"
+        except ValueError:
+            pass
+        assert reader.read() is data
+
+        # Producer died between making the sequence odd and even again
+        writer.record["ts"] = 3.0
+        writer.record["version"] = writer.version + 1
+        writer.record["seq"] = writer.seq + 1
+        started = time.monotonic()
+        assert reader.read() is data
+        assert time.monotonic() - started < 1.0
+        writer.close()
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_reads_are_never_torn()
+    test_returned_history_outlives_later_reads()
+    test_failed_or_abandoned_write_does_not_hang_readers()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized point-queue mock engine
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from mock_engine import APPROACH_TIME, PointQueueEngine
+from sumo_integration import TrafficState, LiveMetrics
+
+def test_engine_is_seedable_and_conserves_vehicles():
+    """Same seed gives the same run; every arrival is queued, in transit or departed"""
+    print("🧪 Testing PointQueueEngine determinism")
+
+    first = PointQueueEngine(50, scenario="tidal", seed=7)
+    second = PointQueueEngine(50, scenario="tidal", seed=7)
+    arrivals = 0
+    for _ in range(600):
+        first.step()
+        # This second's arrivals just entered the approach
+        arrivals += int(first._in_transit[first.time % APPROACH_TIME].sum())
+    second.step(600)
+    assert np.array_equal(first.queues, second.queues)
+    assert np.array_equal(first.departed, second.departed)
+    assert arrivals == first.queues.sum() + first._in_transit.sum() + first.departed.sum()
+
+    summary = first.network_summary()
+    assert summary["departed"] > 0 and summary["queued"] >= 0
+    assert (first.queues >= 0).all() and (first.waiting >= 0).all()
+
+    state = first.collect(3)
+    traffic_state = state.to_traffic_state(TrafficState)
+    metrics = state.to_live_metrics(LiveMetrics)
+    assert traffic_state.vehicle_count == int(first.queues[3].sum() + first._in_transit[:, 3].sum())
+    assert traffic_state.queue_length == sum(traffic_state.per_lane_queues.values())
+    assert 0.0 <= metrics.efficiency_score <= 100.0
+    assert len(state.signal_info()["state"]) == len(first.lane_ids)
+    print(f"✅ {summary}")
+
+def test_actuated_control_beats_fixed_time():
+    """Queue-actuated greens leave shorter queues than the fixed-time plan, and yellows run out"""
+    print("🧪 Testing queue-actuated control")
+
+    fixed = PointQueueEngine(20, scenario="asymmetric", seed=3)
+    actuated = PointQueueEngine(20, scenario="asymmetric", seed=3)
+    fixed_queued = actuated_queued = 0
+    for _ in range(1800):
+        fixed.step()
+        actuated.step()
+        yellow = ~actuated._green[actuated.phase].any(axis=1)
+        remaining = actuated.phase_remaining[yellow].copy()
+        actuated.actuate()
+        assert np.array_equal(actuated.phase_remaining[yellow], remaining)
+        fixed_queued += int(fixed.queues.sum())
+        actuated_queued += int(actuated.queues.sum())
+    assert actuated_queued < 0.8 * fixed_queued
+    print(f"✅ Mean queued vehicles {fixed_queued / 1800:.0f} fixed-time, {actuated_queued / 1800:.0f} actuated")
+
+def test_engine_city_scale_throughput():
+    """Thousands of intersections step at a rate far beyond real time"""
+    print("🧪 Testing PointQueueEngine throughput")
+
+    engine = PointQueueEngine(2000, seed=0)
+    started = time.perf_counter()
+    engine.step(500)
+    rate = 500 / (time.perf_counter() - started)
+    print(f"⏩ {engine.n_intersections} intersections at {rate:.0f} steps/s")
+    assert rate > 100
+
+if __name__ == "__main__":
+    test_engine_is_seedable_and_conserves_vehicles()
+    test_actuated_control_beats_fixed_time()
+    test_engine_city_scale_throughput()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for per-run and per-component payload accounting
+"""
+
+import sys
+import os
+import threading
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+from payload_meter import SCRIPT_RUN, UNATTRIBUTED, PayloadMeter
+
+def test_component_attribution():
+    """Bytes go to the innermost component, or to "other" outside any"""
+    print("🧪 Testing payload attribution")
+
+    meter = PayloadMeter()
+    meter.record(100)
+    assert not meter.runs
+
+    meter.begin_run()
+    meter.record(10)
+    with meter.component("styles"):
+        meter.record(200)
+        with meter.component("header"):
+            meter.record(30)
+    run = meter.current
+    assert run["label"] == SCRIPT_RUN and run["bytes"] == 240 and run["messages"] == 3
+    assert run["components"] == {UNATTRIBUTED: 10, "styles": 200, "header": 30}
+    assert meter.last_script_run() is None
+    print("✅ Attribution OK")
+
+def test_refresh_bytes_and_stretch():
+    """A refresh is the latest fragment run of each panel; the stretch keeps it within budget"""
+    print("🧪 Testing refresh size and interval stretch")
+
+    meter = PayloadMeter()
+    meter.begin_run()
+    with meter.panel("map"):
+        meter.record(4000)
+    with meter.panel("charts"):
+        meter.record(6000)
+    assert meter.current["panels"] == ["map", "charts"]
+    assert meter.refresh_bytes() == 0
+
+    # Fragment reruns (labelled by panel) replace that panel's share
+    meter.begin_run("map")
+    meter.record(1000)
+    assert meter.refresh_bytes() == 7000
+    meter.begin_run("map")
+    meter.record(2000)
+    assert meter.refresh_bytes() == 8000
+    assert meter.refresh_bytes(fragments=False) == 10_000
+    assert meter.last_script_run()["bytes"] == 10_000
+
+    # A script run in progress does not count until it finishes
+    meter.begin_run()
+    assert meter.refresh_bytes() == 8000
+
+    assert meter.stretch(0) == 1.0
+    assert meter.stretch(16_000) == 1.0
+    assert meter.stretch(4000) == 2.0
+    assert meter.stretch(4000, fragments=False) == 2.5
+    print("✅ Refresh size OK")
+
+def test_cached_repeats_count_as_references():
+    """A large element repeated within the cache age costs a reference, whatever its position"""
+    print("🧪 Testing cached message sizes")
+
+    def markdown(body, index):
+        msg = ForwardMsg()
+        msg.delta.new_element.markdown.body = body
+        msg.metadata.delta_path[:] = [0, index]
+        return msg
+
+    meter = PayloadMeter(max_cache_age=2)
+    css = markdown("<style>" + "x" * 20_000 + "</style>", 0)
+    small = markdown("<b>12 s</b>", 1)
+    meter.begin_run()
+    assert meter.sent_size(css) == css.ByteSize() > 20_000
+    assert meter.sent_size(small) == small.ByteSize()
+
+    meter.begin_run()
+    assert meter.sent_size(markdown(css.delta.new_element.markdown.body, 3)) < 100
+    assert meter.sent_size(small) == small.ByteSize()
+    assert not css.hash
+
+    # Not sent for longer than the cache age: sent in full again
+    for _ in range(3):
+        meter.begin_run()
+    assert meter.sent_size(css) == css.ByteSize()
+    print("✅ Cached sizes OK")
+
+def _in_script_thread(ctx, run):
+    """Call ``run()`` on a thread whose script run context is ``ctx``"""
+    errors = []
+
+    def target():
+        try:
+            run()
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=target)
+    add_script_run_ctx(thread, ctx)
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+def test_metering_restores_the_message_queue():
+    """Messages are counted only inside ``metering``; the original queue is back afterwards, even after an error"""
+    sent = []
+    ctx = SimpleNamespace(_enqueue=sent.append, fragment_ids_this_run=[], gather_usage_stats=False)
+    original = ctx._enqueue
+    msg = ForwardMsg()
+    msg.delta.new_element.markdown.body = "<b>12 s</b>"
+
+    def run():
+        meter = PayloadMeter()
+        meter.begin_run()
+        with meter.metering():
+            ctx._enqueue(msg)
+            with meter.panel("map"):
+                ctx._enqueue(msg)
+        assert ctx._enqueue is original
+        try:
+            with meter.metering():
+                raise RuntimeError("rerun")
+        except RuntimeError:
+            pass
+        assert ctx._enqueue is original
+        ctx._enqueue(msg)
+        assert meter.current["messages"] == 2 and meter.current["components"]["map"] == msg.ByteSize()
+        assert len(sent) == 3 and meter.available
+
+    _in_script_thread(ctx, run)
+
+def test_metering_unavailable_without_message_queue():
+    """A Streamlit without the private queue still runs the app, unmetered"""
+    def run():
+        meter = PayloadMeter()
+        meter.begin_run()
+        with meter.metering():
+            pass
+        assert not meter.available and meter.current["messages"] == 0
+
+    _in_script_thread(SimpleNamespace(fragment_ids_this_run=[], gather_usage_stats=False), run)
+
+if __name__ == "__main__":
+    test_component_attribution()
+    test_refresh_bytes_and_stretch()
+    test_cached_repeats_count_as_references()
+    test_metering_restores_the_message_queue()
+    test_metering_unavailable_without_message_queue()
+    print("🎉 All payload meter tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the out-of-process simulation runner
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+import time
+from process_runner import ProcessSimulationRunner, SharedSnapshotSlot
+
+def test_shared_snapshot_slot():
+    """Readers only see complete, newer payloads"""
+    print("🧪 Testing SharedSnapshotSlot")
+
+    slot = SharedSnapshotSlot(size=1024)
+    try:
+        assert slot.read() is None
+        assert slot.write(1, b"first", 1.0)
+        assert slot.read() == (1, b"first", 1.0)
+        assert slot.read(since_version=1) is None
+        assert not slot.write(2, b"x" * 2048, 2.0), "Oversized payload must be rejected"
+        assert slot.version == 1
+    finally:
+        slot.close()
+    print("✅ Slot OK")
+
+def test_process_runner():
+    """Simulation runs in a worker process and publishes through shared memory"""
+    print("🧪 Testing ProcessSimulationRunner")
+
+    runner = ProcessSimulationRunner()
+    try:
+        assert runner.start_simulation("uniform", 300, "adaptive", speed=None)
+
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            snapshot = runner.get_snapshot()
+            if snapshot and snapshot.data["simulation_time"] >= 300:
+                break
+            time.sleep(0.2)
+
+        assert snapshot is not None, "No snapshot received from worker"
+        print(f"📊 Version {snapshot.version}, Sim Time {snapshot.data['simulation_time']}s")
+        assert snapshot.data["simulation_time"] >= 300
+        assert runner.get_snapshot(since_version=snapshot.version) is None
+        assert runner.get_simulation_status()["runner"] == "process"
+    finally:
+        runner.shutdown()
+    print("✅ Runner OK")
+
+def test_concurrent_readers():
+    """Sessions reading one runner at once each get complete, current snapshots"""
+    print("🧪 Testing concurrent snapshot readers")
+
+    runner = ProcessSimulationRunner()
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                snapshot = runner.get_snapshot()
+                if snapshot is not None:
+                    assert snapshot.data["simulation_time"] >= 0
+        except Exception as e:
+            errors.append(e)
+
+    try:
+        # Paced so the readers overlap many appended deltas
+        assert runner.start_simulation("uniform", 600, "adaptive", speed=50.0)
+        readers = [threading.Thread(target=read) for _ in range(6)]
+        for reader in readers:
+            reader.start()
+        deadline = time.time() + 30
+        while runner.is_running and time.time() < deadline:
+            time.sleep(0.1)
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        assert not errors, errors
+        assert runner.get_snapshot().version == runner.slot.version
+    finally:
+        done.set()
+        runner.shutdown()
+    print("✅ Concurrent readers OK")
+
+if __name__ == "__main__":
+    test_shared_snapshot_slot()
+    test_process_runner()
+    test_concurrent_readers()
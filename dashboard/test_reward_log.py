@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test script for the buffered reward logger and its tailer
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from reward_log import RewardLogger, RewardLogTailer, REWARD_LOG_COLUMNS
+
+def test_tailer_follows_batches_and_rotation():
+    """Every logged step is read exactly once, across rotations"""
+    print("🧪 Testing reward log writer and tailer")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "reward_log.csv"
+        logger = RewardLogger(path, flush_rows=100, max_bytes=20_000, backups=3)
+        tailer = RewardLogTailer(path)
+        assert list(tailer.read().columns) == list(REWARD_LOG_COLUMNS)
+
+        for step in range(1, 1001):
+            logger.log(step, total_reward=step * 0.5, queue_penalty=-1.0)
+            if step % 150 == 0:
+                df = tailer.read()
+                assert df["step"].tolist() == list(range(1, len(df) + 1))
+        logger.close()
+
+        df = tailer.read()
+        assert df["step"].tolist() == list(range(1, 1001))
+        assert df["total_reward"].iloc[-1] == 500.0
+        assert tailer.read() is df
+        assert path.with_name("reward_log.csv.1").exists()
+        print(f"✅ {len(df)} rows tailed across rotations")
+
+def test_logging_is_cheap():
+    """Buffered logging costs microseconds per step"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with RewardLogger(Path(tmp) / "reward_log.csv") as logger:
+            started = time.perf_counter()
+            for step in range(50_000):
+                logger.log(step, total_reward=1.0, vehicle_count=10)
+            per_step_us = (time.perf_counter() - started) / 50_000 * 1e6
+        print(f"✅ {per_step_us:.1f} µs per logged step")
+        assert per_step_us < 100
+
+if __name__ == "__main__":
+    test_tailer_follows_batches_and_rotation()
+    test_logging_is_cheap()
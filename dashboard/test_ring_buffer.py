@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the time-series ring buffers
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from ring_buffer import RingBuffer, MetricHistory
+
+def test_ring_buffer_wraparound():
+    """Windows stay contiguous and ordered across wraparound"""
+    print("🧪 Testing RingBuffer wraparound")
+
+    buffer = RingBuffer(5, headroom=2)
+    for value in range(12):
+        buffer.append(value)
+
+    assert len(buffer) == 5
+    assert buffer.window().tolist() == [7, 8, 9, 10, 11]
+    assert buffer.window(2).tolist() == [10, 11]
+    assert buffer.latest() == 11
+    assert not buffer.window().flags.writeable
+
+    # A window stays valid for `headroom` further appends
+    view = buffer.window()
+    buffer.append(12)
+    buffer.append(13)
+    assert view.tolist() == [7, 8, 9, 10, 11]
+    print("✅ Wraparound OK")
+
+def test_metric_history_fixed_memory():
+    """History memory does not grow with the number of samples"""
+    print("🧪 Testing MetricHistory memory ceiling")
+
+    history = MetricHistory(capacity=100, max_lanes=4)
+    nbytes = history.nbytes
+    for t in range(1000):
+        history.append(t, 80.0, 12.0, 50, 3, 40.0, {"lane_1": t % 7, "lane_2": 1})
+
+    assert history.nbytes == nbytes
+    window = history.window()
+    assert len(window["simulation_times"]) == 100
+    assert window["simulation_times"][-1] == 999
+    lanes = history.lane_window(10)
+    assert list(lanes) == ["lane_1", "lane_2"]
+    assert np.array_equal(lanes["lane_1"], np.arange(990, 1000) % 7)
+    print(f"✅ {nbytes / 1024:.0f} KiB for {len(history)} retained samples")
+
+def test_copied_windows_outlive_appends():
+    """Copied windows (as published in snapshots) keep their values while the history wraps and resets"""
+    history = MetricHistory(capacity=4, max_lanes=4)
+    for t in range(4):
+        history.append(t, 80.0, 12.0, 50, 3, 40.0, {"lane_1": t})
+    window = history.window(copy=True)
+    lanes = history.lane_window(copy=True)
+    for t in range(4, 20):
+        history.append(t, 80.0, 12.0, 50, 3, 40.0, {"lane_1": t})
+    history.clear()
+    assert window["simulation_times"].tolist() == [0, 1, 2, 3]
+    assert lanes["lane_1"].tolist() == [0, 1, 2, 3]
+    print("✅ Copied windows OK")
+
+if __name__ == "__main__":
+    test_ring_buffer_wraparound()
+    test_metric_history_fixed_memory()
+    test_copied_windows_outlive_appends()
@@ -50,5 +50,54 @@ def test_mock_simulation():
     
     print("\n🎯 Test complete!")
 
+def test_fast_simulation():
+    """Test that the as-fast-as-possible mode runs far ahead of real time"""
+    print("🧪 Testing Fast Simulation Mode")
+    print("=" * 50)
+    
+    integration = SumoStreamlitIntegration()
+    success = integration.start_simulation("uniform", 600, "adaptive", speed=None)
+    assert success, "Simulation failed to start"
+    
+    # 600 simulated seconds would take 10 minutes at 1x
+    integration.simulation_thread.join(timeout=10.0)
+    assert not integration.simulation_thread.is_alive(), "Fast mode did not finish in time"
+    
+    data = integration.get_current_data()
+    print(f"⏱️ Final Sim Time: {data['simulation_time']}s")
+    assert data["simulation_time"] >= 600
+    
+    # Readers get nothing new once they have seen the latest version
+    snapshot = integration.get_snapshot()
+    assert snapshot.data is data
+    assert integration.get_snapshot(since_version=snapshot.version) is None
+    
+    print("\n🎯 Test complete!")
+
+def test_loop_intervals():
+    """Test that observation and decisions run less often than stepping"""
+    print("🧪 Testing Loop Intervals")
+    print("=" * 50)
+    
+    integration = SumoStreamlitIntegration()
+    success = integration.start_simulation("uniform", 600, "adaptive", speed=None,
+                                           step_interval=5, observe_interval=10, decision_interval=30)
+    assert success, "Simulation failed to start"
+    integration.simulation_thread.join(timeout=10.0)
+    assert not integration.simulation_thread.is_alive(), "Simulation did not finish in time"
+    
+    stats = integration.get_simulation_status()["loop_stats"]
+    stages = stats["stages"]
+    print(f"📈 Loop cost: {integration.profiler.summary()}")
+    assert stats["simulated_seconds"] == 600
+    assert stages["step"]["calls"] == 120
+    assert stages["observe"]["calls"] == 60
+    assert stages["decide"]["calls"] == 20
+    assert integration.get_current_data()["simulation_time"] >= 600
+    
+    print("\n🎯 Test complete!")
+
 if __name__ == "__main__":
     test_mock_simulation()
+    test_fast_simulation()
+    test_loop_intervals()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared simulation hub
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+from simulation_hub import SimulationHub
+
+def test_hub_shares_and_stops_when_idle():
+    """Viewers share one integration; the simulation stops after the last leaves"""
+    print("🧪 Testing SimulationHub reference counting")
+
+    hub = SimulationHub(idle_timeout=0.5)
+    first = hub.attach("viewer_a")
+    second = hub.attach("viewer_b")
+    assert first is second, "Viewers must share one integration"
+    assert hub.viewer_count == 2
+
+    assert first.start_simulation("uniform", 600, "adaptive")
+    hub.detach("viewer_a")
+    assert first.is_running, "Simulation must keep running while a viewer remains"
+
+    # viewer_b stops sending heartbeats
+    time.sleep(0.6)
+    hub.reap()
+    assert hub.viewer_count == 0
+    first.simulation_thread.join(timeout=5.0)
+    assert not first.is_running, "Idle simulation should be stopped"
+    print("✅ Hub OK")
+
+if __name__ == "__main__":
+    test_hub_shares_and_stops_when_idle()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the keyframe + delta snapshot codec
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from snapshot_codec import DELTA, KEYFRAME, SnapshotDecoder, SnapshotEncoder, frame, iter_frames
+from sumo_integration import SumoStreamlitIntegration
+
+def _plain(value):
+    """Comparable form of a snapshot value"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if hasattr(value, "items"):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+def test_round_trip_of_a_run():
+    """Decoded snapshots equal the published ones; deltas stay small"""
+    print("🧪 Testing snapshot codec")
+
+    integration = SumoStreamlitIntegration()
+    encoder, decoder = SnapshotEncoder(keyframe_interval=25), SnapshotDecoder()
+    sizes = {KEYFRAME: [], DELTA: []}
+
+    def on_snapshot(snapshot):
+        kind, message = encoder.encode(snapshot.version, snapshot.data)
+        sizes[kind].append(len(message))
+        assert decoder.decode(message)
+        assert decoder.version == snapshot.version
+        assert _plain(decoder.data) == _plain(snapshot.data)
+
+    integration.publisher.add_listener(on_snapshot)
+    assert integration.start_simulation("tidal", 600, "adaptive", speed=None, publish_interval=0)
+    integration.simulation_thread.join(timeout=20.0)
+
+    assert sizes[KEYFRAME] and sizes[DELTA]
+    mean_keyframe, mean_delta = np.mean(sizes[KEYFRAME]), np.mean(sizes[DELTA])
+    print(f"✅ {len(sizes[DELTA])} deltas of {mean_delta:.0f} B vs keyframes of {mean_keyframe:.0f} B")
+    assert mean_delta * 5 < mean_keyframe
+
+def test_delta_needs_its_base():
+    """A delta whose base was missed is rejected until the next keyframe"""
+    encoder, decoder = SnapshotEncoder(), SnapshotDecoder()
+    first = encoder.encode(1, {"a": 1, "b": {"c": [1]}})[1]
+    encoder.encode(2, {"a": 2, "b": {"c": [1]}})
+    third = encoder.encode(3, {"a": 3, "b": {}})[1]
+    assert decoder.decode(first)
+    assert not decoder.decode(third)
+    assert decoder.data == {"a": 1, "b": {"c": [1]}}
+
+    stream = frame(first) + frame(third)
+    assert [len(m) for m in iter_frames(stream)] == [len(first), len(third)]
+
+if __name__ == "__main__":
+    test_round_trip_of_a_run()
+    test_delta_needs_its_base()
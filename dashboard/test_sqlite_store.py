@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite metrics store and its rollups
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlite_store import SQLiteMetricsStore
+from sumo_integration import SumoStreamlitIntegration
+
+def _state(t):
+    return SimpleNamespace(timestamp=t, avg_waiting_time=float(t % 10), vehicle_count=5,
+                           queue_length=t % 7, avg_speed=10.0)
+
+def test_rollups_match_raw_rows():
+    """Rollup buckets average exactly the raw rows they cover"""
+    print("🧪 Testing SQLite rollups")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteMetricsStore(os.path.join(tmp, "metrics.sqlite3"), batch_rows=97)
+        start = 1_080_000.0  # aligned to every bucket width
+        for t in range(7200):
+            store.append(_state(t), run_id="run", timestamp=start + t)
+        store.flush()
+
+        _, raw = store.query(start, start + 7199, resolution=None)
+        assert len(raw) == 7200
+        for table, width in (("metrics_10s", 10), ("metrics_1m", 60), ("metrics_15m", 900)):
+            _, df = store.query(start, start + 7199, resolution=table)
+            assert len(df) == 7200 // width
+            assert abs(df["wait_time"].mean() - raw["wait_time"].mean()) < 1e-9
+            assert df["queue_length_max"].max() == 6
+        store.close()
+        print("✅ Rollups consistent across batches")
+
+def test_auto_resolution_fills_chart():
+    """The coarsest table with enough buckets in the range is chosen"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteMetricsStore(os.path.join(tmp, "metrics.sqlite3"))
+        for t in range(7200):
+            store.append(_state(t), run_id="run", timestamp=1_000_000.0 + t)
+        store.flush()
+        assert store.pick_resolution(0, 2e6, points=1000) is None
+        assert store.pick_resolution(0, 2e6) == "metrics_10s"
+        assert store.pick_resolution(0, 2e6, points=100) == "metrics_1m"
+        assert store.pick_resolution(0, 2e6, points=5) == "metrics_15m"
+        store.close()
+
+def test_rollups_are_per_run_and_simulation_time():
+    """Concurrent runs keep separate buckets, and buckets span simulated seconds at any playback speed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteMetricsStore(os.path.join(tmp, "metrics.sqlite3"))
+        for t in range(600):
+            # 10x playback: ten simulated seconds per wall-clock second
+            store.append(_state(t), run_id="fast", timestamp=1_000_000.0 + t / 10)
+            store.append(SimpleNamespace(timestamp=t, avg_waiting_time=100.0, vehicle_count=5,
+                                         queue_length=50, avg_speed=10.0), run_id="slow",
+                         timestamp=1_000_000.0 + t / 10)
+        store.flush()
+
+        _, fast = store.query(0, 2e6, resolution="metrics_1m", run_id="fast")
+        assert fast["simulation_time"].tolist() == list(range(0, 600, 60))
+        assert fast["queue_length_max"].max() == 6 and fast["wait_time"].max() < 10
+        _, both = store.query(0, 2e6, resolution="metrics_1m")
+        assert len(both) == 20 and set(both["run_id"]) == {"fast", "slow"}
+
+        # Resolution is chosen from one run's buckets: 10 one-minute buckets are too few for 15 points
+        assert store.pick_resolution(0, 2e6, points=15) == "metrics_1m"
+        assert store.pick_resolution(0, 2e6, points=15, run_id="fast") == "metrics_10s"
+        assert set(store.runs(0, 2e6)) == {"fast", "slow"}
+        store.close()
+
+def test_old_rollups_are_rebuilt():
+    """Wall-clock rollups of an older database are replaced by per-run ones built from the raw rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "metrics.sqlite3")
+        store = SQLiteMetricsStore(path)
+        for t in range(120):
+            store.append(_state(t), run_id="run", timestamp=1_000_000.0 + t)
+        store.close()
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA user_version = 0")
+            conn.execute("DROP TABLE metrics_1m")
+            conn.execute("CREATE TABLE metrics_1m (bucket INTEGER PRIMARY KEY, n INTEGER NOT NULL)")
+
+        store = SQLiteMetricsStore(path)
+        _, df = store.query(0, 2e6, resolution="metrics_1m")
+        assert df["simulation_time"].tolist() == [0, 60] and df["run_id"].tolist() == ["run", "run"]
+        store.close()
+
+def test_integration_writes_every_observation():
+    """A mock run stores one raw row per observed step"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteMetricsStore(os.path.join(tmp, "metrics.sqlite3"))
+        integration = SumoStreamlitIntegration(metrics_store=store)
+        assert integration.start_simulation("uniform", 120, "adaptive", speed=None)
+        integration.simulation_thread.join(timeout=10.0)
+
+        _, df = store.query(0, float("inf"), resolution=None)
+        assert len(df) == len(integration.history)
+        store.close()
+
+if __name__ == "__main__":
+    test_rollups_match_raw_rows()
+    test_auto_resolution_fills_chart()
+    test_rollups_are_per_run_and_simulation_time()
+    test_old_rollups_are_rebuilt()
+    test_integration_writes_every_observation()
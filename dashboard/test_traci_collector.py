@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test script for the subscription-based TraCI collector (runs without SUMO)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fake_traci import FakeTraci
+from traci_collector import SubscriptionStateCollector
+from sumo_integration import TrafficState, LiveMetrics
+
+def test_collector_without_round_trips():
+    """After subscribing, collecting a step costs no TraCI round trips"""
+    print("🧪 Testing SubscriptionStateCollector with FakeTraci")
+
+    fake = FakeTraci(seed=1)
+    collector = SubscriptionStateCollector(fake)
+    collector.subscribe()
+    assert len(collector.lane_ids) == 8, "Internal lanes must be skipped"
+
+    for _ in range(120):
+        fake.simulationStep()
+        before = fake.round_trips
+        state = collector.collect()
+        assert fake.round_trips == before
+
+    assert state.simulation_time == 120
+    assert state.lane_halting.shape == (8,)
+    assert state.vehicle_count == len(fake.vehicles)
+
+    traffic_state = state.to_traffic_state(TrafficState)
+    metrics = state.to_live_metrics(LiveMetrics)
+    assert traffic_state.queue_length == sum(traffic_state.per_lane_queues.values())
+    assert 0.0 <= metrics.efficiency_score <= 100.0
+    assert len(state.signal_info()["state"]) == 8
+    print(f"✅ {state.vehicle_count} vehicles, queue {state.queue_length}, phase {state.current_phase}")
+
+if __name__ == "__main__":
+    test_collector_without_round_trips()
@@ -0,0 +1,199 @@
+"""
+Subscription-Based TraCI State Collection
+Reads lane, vehicle and traffic light state from one batch of subscription results per step
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from compact_state import CompactTrafficState, LaneTable
+
+# TraCI variable ids (mirrors traci.constants so this module imports without SUMO)
+LAST_STEP_VEHICLE_NUMBER = 0x10
+LAST_STEP_MEAN_SPEED = 0x11
+LAST_STEP_VEHICLE_HALTING_NUMBER = 0x14
+VAR_WAITING_TIME = 0x7a
+VAR_SPEED = 0x40
+VAR_TIME = 0x66
+TL_RED_YELLOW_GREEN_STATE = 0x20
+TL_CURRENT_PHASE = 0x28
+TL_NEXT_SWITCH = 0x2d
+CMD_GET_VEHICLE_VARIABLE = 0xa4
+
+LANE_VARIABLES = (LAST_STEP_VEHICLE_NUMBER, LAST_STEP_VEHICLE_HALTING_NUMBER, LAST_STEP_MEAN_SPEED, VAR_WAITING_TIME)
+VEHICLE_VARIABLES = (VAR_SPEED, VAR_WAITING_TIME)
+TLS_VARIABLES = (TL_RED_YELLOW_GREEN_STATE, TL_CURRENT_PHASE, TL_NEXT_SWITCH)
+SIMULATION_VARIABLES = (VAR_TIME,)
+
+# Radius (m) around the junction for the vehicle context subscription
+DEFAULT_CONTEXT_RANGE = 150.0
+
+
+def _congestion_level(queue_length: float) -> str:
+    if queue_length <= 2:
+        return "free_flow"
+    elif queue_length <= 5:
+        return "moderate"
+    elif queue_length <= 8:
+        return "congested"
+    return "severe"
+
+
+@dataclass
+class CollectedState:
+    """Decoded subscription results for one simulation step"""
+    simulation_time: float
+    lane_ids: Sequence[str]
+    lane_vehicle_counts: np.ndarray
+    lane_halting: np.ndarray
+    lane_mean_speeds: np.ndarray
+    lane_waiting_times: np.ndarray
+    vehicle_speeds: np.ndarray
+    vehicle_waiting_times: np.ndarray
+    signal_state: str
+    current_phase: int
+    next_switch: float
+
+    @property
+    def vehicle_count(self) -> int:
+        return int(self.lane_vehicle_counts.sum())
+
+    @property
+    def queue_length(self) -> int:
+        return int(self.lane_halting.sum())
+
+    @property
+    def remaining_time(self) -> float:
+        return max(0.0, self.next_switch - self.simulation_time)
+
+    def to_traffic_state(self, traffic_state_cls=None):
+        """Build a TrafficState without any further TraCI calls
+
+        Without ``traffic_state_cls`` the result is a ``CompactTrafficState``
+        sharing this step's lane arrays; otherwise per-lane dicts are built.
+        """
+        if traffic_state_cls is None:
+            return CompactTrafficState(
+                timestamp=self.simulation_time,
+                vehicle_count=self.vehicle_count,
+                waiting_vehicles=self.queue_length,
+                avg_waiting_time=float(self.vehicle_waiting_times.mean()) if self.vehicle_waiting_times.size else 0.0,
+                avg_speed=float(self.vehicle_speeds.mean()) if self.vehicle_speeds.size else 0.0,
+                queue_length=self.queue_length,
+                current_phase=self.current_phase,
+                phase_duration=self.remaining_time,
+                lanes=LaneTable.intern(self.lane_ids),
+                lane_queues=self.lane_halting,
+                lane_waiting_times=self.lane_waiting_times,
+                lane_vehicle_counts=self.lane_vehicle_counts
+            )
+        lane_ids = self.lane_ids
+        return traffic_state_cls(
+            timestamp=self.simulation_time,
+            vehicle_count=self.vehicle_count,
+            waiting_vehicles=self.queue_length,
+            avg_waiting_time=float(self.vehicle_waiting_times.mean()) if self.vehicle_waiting_times.size else 0.0,
+            avg_speed=float(self.vehicle_speeds.mean()) if self.vehicle_speeds.size else 0.0,
+            queue_length=self.queue_length,
+            current_phase=self.current_phase,
+            phase_duration=self.remaining_time,
+            per_lane_queues=dict(zip(lane_ids, self.lane_halting.tolist())),
+            per_lane_waiting_times=dict(zip(lane_ids, self.lane_waiting_times.tolist())),
+            per_lane_vehicle_counts=dict(zip(lane_ids, self.lane_vehicle_counts.tolist())),
+            signal_phase_timing={"remaining": self.remaining_time},
+            congestion_per_lane={lane: _congestion_level(q) for lane, q in zip(lane_ids, self.lane_halting.tolist())},
+            emergency_vehicles=[],
+            pedestrian_waiting=0
+        )
+
+    def to_live_metrics(self, live_metrics_cls):
+        """Derive LiveMetrics from the same batch (share of moving vehicles as efficiency)"""
+        vehicles = self.vehicle_count
+        waiting = self.queue_length
+        return live_metrics_cls(
+            timestamp=time.time(),
+            simulation_time=self.simulation_time,
+            vehicle_count=vehicles,
+            waiting_vehicles=waiting,
+            avg_waiting_time=float(self.vehicle_waiting_times.mean()) if self.vehicle_waiting_times.size else 0.0,
+            avg_speed=float(self.vehicle_speeds.mean()) if self.vehicle_speeds.size else 0.0,
+            queue_length=waiting,
+            current_phase=self.current_phase,
+            phase_duration=self.remaining_time,
+            efficiency_score=100.0 * (1 - waiting / vehicles) if vehicles else 100.0,
+            congestion_level=_congestion_level(waiting),
+            throughput=float(vehicles - waiting),
+            density=vehicles / len(self.lane_ids) if len(self.lane_ids) else 0.0
+        )
+
+    def signal_info(self) -> Dict[str, Any]:
+        return {
+            "state": self.signal_state,
+            "phase_name": f"Phase {self.current_phase}",
+            "remaining_time": self.remaining_time
+        }
+
+
+class SubscriptionStateCollector:
+    """Collects per-step state through TraCI subscriptions.
+
+    ``subscribe`` registers variable subscriptions for every lane, the
+    traffic light and the simulation clock, plus a vehicle context
+    subscription around the junction, once per scenario. SUMO then pushes all
+    values with each ``simulationStep`` reply, so ``collect`` only decodes
+    the cached results into arrays and performs no TraCI round trips.
+    ``traci_module`` is the ``traci`` module or a ``fake_traci.FakeTraci``.
+    """
+
+    def __init__(self, traci_module, tls_id: Optional[str] = None, junction_id: Optional[str] = None,
+                 context_range: float = DEFAULT_CONTEXT_RANGE):
+        self.traci = traci_module
+        self.tls_id = tls_id
+        self.junction_id = junction_id
+        self.context_range = context_range
+        self.lane_ids = ()
+
+    def subscribe(self):
+        """Register all subscriptions (call once after the scenario is loaded)"""
+        traci = self.traci
+        self.lane_ids = LaneTable.intern([lane for lane in traci.lane.getIDList() if not lane.startswith(":")])
+        for lane_id in self.lane_ids:
+            traci.lane.subscribe(lane_id, LANE_VARIABLES)
+
+        if self.tls_id is None:
+            self.tls_id = traci.trafficlight.getIDList()[0]
+        traci.trafficlight.subscribe(self.tls_id, TLS_VARIABLES)
+
+        # Traffic lights are usually named after the junction they control
+        if self.junction_id is None:
+            self.junction_id = self.tls_id
+        traci.junction.subscribeContext(self.junction_id, CMD_GET_VEHICLE_VARIABLE, self.context_range, VEHICLE_VARIABLES)
+        traci.simulation.subscribe(SIMULATION_VARIABLES)
+
+    def collect(self) -> CollectedState:
+        """Decode this step's subscription results"""
+        traci = self.traci
+        lane_ids = self.lane_ids
+        n = len(lane_ids)
+        lanes = traci.lane.getAllSubscriptionResults()
+        vehicles = traci.junction.getContextSubscriptionResults(self.junction_id) or {}
+        tls = traci.trafficlight.getSubscriptionResults(self.tls_id)
+        simulation = traci.simulation.getSubscriptionResults()
+        m = len(vehicles)
+
+        return CollectedState(
+            simulation_time=float(simulation[VAR_TIME]),
+            lane_ids=lane_ids,
+            lane_vehicle_counts=np.fromiter((lanes[l][LAST_STEP_VEHICLE_NUMBER] for l in lane_ids), np.int32, n),
+            lane_halting=np.fromiter((lanes[l][LAST_STEP_VEHICLE_HALTING_NUMBER] for l in lane_ids), np.int32, n),
+            lane_mean_speeds=np.fromiter((lanes[l][LAST_STEP_MEAN_SPEED] for l in lane_ids), np.float64, n),
+            lane_waiting_times=np.fromiter((lanes[l][VAR_WAITING_TIME] for l in lane_ids), np.float64, n),
+            vehicle_speeds=np.fromiter((v[VAR_SPEED] for v in vehicles.values()), np.float64, m),
+            vehicle_waiting_times=np.fromiter((v[VAR_WAITING_TIME] for v in vehicles.values()), np.float64, m),
+            signal_state=tls[TL_RED_YELLOW_GREEN_STATE],
+            current_phase=int(tls[TL_CURRENT_PHASE]),
+            next_switch=float(tls[TL_NEXT_SWITCH])
+        )
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Dummy Dashboard Producer
+Feeds the dashboard through the file or memory-mapped protocol, as an external simulator would
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard"))
+
+from config import DATA_FILE, MMAP_SNAPSHOT_FILE
+from file_source import DashboardFileWriter
+from mmap_channel import MmapSnapshotWriter
+
+INTERSECTIONS = {
+    "intersection_1": "Main St & Oak Ave",
+    "intersection_2": "First St & Elm St",
+    "intersection_3": "Broadway & Pine St"
+}
+
+
+def initial_state():
+    return {
+        "ts": 0,
+        "avg_travel_time": 170.0,
+        "avg_wait_time": 30.0,
+        "vehicles_in_system": 500,
+        "baseline_avg_travel_time": 170.0,
+        "selected_intersection": "intersection_1",
+        "intersections": {
+            key: {"current_phase": 0, "queues": [0, 0, 0, 0], "name": name}
+            for key, name in INTERSECTIONS.items()
+        },
+        "time_series": {"t": [], "rl_avg_travel_time": [], "baseline_avg_travel_time": []},
+        "latest_frame_path": "",
+        "traffic_phases": {
+            "0": "North-South Green",
+            "1": "East-West Green",
+            "2": "All Red (Transition)",
+            "3": "North-South Yellow",
+            "4": "East-West Yellow"
+        }
+    }
+
+
+def random_intersections(t):
+    return {
+        key: {"current_phase": (t // 30) % 2, "queues": [random.randint(0, 12) for _ in range(4)], "name": name}
+        for key, name in INTERSECTIONS.items()
+    }
+
+
+def run_mmap(path, steps: int, rate: float):
+    """Publish fixed-layout snapshots into a memory-mapped file"""
+    writer = MmapSnapshotWriter(path, len(INTERSECTIONS), 4, names=list(INTERSECTIONS.values()))
+    print(f"✍️ Publishing {steps} snapshots to {path} at {rate}/s")
+    rl, baseline = 170.0, 170.0
+    try:
+        for t in range(1, steps + 1):
+            rl = max(120.0, rl + random.uniform(-1.5, 1.0))
+            baseline = max(140.0, baseline + random.uniform(-0.8, 0.8))
+            intersections = random_intersections(t).values()
+            writer.publish(
+                phases=[node["current_phase"] for node in intersections],
+                queues=[node["queues"] for node in intersections],
+                ts=t, avg_travel_time=rl, baseline_avg_travel_time=baseline,
+                avg_wait_time=rl / 5, vehicles_in_system=random.randint(450, 550)
+            )
+            time.sleep(1.0 / rate)
+    except KeyboardInterrupt:
+        print("🛑 Stopped")
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write dummy dashboard data through the file protocol")
+    parser.add_argument("--rate", type=float, default=1.0, help="Updates per second")
+    parser.add_argument("--steps", type=int, default=3600, help="Number of updates to write")
+    parser.add_argument("--format", choices=["json", "mmap"], default="json", help="Protocol to write")
+    parser.add_argument("--output", default=None, help="Snapshot file read by the dashboard")
+    args = parser.parse_args()
+
+    if args.format == "mmap":
+        run_mmap(args.output or MMAP_SNAPSHOT_FILE, args.steps, args.rate)
+        return
+    args.output = args.output or str(DATA_FILE)
+
+    writer = DashboardFileWriter(args.output)
+    writer.write_snapshot(initial_state())
+    print(f"✍️ Writing {args.steps} updates to {args.output} at {args.rate}/s")
+
+    rl, baseline = 170.0, 170.0
+    try:
+        for t in range(1, args.steps + 1):
+            rl = max(120.0, rl + random.uniform(-1.5, 1.0))
+            baseline = max(140.0, baseline + random.uniform(-0.8, 0.8))
+            intersections = random_intersections(t)
+            writer.update(
+                values={
+                    "ts": t,
+                    "avg_travel_time": round(rl, 1),
+                    "baseline_avg_travel_time": round(baseline, 1),
+                    "avg_wait_time": round(rl / 5, 1),
+                    "vehicles_in_system": random.randint(450, 550),
+                    "intersections": intersections
+                },
+                append={"time_series": {"t": [t], "rl_avg_travel_time": [round(rl, 1)],
+                                        "baseline_avg_travel_time": [round(baseline, 1)]}}
+            )
+            time.sleep(1.0 / args.rate)
+    except KeyboardInterrupt:
+        print("🛑 Stopped")
+    finally:
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
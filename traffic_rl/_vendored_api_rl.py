@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import pandas as pd
 
+# Steps per DataFrame yielded by the streaming episode API
+DEFAULT_BATCH_STEPS = 1000
+
 
 def load_rl(model_path: str = "models/demo_rl.pth"):
     raise FileNotFoundError(
@@ -16,44 +19,85 @@ def run_rl_step(agent: Any, state: List[float]) -> Dict[str, Optional[float]]:
     return {"action": 0, "reward": None, "avg_wait_time": None}
 
 
-def simulate_episode(agent: Any, env: Any, max_steps: int = 100) -> pd.DataFrame:
+def _placeholder_rows(start: int, stop: int) -> pd.DataFrame:
+    steps = stop - start
     return pd.DataFrame(
         {
-            "time": list(range(max_steps)),
-            "action": [0] * max_steps,
-            "reward": [0.0] * max_steps,
-            "avg_wait_time": [None] * max_steps,
-            "queue_length": [None] * max_steps,
-            "phase": [0] * max_steps,
-            "junction_id": [None] * max_steps,
-            "waiting_time": [None] * max_steps,
-            "throughput": [None] * max_steps,
+            "time": list(range(start, stop)),
+            "action": [0] * steps,
+            "reward": [0.0] * steps,
+            "avg_wait_time": [None] * steps,
+            "queue_length": [None] * steps,
+            "phase": [0] * steps,
+            "junction_id": [None] * steps,
+            "waiting_time": [None] * steps,
+            "throughput": [None] * steps,
         }
     )
 
 
-def make_dummy_episode(max_steps: int = 100) -> pd.DataFrame:
-    """Generate dummy episode data for fallback."""
-    import random
+def simulate_episode(agent: Any, env: Any, max_steps: int = 100) -> pd.DataFrame:
+    return _placeholder_rows(0, max_steps)
+
+
+def simulate_episode_stream(agent: Any, env: Any, max_steps: int = 100,
+                            batch_size: int = DEFAULT_BATCH_STEPS) -> Iterator[pd.DataFrame]:
+    """Episode rows in DataFrames of up to ``batch_size`` steps, yielded as they are produced."""
+    for start in range(0, max_steps, batch_size):
+        yield _placeholder_rows(start, min(start + batch_size, max_steps))
+
+
+def episode_batches(df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_STEPS) -> Iterator[pd.DataFrame]:
+    """Slice a complete episode into the batches of the streaming API."""
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def make_dummy_episode_stream(max_steps: int = 100, junctions: int = 1, seed: Optional[int] = 42,
+                              batch_size: int = DEFAULT_BATCH_STEPS) -> Iterator[pd.DataFrame]:
+    """Dummy episode in chunks of ``batch_size`` steps, one row per step and junction.
+    
+    Every column is computed with NumPy over the whole chunk from one
+    per-call generator, so the output depends only on the arguments.
+    """
     import numpy as np
     
-    records = []
-    np.random.seed(42)
+    rng = np.random.default_rng(seed)
+    names = [f"J{j + 1}" for j in range(junctions)]
+    # Junctions differ in load and in where they are on the daily cycle
+    load = rng.uniform(0.8, 1.2, junctions)
+    offset = rng.uniform(0, 60, junctions)
     
-    for t in range(max_steps):
-        action = random.randint(0, 3)
-        reward = 0.5 + 0.3 * np.sin(t * 0.1) + np.random.normal(0, 0.1)
-        avg_wait_time = max(0.0, 15.0 - t * 0.1 + 2 * np.sin(t * 0.05) + np.random.normal(0, 1.0))
-        queue_length = max(0, int(40 - t * 0.3 + 5 * np.sin(t * 0.08) + np.random.normal(0, 2)))
+    for start in range(0, max_steps, batch_size):
+        steps = min(batch_size, max_steps - start)
+        t = np.arange(start, start + steps, dtype=np.float64)
+        time = np.repeat(t, junctions)
+        shifted = (t[:, None] + offset).ravel()
+        scale = np.tile(load, steps)
+        n = steps * junctions
         
-        records.append({
-            "time": t,
-            "action": action,
-            "reward": round(reward, 3),
-            "avg_wait_time": round(avg_wait_time, 2),
+        # The agent's improvement levels off instead of driving long episodes to zero
+        learned = 1.0 - np.exp(-time / 100.0)
+        reward = 0.5 + 0.3 * np.sin(shifted * 0.1) + rng.normal(0, 0.1, n)
+        avg_wait_time = np.maximum(0.0, scale * (15.0 - 12.0 * learned + 2 * np.sin(shifted * 0.05)) + rng.normal(0, 1.0, n))
+        queue_length = np.maximum(0, scale * (40 - 30 * learned + 5 * np.sin(shifted * 0.08)) + rng.normal(0, 2, n)).astype(np.int64)
+        throughput = rng.poisson(np.maximum(0.5, scale * (8 + 3 * np.sin(shifted * 0.03))))
+        
+        yield pd.DataFrame({
+            "time": time.astype(np.int64),
+            "action": rng.integers(0, 4, n),
+            "reward": reward.round(3),
+            "avg_wait_time": avg_wait_time.round(2),
             "queue_length": queue_length,
+            "throughput": throughput,
+            "junction_id": pd.Categorical.from_codes(np.tile(np.arange(junctions), steps), categories=names),
         })
-    
-    return pd.DataFrame.from_records(records)
 
 
+def make_dummy_episode(max_steps: int = 100, junctions: int = 1, seed: Optional[int] = 42) -> pd.DataFrame:
+    """Generate dummy episode data for fallback."""
+    chunks = list(make_dummy_episode_stream(max_steps, junctions, seed))
+    if not chunks:
+        return pd.DataFrame(columns=["time", "action", "reward", "avg_wait_time", "queue_length",
+                                     "throughput", "junction_id"])
+    return pd.concat(chunks, ignore_index=True)
@@ -20,6 +20,13 @@ if str(_rl_repo) not in sys.path:
 try:
     # Import from the actual RL repo
     from api_rl import load_rl, run_rl_step, simulate_episode, make_dummy_episode  # noqa: F401
+    from ._vendored_api_rl import DEFAULT_BATCH_STEPS, episode_batches, make_dummy_episode_stream  # noqa: F401
+    try:
+        from api_rl import simulate_episode_stream  # noqa: F401
+    except ImportError:
+        def simulate_episode_stream(agent, env, max_steps: int = 100, batch_size: int = DEFAULT_BATCH_STEPS):
+            """RL repo without a streaming API: run the episode, then yield it in batches."""
+            yield from episode_batches(simulate_episode(agent, env, max_steps=max_steps), batch_size)
 except ImportError as e:
     # Fallback to vendored version if RL repo not available
     print(f"Warning: Could not import from RL repo: {e}")